@@ -0,0 +1,46 @@
+#version 140
+
+// Per-instance data, three texels per instance:
+//   [3i]     position.xyz, uniform scale
+//   [3i + 1] color
+//   [3i + 2] bob phase, time of the last hit (negative if never hit)
+uniform samplerBuffer instances;
+uniform float bob_amplitude;
+uniform float time;
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat4 p3d_ModelViewMatrix;
+uniform mat3 p3d_NormalMatrix;
+
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+in vec4 p3d_Color;
+in vec2 p3d_MultiTexCoord0;
+
+out vec3 v_position;
+out vec3 v_normal;
+out vec4 v_color;
+out vec2 v_texcoord;
+
+const float TAU = 6.28318531;
+
+void main() {
+    vec4 placement = texelFetch(instances, gl_InstanceID * 3);
+    vec4 color = texelFetch(instances, gl_InstanceID * 3 + 1);
+    vec2 motion = texelFetch(instances, gl_InstanceID * 3 + 2).xy;
+
+    // Same offsets as BalloonManager.renderHeights(), at world time.
+    float lift = sin(time * 2.0 + motion.x) * bob_amplitude;
+    if (motion.y >= 0.0) {
+        lift += 0.1 * (1.0 - cos(TAU * (time - motion.y)));
+    }
+
+    vec4 vertex = vec4(p3d_Vertex.xyz * placement.w + placement.xyz, 1.0);
+    vertex.z += lift;
+
+    gl_Position = p3d_ModelViewProjectionMatrix * vertex;
+    v_position = vec3(p3d_ModelViewMatrix * vertex);
+    v_normal = normalize(p3d_NormalMatrix * p3d_Normal);
+    v_color = p3d_Color * color;
+    v_texcoord = p3d_MultiTexCoord0;
+}
@@ -0,0 +1,41 @@
+#version 140
+
+uniform sampler2D p3d_Texture0;
+uniform sampler2D p3d_Texture1;
+uniform vec4 p3d_ColorScale;
+
+uniform struct {
+    vec4 ambient;
+} p3d_LightModel;
+
+uniform struct {
+    vec4 color;
+    vec4 position;
+} p3d_LightSource[4];
+
+in vec3 v_position;
+in vec3 v_normal;
+in vec4 v_color;
+in vec2 v_texcoord;
+
+out vec4 p3d_FragColor;
+
+void main() {
+    // Some props stack a second modulating texture (rock.png over the
+    // model's own); unused stages sample Panda's default white texture.
+    vec4 color = texture(p3d_Texture0, v_texcoord) * texture(p3d_Texture1, v_texcoord);
+    color *= v_color * p3d_ColorScale;
+    if (color.a < 0.01) {
+        discard;
+    }
+
+    vec3 normal = normalize(v_normal);
+    vec3 light = p3d_LightModel.ambient.rgb;
+    for (int i = 0; i < p3d_LightSource.length(); ++i) {
+        vec4 source = p3d_LightSource[i].position;
+        vec3 to_light = normalize(source.xyz - v_position * source.w);
+        light += p3d_LightSource[i].color.rgb * max(dot(normal, to_light), 0.0);
+    }
+
+    p3d_FragColor = vec4(color.rgb * light, color.a);
+}
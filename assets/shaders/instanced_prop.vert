@@ -0,0 +1,37 @@
+#version 140
+
+// Per-instance data, two texels per instance:
+//   [2i]     position.xyz, uniform scale
+//   [2i + 1] cos(heading), sin(heading)
+uniform samplerBuffer instances;
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat4 p3d_ModelViewMatrix;
+uniform mat3 p3d_NormalMatrix;
+
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+in vec4 p3d_Color;
+in vec2 p3d_MultiTexCoord0;
+
+out vec3 v_position;
+out vec3 v_normal;
+out vec4 v_color;
+out vec2 v_texcoord;
+
+void main() {
+    vec4 placement = texelFetch(instances, gl_InstanceID * 2);
+    vec2 heading = texelFetch(instances, gl_InstanceID * 2 + 1).xy;
+    mat2 rotation = mat2(heading.x, heading.y, -heading.y, heading.x);
+
+    vec4 vertex = vec4(
+        vec3(rotation * p3d_Vertex.xy, p3d_Vertex.z) * placement.w + placement.xyz,
+        1.0);
+    vec3 normal = vec3(rotation * p3d_Normal.xy, p3d_Normal.z);
+
+    gl_Position = p3d_ModelViewProjectionMatrix * vertex;
+    v_position = vec3(p3d_ModelViewMatrix * vertex);
+    v_normal = normalize(p3d_NormalMatrix * normal);
+    v_color = p3d_Color;
+    v_texcoord = p3d_MultiTexCoord0;
+}
@@ -0,0 +1,45 @@
+#version 140
+
+// Start time, bounce height, spin period and bounce period of the pickup,
+// and the world time it is drawn at; same motion as
+// entities.pickup.PickupAnimator.positions().
+uniform vec4 motion;
+uniform float time;
+
+uniform mat4 p3d_ModelViewProjectionMatrix;
+uniform mat4 p3d_ModelViewMatrix;
+uniform mat3 p3d_NormalMatrix;
+
+in vec4 p3d_Vertex;
+in vec3 p3d_Normal;
+in vec4 p3d_Color;
+in vec2 p3d_MultiTexCoord0;
+
+out vec3 v_position;
+out vec3 v_normal;
+out vec4 v_color;
+out vec2 v_texcoord;
+
+const float TAU = 6.28318531;
+
+void main() {
+    float age = time - motion.x;
+    float angle = TAU * fract(age / motion.z);
+    float leg = mod(age, motion.w) / (motion.w * 0.5);
+    leg = leg < 1.0 ? leg : 2.0 - leg;
+    float lift = motion.y * leg * leg * (3.0 - 2.0 * leg);
+
+    // Pickups lie pitched 90 degrees, so the world's up axis is their own
+    // y axis: spin around it and lift along it.
+    float c = cos(angle);
+    float s = sin(angle);
+    mat3 spin = mat3(c, 0.0, -s, 0.0, 1.0, 0.0, s, 0.0, c);
+    vec4 vertex = vec4(spin * p3d_Vertex.xyz, 1.0);
+    vertex.y += lift;
+
+    gl_Position = p3d_ModelViewProjectionMatrix * vertex;
+    v_position = vec3(p3d_ModelViewMatrix * vertex);
+    v_normal = normalize(p3d_NormalMatrix * (spin * p3d_Normal));
+    v_color = p3d_Color;
+    v_texcoord = p3d_MultiTexCoord0;
+}
@@ -0,0 +1,5 @@
+"""
+Standalone benchmarks, run as modules from the repository root, e.g.
+
+    python -m benchmarks.balloons
+"""
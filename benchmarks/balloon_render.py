@@ -0,0 +1,75 @@
+"""
+Frame time of the two balloon renderers, pooled nodes and one instanced
+batch, at growing balloon counts. Renders into an offscreen buffer.
+
+The instanced batch removes the per-node cull and draw-call cost; on a
+software rasterizer (llvmpipe) the vertex work of every balloon dominates
+both columns instead, so compare them on real hardware.
+
+    python -m benchmarks.balloon_render [counts...]
+"""
+
+import sys
+
+from panda3d.core import loadPrcFileData
+
+from benchmarks.balloons import BenchGame
+from benchmarks.common import headlessBase, printTable, timeCall
+from core.profiling import sceneCounts
+
+COUNTS = [1000, 10000, 30000]
+
+
+def run(counts=COUNTS):
+    from core.world import instancingSupported
+    from entities.balloon import BalloonManager
+
+    base = headlessBase(offscreen=True)
+    if not instancingSupported(base.win.getGsg()):
+        print("hardware instancing unavailable, nothing to compare")
+        return []
+    game = BenchGame(base)
+    game.win = base.win
+    base.cam.setPos(0, -120, 60)
+    base.cam.lookAt(0, 0, 0)
+
+    rows = []
+    for count in counts:
+        row = [count]
+        for mode in ("nodes", "instanced"):
+            loadPrcFileData("benchmarks.balloon_render", f"balloon-render-mode {mode}")
+            swarm = game.newWorld(count).balloons
+            manager = BalloonManager(game)
+            swarm.spawn_timer = swarm.growth_timer = -1e9
+            for _ in range(count):
+                swarm.spawn()
+            game.dispatchEvents()
+
+            def frame():
+                swarm.update(1 / 60)
+                game.dispatchEvents()
+                manager.draw(1.0)
+                base.graphicsEngine.renderFrame()
+
+            frame_ms = timeCall(frame, repeat=10)
+            geoms = sceneCounts(base.render)["geoms"]
+            row.extend((f"{frame_ms:.1f}", geoms))
+            manager.reset()
+            manager.ignoreAll()
+            if manager.pool is not None:
+                for node in manager.pool.free:
+                    node.removeNode()
+            else:
+                manager.renderer.root.removeNode()
+        rows.append(row)
+    printTable(
+        "Balloon update + render per frame",
+        ("balloons", "nodes ms", "nodes geoms", "instanced ms", "instanced geoms"),
+        rows,
+    )
+    base.destroy()
+    return rows
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or COUNTS)
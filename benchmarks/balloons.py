@@ -0,0 +1,181 @@
+"""
+Per-frame cost of moving the balloons (BalloonSwarm.update()) and drawing
+them (BalloonManager.draw()) at growing balloon counts, against the
+previous list-of-dicts implementation (kept below as the reference), which
+moved and drew the balloons in one loop.
+
+    python -m benchmarks.balloons [counts...]
+"""
+
+import math
+import sys
+
+from direct.gui.DirectGui import DirectFrame
+from panda3d.core import CardMaker, loadPrcFileData
+
+from benchmarks.common import headlessBase, printTable, timeCall
+
+COUNTS = [100, 500, 1000, 2000, 5000]
+DT = 1 / 60
+
+
+class BenchGame:
+    """The parts of MonkeyDartGame the entities touch."""
+
+    def __init__(self, base):
+        from core.assets import AssetCache
+        from core.boxes import BoxFactory
+        from core.simulation import FixedStepLoop
+        from ui.minimap import Minimap
+
+        self.render = base.render
+        self.win = base.win
+        self.render2d = base.render2d
+        self.aspect2d = base.aspect2d
+        self.a2dTopLeft = base.a2dTopLeft
+        self.taskMgr = base.taskMgr
+        self.messenger = base.messenger
+        self.assets = AssetCache(base.loader)
+        self.boxes = BoxFactory()
+        self.minimap = Minimap(self)
+        self.simulation = FixedStepLoop()
+        self.player = BenchPlayer(self.render)
+        self.score = 0
+        self.newWorld()
+
+    def newWorld(self, seed=None):
+        """
+        An empty world, seeded so each case repeats. Without a flow field
+        balloons head straight for the player, like the legacy loop.
+        """
+        from sim.world import World
+
+        self.world = World(seed=seed)
+        self.world.flowField = None
+        self.world.takeEvents()
+        self.streams = self.world.streams
+        return self.world
+
+    def dispatchEvents(self):
+        for name, args in self.world.takeEvents():
+            self.messenger.send(name, list(args))
+
+
+class BenchPlayer:
+    def __init__(self, render):
+        self.root = render.attachNewNode("player")
+        self.hits = 0
+
+    def takesDamage(self, amount):
+        self.hits += amount
+
+
+class LegacyBalloons:
+    """The list-of-dicts balloon store and update loop this benchmark replaced."""
+
+    def __init__(self, game, manager):
+        self.game = game
+        self.bob_amplitude = manager.bob_amplitude
+        swarm = manager.swarm
+        self.balloons = []
+        for index in range(swarm.count):
+            color = swarm.colorOf(index)
+            marker = DirectFrame(
+                frameColor=color,
+                frameSize=(-0.005, 0.005, -0.005, 0.005),
+                parent=game.minimap.frame,
+            )
+            cm = CardMaker("balloon_square")
+            cm.setFrame(-0.004, 0.004, -0.004, 0.004)
+            marker.attachNewNode(cm.generate()).setColor(color)
+            model = manager.renderer.models[index].copyTo(game.render)
+            self.balloons.append(
+                {
+                    "model": model,
+                    "minimap_marker": marker,
+                    "speed_multiplier": swarm.speed_multipliers[index],
+                }
+            )
+
+    def update(self, dt):
+        for balloon in self.balloons[:]:
+            player_pos = self.game.player.root.getPos()
+            balloon_pos = balloon["model"].getPos()
+            direction = player_pos - balloon_pos
+            direction.normalize()
+
+            base_speed = 2 + (self.game.score / 100)
+            balloon_speed = base_speed * balloon["speed_multiplier"]
+            balloon["model"].setPos(balloon_pos + direction * dt * balloon_speed)
+
+            current_z = balloon["model"].getZ()
+            balloon["model"].setZ(
+                max(current_z, self.bob_amplitude + 1)
+                + math.sin(self.game.taskMgr.globalClock.getFrameTime() * 2)
+                * self.bob_amplitude
+            )
+
+            balloon_pos = balloon["model"].getPos()
+            map_scale = 0.14 / 75
+            x_pos = 0.15 + balloon_pos.x * map_scale
+            y_pos = -0.15 - balloon_pos.y * map_scale
+
+            x_pos = max(0.01, min(0.29, x_pos))
+            y_pos = max(-0.29, min(-0.01, y_pos))
+
+            balloon["minimap_marker"].setPos(x_pos, 0, y_pos)
+
+            if (balloon_pos - self.game.player.root.getPos()).length() < 1.5:
+                self.game.player.takesDamage(1)
+                return
+
+    def destroy(self):
+        for balloon in self.balloons:
+            balloon["model"].removeNode()
+            balloon["minimap_marker"].destroy()
+
+
+def run(counts=COUNTS):
+    from entities.balloon import BalloonManager
+
+    base = headlessBase()
+    # Without a window there is no instancing; this measures the update.
+    loadPrcFileData("benchmarks.balloons", "balloon-render-mode nodes")
+    game = BenchGame(base)
+    rows = []
+    for count in counts:
+        swarm = game.newWorld(count).balloons
+        manager = BalloonManager(game)
+        for _ in range(count):
+            swarm.spawn()
+        game.dispatchEvents()
+        # Keep the spawn and growth timers from firing mid-measurement.
+        swarm.spawn_timer = swarm.growth_timer = -1e9
+        legacy = LegacyBalloons(game, manager)
+
+        legacy_ms = timeCall(lambda: legacy.update(DT), repeat=20)
+
+        def frame():
+            swarm.update(DT)
+            game.dispatchEvents()
+            manager.draw(1.0)
+
+        soa_ms = timeCall(frame, repeat=20)
+        rows.append(
+            (count, f"{legacy_ms:.2f}", f"{soa_ms:.2f}", f"{legacy_ms / soa_ms:.1f}x")
+        )
+
+        legacy.destroy()
+        manager.reset()
+        manager.ignoreAll()
+    printTable(
+        "BalloonSwarm.update() and BalloonManager.draw() per frame",
+        ("balloons", "dicts ms", "arrays ms", "speedup"),
+        rows,
+    )
+    base.destroy()
+    return rows
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or COUNTS)
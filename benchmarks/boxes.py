@@ -0,0 +1,133 @@
+"""
+Cost of MonkeyDartGame.createBox: the previous six-card boxes (kept below
+as the reference) against core.boxes.BoxFactory, for the box sizes the
+game actually asks for. Reports boxes created per second and the nodes
+and Geoms (draw calls) they add to the scene, and the vertices stored.
+
+    python -m benchmarks.boxes [count]
+"""
+
+import sys
+import time
+
+from panda3d.core import CardMaker, NodePath
+
+from benchmarks.common import printTable
+
+COUNT = 2000
+
+# Player parts, weapons, projectiles and pickups.
+SIZES = [
+    (0.5, 0.3, 0.8),
+    (0.4, 0.4, 0.4),
+    (0.15, 0.15, 0.4),
+    (0.18, 0.18, 0.5),
+    (0.1, 0.4, 0.1),
+    (0.02, 0.8, 0.1),
+    (0.03, 0.2, 0.03),
+    (0.05, 0.02, 0.05),
+    (0.1, 0.5, 0.1),
+    (0.2, 1.0, 0.2),
+    (0.8, 0.8, 0.8),
+    (1.2, 0.3, 0.12),
+]
+COLOR = (0.6, 0.45, 0.3, 1)
+
+
+def legacyBox(width, depth, height, color=(1, 1, 1, 1)):
+    """MonkeyDartGame.createBox before core.boxes: six CardMaker cards."""
+    box = NodePath("box")
+
+    half_width = width / 2
+    half_depth = depth / 2
+    half_height = height / 2
+
+    cm = CardMaker("bottom")
+    cm.setFrame(-half_width, half_width, -half_depth, half_depth)
+    bottom = box.attachNewNode(cm.generate())
+    bottom.setP(-90)
+    bottom.setZ(-half_height)
+    bottom.setColor(*color)
+
+    cm = CardMaker("top")
+    cm.setFrame(-half_width, half_width, -half_depth, half_depth)
+    top = box.attachNewNode(cm.generate())
+    top.setP(90)
+    top.setZ(half_height)
+    top.setColor(*color)
+
+    cm = CardMaker("front")
+    cm.setFrame(-half_width, half_width, -half_height, half_height)
+    front = box.attachNewNode(cm.generate())
+    front.setY(half_depth)
+    front.setColor(*color)
+
+    cm = CardMaker("back")
+    cm.setFrame(-half_width, half_width, -half_height, half_height)
+    back = box.attachNewNode(cm.generate())
+    back.setY(-half_depth)
+    back.setH(180)
+    back.setColor(*color)
+
+    cm = CardMaker("left")
+    cm.setFrame(-half_depth, half_depth, -half_height, half_height)
+    left = box.attachNewNode(cm.generate())
+    left.setX(-half_width)
+    left.setH(90)
+    left.setColor(*color)
+
+    cm = CardMaker("right")
+    cm.setFrame(-half_depth, half_depth, -half_height, half_height)
+    right = box.attachNewNode(cm.generate())
+    right.setX(half_width)
+    right.setH(-90)
+    right.setColor(*color)
+
+    return box
+
+
+def build(create, count):
+    root = NodePath("boxes")
+    start = time.perf_counter()
+    for i in range(count):
+        create(*SIZES[i % len(SIZES)], COLOR).reparentTo(root)
+    seconds = time.perf_counter() - start
+    return root, seconds
+
+
+def run(count=COUNT):
+    from core.boxes import BoxFactory
+    from core.profiling import sceneCounts
+
+    factory = BoxFactory()
+    rows = []
+    for name, create in (("cards", legacyBox), ("factory", factory.create)):
+        root, seconds = build(create, count)
+        counts = sceneCounts(root)
+        rows.append(
+            (
+                name,
+                count,
+                f"{count / seconds:,.0f}",
+                f"{seconds * 1e6 / count:.1f}",
+                counts["nodes"] - 1,
+                counts["geoms"],
+                counts["vertices"],
+            )
+        )
+        root.removeNode()
+    printTable(
+        "createBox",
+        ("boxes", "count", "boxes/s", "us/box", "nodes", "geoms", "vertices"),
+        rows,
+    )
+    stats = factory.stats()
+    print(
+        f"factory cache: {stats['sizes']} sizes, {stats['hits']} hits, "
+        f"{stats['misses']} misses"
+    )
+    return rows
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:]])
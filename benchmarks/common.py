@@ -0,0 +1,49 @@
+import os
+import time
+
+from panda3d.core import Filename, loadPrcFileData
+
+ROOT = Filename.fromOsSpecific(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+def headlessConfig(offscreen=False):
+    """
+    Configure the next ShowBase for benchmarking: the repository on the
+    model path and no window, or an offscreen buffer to render into.
+    """
+    loadPrcFileData(
+        "benchmarks",
+        f"window-type {'offscreen' if offscreen else 'none'}\n"
+        "sync-video false\n"
+        "audio-library-name null\n"
+        f"model-path {ROOT}\n"
+        f"asset-cache-dir {ROOT}/cache\n",
+    )
+
+
+def headlessBase(offscreen=False):
+    """A ShowBase configured by headlessConfig()."""
+    headlessConfig(offscreen)
+    from direct.showbase.ShowBase import ShowBase
+
+    return ShowBase()
+
+
+def timeCall(func, repeat=50):
+    """Average milliseconds per call of func() over repeat calls."""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def printTable(title, header, rows):
+    print(title)
+    widths = [
+        max(len(str(value)) for value in column) for column in zip(header, *rows)
+    ]
+    for row in [header, *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,339 @@
+"""
+Time per call of the known hot functions, each at growing sizes of the
+input it scales with, under a windowless ShowBase. Each function also gets
+its scaling exponent: the slope of log(time per call) against log(size),
+so 0 means the size does not matter, 1 linear and 2 quadratic.
+
+    python -m benchmarks.micro [functions...] [--out micro.json]
+    python -m benchmarks.micro --baseline micro.json
+
+A function is picked by any part of its name, e.g. "update" or "Hearts".
+With --baseline, each time is shown next to the one in an earlier --out
+file, for the before and after of an optimization.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.balloons import BenchGame
+from benchmarks.common import headlessBase, printTable
+
+DT = 1 / 60
+
+
+def restorer(swarm, fields):
+    """A function putting swarm's rows and count back to what they are now."""
+    count = swarm.count
+    saved = {name: getattr(swarm, name).copy() for name in fields}
+
+    def restore():
+        for name, array in saved.items():
+            getattr(swarm, name)[:] = array
+        swarm.count = count
+
+    return restore
+
+
+def spawnBalloons(world, count):
+    swarm = world.balloons
+    for _ in range(count):
+        swarm.spawn()
+    # Keep the spawn and growth timers from firing mid-measurement.
+    swarm.spawn_timer = swarm.growth_timer = -1e9
+    world.takeEvents()
+    return swarm
+
+
+def obstacleCollision(game, count):
+    """1000 player moves checked against count obstacles."""
+    from sim.world import World
+
+    rng = np.random.default_rng(count)
+    obstacles = [
+        ((x, y, 0.0), radius, height)
+        for x, y, radius, height in zip(
+            rng.uniform(-75, 75, count),
+            rng.uniform(-75, 75, count),
+            rng.uniform(0.5, 2.5, count),
+            rng.uniform(0.5, 4.0, count),
+        )
+    ]
+    player = World(obstacles, seed=count).player
+    moves = [
+        (x, y, 0.0, x - dx, y - dy)
+        for x, y, dx, dy in zip(
+            rng.uniform(-75, 75, 1000),
+            rng.uniform(-75, 75, 1000),
+            rng.uniform(-0.15, 0.15, 1000),
+            rng.uniform(-0.15, 0.15, 1000),
+        )
+    ]
+    check = player.checkObstacleCollision
+
+    def run():
+        for move in moves:
+            check(*move)
+
+    return run, len(moves), None
+
+
+def balloonUpdate(game, count):
+    """One tick of count balloons chasing the player along the flow field."""
+    from sim.balloons import FIELDS
+    from sim.world import World
+
+    world = World.generate(seed=1)
+    swarm = spawnBalloons(world, count)
+    restore = restorer(swarm, FIELDS)
+
+    def run():
+        swarm.update(DT)
+        world.events.clear()
+
+    return run, 1, restore
+
+
+def projectileUpdate(game, count):
+    """One tick of count projectiles flying through 500 balloons."""
+    from sim.balloons import FIELDS as BALLOON_FIELDS
+    from sim.projectiles import FIELDS as PROJECTILE_FIELDS
+    from sim.world import World
+
+    world = World.generate(seed=1)
+    balloons = spawnBalloons(world, 500)
+    projectiles = world.projectiles
+    rng = np.random.default_rng(count)
+    projectiles._grow(count)
+    projectiles.count = count
+    projectiles.keys[:count] = np.arange(count)
+    projectiles.positions[:count, :2] = rng.uniform(-40, 40, (count, 2))
+    projectiles.positions[:count, 2] = rng.uniform(1, 6, count)
+    projectiles.previous_positions[:count] = projectiles.positions[:count]
+    directions = rng.normal(size=(count, 3))
+    directions /= np.linalg.norm(directions, axis=1)[:, None]
+    projectiles.directions[:count] = directions
+    projectiles.speeds[:count] = 30
+    projectiles.damage[:count] = 1
+    restore_balloons = restorer(balloons, BALLOON_FIELDS)
+    restore_projectiles = restorer(projectiles, PROJECTILE_FIELDS)
+
+    def restore():
+        restore_balloons()
+        restore_projectiles()
+        world.flying_coins.clear()
+
+    def run():
+        projectiles.update(DT)
+        world.events.clear()
+
+    return run, 1, restore
+
+
+def balloonAlert(game, count):
+    """100 frames of the near-balloon warning with count balloons about."""
+    from core.effects import Effects
+
+    world = game.newWorld(seed=1)
+    spawnBalloons(world, count)
+    effects = Effects(game)
+    effects.setupOverlay()
+
+    def run():
+        for _ in range(100):
+            effects.balloonAlert()
+
+    return run, 100, None
+
+
+def borderGradient(game, size):
+    """The size x size damage overlay texture."""
+    from core.effects import Effects
+
+    create = Effects.create_border_gradient_texture
+    # Reads nothing from the Effects it belongs to.
+    return (lambda: create(None, size)), 1, None
+
+
+def coinModel(game, segments):
+    """The coin mesh with segments around the rim."""
+    from entities.coin import CoinManager
+
+    create = CoinManager.createCoinModel
+    # Reads nothing from the CoinManager it belongs to.
+    return (lambda: create(None, segments)), 1, None
+
+
+def createBox(game, sizes):
+    """1000 boxes cycling through sizes distinct sizes."""
+    from core import config
+    from core.boxes import BoxFactory
+    from game import MonkeyDartGame
+
+    game.boxes = BoxFactory(config.box_cache_size.getValue())
+    rng = np.random.default_rng(sizes)
+    dimensions = rng.uniform(0.05, 1.5, (sizes, 3)).tolist()
+    boxes = [dimensions[i % sizes] for i in range(1000)]
+
+    def run():
+        for width, depth, height in boxes:
+            MonkeyDartGame.createBox(game, width, depth, height, (1, 0, 0, 1))
+
+    return run, len(boxes), None
+
+
+def refreshHearts(game, hearts):
+    """Redrawing the health bar with hearts hearts."""
+    from ui.hud import HUD
+
+    hud = HUD(game)
+    return (lambda: hud.refreshHearts(hearts)), 1, None
+
+
+# name: (builder, what the size counts, sizes)
+FUNCTIONS = {
+    "PlayerState.checkObstacleCollision": (
+        obstacleCollision,
+        "obstacles",
+        [10, 50, 200, 1000],
+    ),
+    "BalloonSwarm.update": (balloonUpdate, "balloons", [100, 500, 2000, 10000]),
+    "ProjectileSwarm.update": (projectileUpdate, "projectiles", [10, 50, 200, 1000]),
+    "Effects.balloonAlert": (balloonAlert, "balloons", [10, 100, 1000, 10000]),
+    "Effects.create_border_gradient_texture": (
+        borderGradient,
+        "texels per side",
+        [64, 128, 256, 512, 1024],
+    ),
+    "CoinManager.createCoinModel": (coinModel, "segments", [8, 32, 128, 512]),
+    "MonkeyDartGame.createBox": (createBox, "sizes", [4, 16, 64, 256]),
+    "HUD.refreshHearts": (refreshHearts, "hearts", [1, 3, 10, 30]),
+}
+
+
+def measure(run, calls, restore=None, min_time=0.2):
+    """
+    Median microseconds per call over runs of run() (each making calls
+    calls) until min_time seconds were measured, restore() before each.
+    """
+    if restore is not None:
+        restore()
+    run()
+    samples = []
+    total = 0.0
+    while (total < min_time or len(samples) < 5) and len(samples) < 10000:
+        if restore is not None:
+            restore()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        samples.append(elapsed)
+    return float(np.median(samples)) * 1e6 / calls
+
+
+def scalingExponent(sizes, times):
+    """Slope of log(time) against log(size)."""
+    return float(np.polyfit(np.log(sizes), np.log(times), 1)[0])
+
+
+def benchmark(game, name, min_time=0.2):
+    builder, parameter, sizes = FUNCTIONS[name]
+    times = []
+    for size in sizes:
+        times.append(measure(*builder(game, size), min_time))
+    return {
+        "parameter": parameter,
+        "sizes": sizes,
+        "us_per_call": [round(value, 3) for value in times],
+        "exponent": round(scalingExponent(sizes, times), 2),
+    }
+
+
+def change(new, old):
+    return f"{new / old - 1:+.0%}" if old else ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.micro",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("functions", nargs="*", help=", ".join(FUNCTIONS))
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds measured per size"
+    )
+    parser.add_argument("--out", default=None, help="write the results as JSON")
+    parser.add_argument("--baseline", default=None, help="an earlier --out file")
+    args = parser.parse_args(argv)
+
+    names = [
+        name
+        for name in FUNCTIONS
+        if not args.functions or any(part in name for part in args.functions)
+    ]
+    if not names:
+        parser.error(f"no function matches {', '.join(args.functions)}")
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["functions"]
+
+    base = headlessBase()
+    game = BenchGame(base)
+    results = {}
+    for name in names:
+        print(f"{name}...", file=sys.stderr, flush=True)
+        results[name] = benchmark(game, name, args.min_time)
+    base.destroy()
+
+    rows = []
+    for name, result in results.items():
+        before = baseline.get(name, {})
+        old_times = dict(zip(before.get("sizes", []), before.get("us_per_call", [])))
+        for size, us in zip(result["sizes"], result["us_per_call"]):
+            row = [name, f"{size} {result['parameter']}", f"{us:.2f}"]
+            if baseline:
+                old = old_times.get(size)
+                row += [f"{old:.2f}", change(us, old)] if old else ["", ""]
+            rows.append(row)
+    header = ["function", "size", "us/call"]
+    if baseline:
+        header += ["before", "change"]
+    printTable("time per call", header, rows)
+
+    print()
+    rows = []
+    for name, result in results.items():
+        row = [name, result["parameter"], f"{result['exponent']:.2f}"]
+        if baseline:
+            old = baseline.get(name, {}).get("exponent")
+            row.append("" if old is None else f"{old:.2f}")
+        rows.append(row)
+    header = ["function", "scales with", "exponent"]
+    if baseline:
+        header.append("before")
+    printTable("scaling exponents", header, rows)
+
+    if args.out:
+        from panda3d.core import PandaSystem
+
+        with open(args.out, "w") as file:
+            report = {
+                "python": platform.python_version(),
+                "panda3d": PandaSystem.getVersionString(),
+                "platform": platform.platform(),
+                "functions": results,
+            }
+            json.dump(report, file, indent=2)
+        print(f"results written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
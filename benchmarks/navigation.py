@@ -0,0 +1,84 @@
+"""
+Cost of steering balloons with the flow field: rebuilding the field when the
+player changes cell (independent of the balloon count) and sampling it for
+every balloon each frame.
+
+    python -m benchmarks.navigation [counts...]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import printTable, timeCall
+
+COUNTS = [100, 1000, 10000]
+
+
+def scatterObstacles(count=50, seed=0):
+    """Obstacles laid out like sim.world.sceneryLayout() does."""
+    rng = random.Random(seed)
+    obstacles = []
+    for _ in range(count):
+        for radius, height in ((1.5, 3), (2.0, 0.5), (2.0, 1.7)):
+            pos = (rng.uniform(-75, 75), rng.uniform(-75, 75), 0)
+            obstacles.append((pos, radius, height))
+    return obstacles
+
+
+def run(counts=COUNTS):
+    from sim.world import World
+
+    world = World(scatterObstacles())
+    flow = world.flowField
+
+    start = time.perf_counter()
+    flow.rebuild((0, 0))
+    full_ms = (time.perf_counter() - start) * 1000
+
+    # Walk the player across the map; each cell change starts a rebuild
+    # that is spread over the following updates.
+    update_ms = []
+    for x in np.linspace(-70, 70, 400):
+        start = time.perf_counter()
+        flow.update((x, 0.3 * x))
+        update_ms.append((time.perf_counter() - start) * 1000)
+
+    rows = []
+    player = np.array((0.0, 0.0, 0.0))
+    # Let the field settle on the player so only the sampling is timed.
+    flow.update(player)
+    while flow.job is not None:
+        flow.update(player)
+    for count in counts:
+        rng = np.random.default_rng(count)
+        swarm = world.balloons
+        # Steering only reads the arrays, so fill them in directly.
+        swarm._grow(count)
+        swarm.count = count
+        swarm.positions[:count, :2] = rng.uniform(-75, 75, (count, 2))
+        swarm.positions[:count, 2] = rng.uniform(2, 6, count)
+
+        world.flowField = None
+        straight_ms = timeCall(lambda: swarm.headings(player))
+        world.flowField = flow
+        steered_ms = timeCall(lambda: swarm.headings(player))
+        rows.append((count, f"{straight_ms:.3f}", f"{steered_ms:.3f}"))
+
+    print(
+        f"flow field {flow.cells}x{flow.cells}: full rebuild {full_ms:.2f} ms, "
+        f"incremental update mean {np.mean(update_ms):.3f} ms, "
+        f"max {np.max(update_ms):.3f} ms over {len(update_ms)} frames"
+    )
+    printTable(
+        "BalloonSwarm.headings() per frame",
+        ("balloons", "straight ms", "flow field ms"),
+        rows,
+    )
+    return rows
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or COUNTS)
@@ -0,0 +1,88 @@
+"""
+Per-frame cost of finding the pickups the player touches: the three
+linear scans the coin, heart and katana managers used to run (kept below
+as the reference) against PickupField.touching() and its spatial hash,
+with pickups scattered over a map of growing size at a fixed density.
+
+    python -m benchmarks.pickups [counts...]
+"""
+
+import random
+import sys
+
+import numpy as np
+from panda3d.core import NodePath, Point3
+
+from benchmarks.common import printTable, timeCall
+
+COUNTS = [30, 300, 3000, 30000]
+# Pickups per square unit, roughly what the game scatters at startup.
+DENSITY = 25 / 150**2
+KINDS = {"coin": (2.5, 0.2), "heart": (1.5, 0.3), "katana": (1.5, 0.3)}
+
+
+def legacyCollisions(lists, player_pos, collected):
+    """The per-manager scans, one list and radius per kind."""
+    for items, radius in lists:
+        for item in items[:]:
+            model = item["model"]
+            if model.isEmpty():
+                continue
+            if (model.getPos() - player_pos).length() < radius:
+                collected.append(item)
+
+
+def run(counts=COUNTS):
+    from sim.pickups import PickupField
+    from sim.world import World
+
+    rows = []
+    for count in counts:
+        random.seed(count)
+        extent = (count / DENSITY) ** 0.5 / 2
+        root = NodePath("pickups")
+        collected = []
+        world = World()
+        pickups = PickupField(world)
+        lists = {kind: ([], radius) for kind, (radius, _) in KINDS.items()}
+        for index in range(count):
+            kind = list(KINDS)[index % len(KINDS)]
+            node = root.attachNewNode(kind)
+            position = Point3(
+                random.uniform(-extent, extent), random.uniform(-extent, extent), 0.5
+            )
+            item = {"model": node, "pos": position}
+            lists[kind][0].append(item)
+            pickups.add(kind, tuple(position), KINDS[kind][1])
+        world.takeEvents()
+
+        # The player walks across the map.
+        path = [
+            Point3(x, 0.3 * x, 0) for x in np.linspace(-extent, extent, 64).tolist()
+        ]
+        steps = iter(path * 1000)
+
+        legacy_ms = timeCall(
+            lambda: legacyCollisions(lists.values(), next(steps), collected), 20
+        )
+        hashed_ms = timeCall(lambda: pickups.touching(next(steps)), 200)
+        rows.append(
+            (
+                count,
+                f"{2 * extent:.0f}",
+                f"{legacy_ms:.3f}",
+                f"{hashed_ms:.3f}",
+                f"{legacy_ms / hashed_ms:.0f}x",
+            )
+        )
+        root.removeNode()
+    printTable(
+        "pickup collection per frame",
+        ("pickups", "map size", "scan ms", "spatial hash ms", "speedup"),
+        rows,
+    )
+    return rows
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or COUNTS)
@@ -0,0 +1,66 @@
+"""
+Projectile-vs-balloon collision under load: the swept test through the
+balloon grid (BalloonSwarm.firstHits) against the previous check of every
+projectile's end point against every balloon (firstWithin per projectile).
+Also counts the hits the end-point check misses because a projectile moved
+through a balloon within one frame.
+
+    python -m benchmarks.projectiles
+"""
+
+import numpy as np
+
+from benchmarks.common import printTable, timeCall
+
+CASES = [(200, 1000), (200, 5000), (500, 5000), (1000, 10000)]
+RADIUS = 1.5
+
+
+def run(cases=CASES, dt=1 / 30):
+    from sim.world import World
+
+    rows = []
+    for projectiles, balloons in cases:
+        rng = np.random.default_rng(projectiles + balloons)
+        swarm = World().balloons
+        # Collision only reads the arrays, so fill them in directly.
+        swarm._grow(balloons)
+        swarm.count = balloons
+        swarm.positions[:balloons, :2] = rng.uniform(-75, 75, (balloons, 2))
+        swarm.positions[:balloons, 2] = rng.uniform(1, 6, balloons)
+
+        # Katana projectiles (speed 45) in random directions.
+        starts = np.column_stack(
+            (rng.uniform(-75, 75, (projectiles, 2)), rng.uniform(1, 6, projectiles))
+        )
+        directions = rng.normal(size=(projectiles, 3))
+        directions /= np.linalg.norm(directions, axis=1)[:, None]
+        ends = starts + directions * 45 * dt
+
+        def pointTests():
+            return [swarm.firstWithin(end, RADIUS) for end in ends]
+
+        point_ms = timeCall(pointTests, repeat=10)
+        swept_ms = timeCall(lambda: swarm.firstHits(starts, ends, RADIUS))
+        point_hits = sum(index >= 0 for index in pointTests())
+        swept_hits = int((swarm.firstHits(starts, ends, RADIUS)[0] >= 0).sum())
+        rows.append(
+            (
+                projectiles,
+                balloons,
+                f"{point_ms:.2f}",
+                f"{swept_ms:.2f}",
+                point_hits,
+                swept_hits,
+            )
+        )
+    printTable(
+        f"projectile collision per frame (dt {dt:.3f} s)",
+        ("projectiles", "balloons", "point ms", "swept ms", "point hits", "swept hits"),
+        rows,
+    )
+    return rows
+
+
+if __name__ == "__main__":
+    run()
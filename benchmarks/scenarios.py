@@ -0,0 +1,352 @@
+"""
+End-to-end frame times of the whole game. Each scenario boots
+MonkeyDartGame into an offscreen buffer in its own process, on a forced
+60 Hz clock and a fixed seed, scripts a situation and records per frame
+the CPU time spent in the app (tasks and simulation), cull and draw. The
+results, with frame time percentiles, scene node counts and peak RSS, are
+written to JSON and compared against a stored baseline: the run fails if
+a scenario got slower than the baseline by more than the threshold.
+
+    python -m benchmarks.scenarios [scenarios...] [--frames 300]
+    python -m benchmarks.scenarios --update-baseline
+
+The baseline belongs to the machine it was measured on; record one on the
+build box with --update-baseline before comparing against it.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import ROOT, headlessConfig, printTable
+
+BASELINE = os.path.join(ROOT.toOsSpecific(), "benchmarks", "baseline.json")
+# Compared against the baseline; all are milliseconds, lower is better.
+COMPARED = ["frame_p50_ms", "frame_p95_ms", "frame_p99_ms", "app_ms"]
+
+
+def idle(game):
+    """The world as a new round starts: scenery, pickups, a few balloons."""
+
+
+def homingBalloons(game, count=500):
+    """count balloons chasing the player, with spawning and growth held off."""
+    swarm = game.world.balloons
+    swarm.spawn_timer = swarm.growth_timer = -1e9
+    for _ in range(count):
+        swarm.spawn()
+    game.dispatchEvents()
+
+
+def projectilesInFlight(game, count=200):
+    """count projectiles kept in flight from the player, in all directions."""
+    world = game.world
+    rng = np.random.default_rng(0)
+
+    def frame(index):
+        projectiles = world.projectiles
+        x, y, z = world.player.position
+        while projectiles.count < count:
+            projectiles.canShoot = True
+            direction = rng.normal(size=3)
+            direction[2] = abs(direction[2]) * 0.2
+            world.shoot((x, y, z + 1.5), tuple(direction.tolist()))
+        game.dispatchEvents()
+
+    frame(0)
+    return frame
+
+
+def popStorm(game, per_frame=10):
+    """per_frame balloons popped in front of the camera every frame."""
+    world = game.world
+    swarm = world.balloons
+    rng = np.random.default_rng(0)
+
+    def frame(index):
+        x, y, _ = world.player.position
+        for _ in range(per_frame):
+            swarm.spawn()
+            last = swarm.count - 1
+            swarm.positions[last] = (
+                x + rng.uniform(-8, 8),
+                y + rng.uniform(8, 16),
+                rng.uniform(2, 5),
+            )
+            swarm.takeDamage(last, 100)
+        game.dispatchEvents()
+
+    return frame
+
+
+def pickupHeavy(game, count=2000):
+    """count extra coins on the ground while the player walks in circles."""
+    for _ in range(count):
+        game.world.pickups.spawn("coin")
+    game.dispatchEvents()
+    controller = game.inputController
+    controller.keyMap["forward"] = True
+
+    def frame(index):
+        controller.heading += 1.5
+        game.player.root.setH(controller.heading)
+
+    return frame
+
+
+def cameraMode(switches):
+    """200 homing balloons, seen after switching the camera switches times."""
+
+    def scenario(game):
+        for _ in range(switches):
+            game.player.switchCamera()
+        homingBalloons(game, 200)
+
+    return scenario
+
+
+SCENARIOS = {
+    "idle": idle,
+    "balloons-500": homingBalloons,
+    "projectiles-200": projectilesInFlight,
+    "pop-storm": popStorm,
+    "pickups-2000": pickupHeavy,
+    "camera-first-person": cameraMode(0),
+    "camera-third-person": cameraMode(1),
+    "camera-top-down": cameraMode(2),
+}
+
+
+class FrameTimer:
+    """
+    Times each frame of game, split into cull and draw (measured around
+    Panda's own traversals with display region callbacks) and the app
+    time, everything else the frame spent.
+    """
+
+    def __init__(self, game):
+        from panda3d.core import PythonCallbackObject
+
+        self.game = game
+        self.cull = self.draw = 0.0
+        for region in game.win.getActiveDisplayRegions():
+            region.setCullCallback(PythonCallbackObject(self.timeCull))
+            region.setDrawCallback(PythonCallbackObject(self.timeDraw))
+
+    def timeCull(self, data):
+        start = time.perf_counter()
+        data.upcall()
+        self.cull += time.perf_counter() - start
+
+    def timeDraw(self, data):
+        start = time.perf_counter()
+        data.upcall()
+        self.draw += time.perf_counter() - start
+
+    def frame(self):
+        """Run one frame; returns its (total, cull, draw) in seconds."""
+        self.cull = self.draw = 0.0
+        start = time.perf_counter()
+        self.game.taskMgr.step()
+        return time.perf_counter() - start, self.cull, self.draw
+
+
+def peakRssMb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def runScenario(name, frames=300, warmup=30):
+    """Boot the game, play scenario name and return its measurements."""
+    from panda3d.core import PandaSystem, loadPrcFileData
+
+    headlessConfig(offscreen=True)
+    loadPrcFileData(
+        "benchmarks.scenarios",
+        "win-size 1280 720\n"
+        # Wait for the GPU at the end of each frame, so its work is counted
+        # in the frame that queued it rather than whenever the driver syncs.
+        "gl-finish true\n"
+        "clock-mode non-real-time\n"
+        "clock-frame-rate 60\n"
+        "sim-seed 1\n"
+        "notify-level-profiling warning\n",
+    )
+    from core.profiling import sceneCounts
+    from game import MonkeyDartGame
+
+    game = MonkeyDartGame()
+    while game.balloonManager is None:
+        game.taskMgr.step()
+    game.startGame()
+    # Keep the round going however the scenario goes
+    game.world.player.invulnerable_until = float("inf")
+    frame = SCENARIOS[name](game)
+    timer = FrameTimer(game)
+
+    samples = []
+    for index in range(warmup + frames):
+        if frame is not None:
+            frame(index)
+        if index >= warmup:
+            samples.append(timer.frame())
+        else:
+            timer.frame()
+    totals, culls, draws = (np.array(column) * 1000 for column in zip(*samples))
+    counts = sceneCounts(game.render)
+    p50, p95, p99 = np.percentile(totals, [50, 95, 99])
+    return {
+        "frames": frames,
+        "frame_mean_ms": round(float(totals.mean()), 3),
+        "frame_p50_ms": round(float(p50), 3),
+        "frame_p95_ms": round(float(p95), 3),
+        "frame_p99_ms": round(float(p99), 3),
+        "frame_max_ms": round(float(totals.max()), 3),
+        "app_ms": round(float((totals - culls - draws).mean()), 3),
+        "cull_ms": round(float(culls.mean()), 3),
+        "draw_ms": round(float(draws.mean()), 3),
+        "nodes": counts["nodes"],
+        "geoms": counts["geoms"],
+        "balloons": game.world.balloons.count,
+        "projectiles": game.world.projectiles.count,
+        "pickups": len(game.world.pickups),
+        "particles_peak": game.screenEffects.particles.stats()["peak"],
+        "peak_rss_mb": peakRssMb(),
+        "renderer": game.win.getGsg().getDriverRenderer(),
+        "panda3d": PandaSystem.getVersionString(),
+    }
+
+
+def runIsolated(name, frames):
+    """runScenario in a fresh process, so runs and peak RSS stay apart."""
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.scenarios", "--worker", name]
+        + ["--frames", str(frames)],
+        cwd=ROOT.toOsSpecific(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"scenario {name} failed:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Rows comparing results to baseline, and whether any regressed."""
+    rows = []
+    regressed = False
+    for name, result in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for metric in COMPARED:
+            old, new = previous[metric], result[metric]
+            change = new / old - 1 if old else 0.0
+            slower = change > threshold
+            regressed |= slower
+            rows.append(
+                (
+                    name,
+                    metric,
+                    f"{old:.2f}",
+                    f"{new:.2f}",
+                    f"{change:+.0%}",
+                    "REGRESSED" if slower else "",
+                )
+            )
+    return rows, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.scenarios",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("scenarios", nargs="*", help=", ".join(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--out", default="scenarios.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="fail when a compared metric is this much slower (0.15 = 15%%)",
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(runScenario(args.worker, args.frames)))
+        return 0
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        print(f"{name}...", file=sys.stderr, flush=True)
+        results[name] = runIsolated(name, args.frames)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scenarios": results,
+    }
+    with open(args.out, "w") as file:
+        json.dump(report, file, indent=2)
+
+    printTable(
+        f"frame times over {args.frames} frames (ms)",
+        ("scenario", "p50", "p95", "p99", "app", "cull", "draw", "nodes", "RSS MB"),
+        [
+            (
+                name,
+                result["frame_p50_ms"],
+                result["frame_p95_ms"],
+                result["frame_p99_ms"],
+                result["app_ms"],
+                result["cull_ms"],
+                result["draw_ms"],
+                result["nodes"],
+                result["peak_rss_mb"],
+            )
+            for name, result in results.items()
+        ],
+    )
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; record one with --update-baseline")
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    rows, regressed = compare(results, baseline, args.threshold)
+    if rows:
+        printTable(
+            f"against {args.baseline} (threshold {args.threshold:.0%})",
+            ("scenario", "metric", "baseline", "now", "change", ""),
+            rows,
+        )
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+import hashlib
+import time
+import traceback
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from panda3d.core import (
+    AsyncFuture,
+    BamFile,
+    BamWriter,
+    Filename,
+    NodePath,
+    PandaSystem,
+    SamplerState,
+    VirtualFileSystem,
+    getModelPath,
+)
+
+from core import config
+
+notify = directNotify.newCategory("assets")
+
+# Every asset the game loads at startup. Required assets abort startup with
+# the preflight report; optional ones are skipped when missing.
+ASSET_MANIFEST = [
+    ("assets/models/ground.png", True),
+    ("assets/models/birch_tree.egg", False),
+    ("assets/models/sunflower.bam", False),
+    ("assets/models/european_cranberry_bush.egg", False),
+    ("assets/models/rock.bam", False),
+    ("assets/models/rock.png", False),
+    ("assets/models/balloon.bam", True),
+    ("assets/health.png", True),
+    ("assets/katana.png", True),
+]
+
+
+class MissingAssetsError(IOError):
+    pass
+
+
+class AssetCache:
+    """
+    Loads models and textures through compiled copies kept in the cache
+    directory: models become self-contained .bam files with their textures
+    embedded and images become .txo files, all with their mipmaps
+    precomputed. Cache entries are named after a hash of the
+    source contents and the Panda3D version, so edited sources or a Panda
+    upgrade simply miss the cache and get recompiled. A compiled model also
+    lists the textures it embedded with a hash of each, in a .deps file
+    beside it, and is recompiled when any of them changed.
+
+    Loaded assets stay resident, so assets prefetched on the loader thread
+    with loadModelAsync/loadTextureAsync are returned instantly by the
+    synchronous calls later on.
+    """
+
+    def __init__(self, loader, timer=None, cache_dir=None, task_mgr=None):
+        self.loader = loader
+        self.timer = timer
+        self.cache_dir = Filename(cache_dir or config.asset_cache_dir.getValue())
+        self.vfs = VirtualFileSystem.getGlobalPtr()
+        self.task_mgr = task_mgr
+        self.resident = {}
+        self.hits = 0
+        self.misses = 0
+        if task_mgr is not None:
+            task_mgr.setupTaskChain("asset_loader", numThreads=1)
+
+    def runInBackground(self, func, *args):
+        """
+        Run func(*args) on the asset loader thread and return an AsyncFuture
+        that task coroutines can await for its result.
+        """
+        future = AsyncFuture()
+
+        def run(task):
+            try:
+                result = func(*args)
+            except Exception:
+                notify.error(f"background load failed\n{traceback.format_exc()}")
+                result = None
+            future.setResult(result)
+            return task.done
+
+        self.task_mgr.add(run, "AssetLoaderTask", taskChain="asset_loader")
+        return future
+
+    def loadModelAsync(self, path):
+        return self.runInBackground(self.loadModel, path)
+
+    def loadTextureAsync(self, path):
+        return self.runInBackground(self.loadTexture, path)
+
+    def isResident(self, path):
+        return path in self.resident
+
+    def resolve(self, path):
+        filename = Filename(path)
+        if self.vfs.resolveFilename(filename, getModelPath().getValue()):
+            return filename
+        return None
+
+    def preflight(self, manifest=ASSET_MANIFEST):
+        missing = [
+            (path, required) for path, required in manifest if not self.resolve(path)
+        ]
+        if missing:
+            lines = [
+                f"{'required' if required else 'optional'}: {path}"
+                for path, required in missing
+            ]
+            notify.warning(
+                "asset preflight: missing source files\n  " + "\n  ".join(lines)
+            )
+        required = [path for path, required in missing if required]
+        if required:
+            raise MissingAssetsError(
+                "cannot start, required assets are missing: " + ", ".join(required)
+            )
+        return [path for path, _ in missing]
+
+    def _cachePath(self, source, extension):
+        digest = hashlib.sha1(self.vfs.readFile(source, True))
+        digest.update(PandaSystem.getVersionString().encode())
+        stem = source.getBasenameWoExtension()
+        return Filename(self.cache_dir, f"{stem}-{digest.hexdigest()[:16]}.{extension}")
+
+    def _digest(self, filename):
+        return hashlib.sha1(self.vfs.readFile(filename, True)).hexdigest()
+
+    def _depsPath(self, cached):
+        deps = Filename(cached)
+        deps.setExtension("deps")
+        return deps
+
+    def _writeDeps(self, cached, model):
+        """List the texture files model was built from, with their hashes."""
+        lines = []
+        for texture in model.findAllTextures():
+            fullpath = texture.getFullpath()
+            if not fullpath.empty() and self.vfs.exists(fullpath):
+                lines.append(f"{self._digest(fullpath)} {fullpath}\n")
+        deps = self._depsPath(cached)
+        if not self.vfs.writeFile(deps, "".join(lines).encode(), False):
+            notify.warning(f"could not write {deps}")
+
+    def _depsCurrent(self, cached):
+        """Whether every texture cached was built from is unchanged."""
+        deps = self._depsPath(cached)
+        if not self.vfs.exists(deps):
+            return False
+        for line in self.vfs.readFile(deps, True).decode().splitlines():
+            digest, _, path = line.partition(" ")
+            texture = Filename(path)
+            if not self.vfs.exists(texture) or self._digest(texture) != digest:
+                return False
+        return True
+
+    def _record(self, path, state, start):
+        if self.timer is not None:
+            self.timer.record(f"{path} ({state})", time.perf_counter() - start)
+
+    def _copy(self, model):
+        # Callers get their own copy so they can restyle it freely.
+        return NodePath(model.node().copySubgraph())
+
+    def _mipmap(self, texture):
+        # A texture already on screen (the HUD hearts) may have released its
+        # RAM copy after upload; fetching it reloads it from disk.
+        texture.getRamImage()
+        texture.setMinfilter(SamplerState.FT_linear_mipmap_linear)
+        texture.generateRamMipmapImages()
+
+    def loadModel(self, path):
+        """Return a copy of the model at path, or None if it is missing."""
+        if path in self.resident:
+            return self._copy(self.resident[path])
+        start = time.perf_counter()
+        source = self.resolve(path)
+        if source is None:
+            return None
+        cached = self._cachePath(source, "bam")
+        if self.vfs.exists(cached) and self._depsCurrent(cached):
+            model = self.loader.loadModel(cached, okMissing=True)
+            if model is not None:
+                self.hits += 1
+                self._record(path, "warm", start)
+                self.resident[path] = model
+                return self._copy(model)
+
+        model = self.loader.loadModel(source)
+        for texture in model.findAllTextures():
+            self._mipmap(texture)
+        # Embedding the decoded textures makes the compiled model
+        # self-contained and skips image decoding on warm loads.
+        cached.makeDir()
+        bam = BamFile()
+        if bam.openWrite(cached):
+            bam.getWriter().setFileTextureMode(BamWriter.BTM_rawdata)
+            bam.writeObject(model.node())
+            bam.close()
+            self._writeDeps(cached, model)
+        else:
+            notify.warning(f"could not write {cached}")
+        self.misses += 1
+        self._record(path, "cold", start)
+        self.resident[path] = model
+        return self._copy(model)
+
+    def loadTexture(self, path):
+        """Return the texture at path, or None if it is missing."""
+        if path in self.resident:
+            return self.resident[path]
+        start = time.perf_counter()
+        source = self.resolve(path)
+        if source is None:
+            return None
+
+        cached = self._cachePath(source, "txo")
+        if self.vfs.exists(cached):
+            texture = self.loader.loadTexture(cached, okMissing=True)
+            if texture is not None:
+                self.hits += 1
+                self._record(path, "warm", start)
+                self.resident[path] = texture
+                return texture
+
+        texture = self.loader.loadTexture(source)
+        self._mipmap(texture)
+        cached.makeDir()
+        if not texture.write(cached):
+            notify.warning(f"could not write {cached}")
+        self.misses += 1
+        self._record(path, "cold", start)
+        self.resident[path] = texture
+        return texture
+
+    def loadGeneratedTexture(self, name, params, generate):
+        """
+        Return generate(*params), cached on disk as a .txo named after name
+        and params so later launches skip the generation.
+        """
+        label = f"{name}{params}"
+        if label in self.resident:
+            return self.resident[label]
+        start = time.perf_counter()
+
+        key = "-".join(str(param) for param in params)
+        cached = Filename(self.cache_dir, f"{name}-{key}.txo")
+        texture = None
+        if self.vfs.exists(cached):
+            texture = self.loader.loadTexture(cached, okMissing=True)
+        if texture is not None:
+            self.hits += 1
+            self._record(label, "warm", start)
+        else:
+            texture = generate(*params)
+            cached.makeDir()
+            if not texture.write(cached):
+                notify.warning(f"could not write {cached}")
+            self.misses += 1
+            self._record(label, "cold", start)
+        self.resident[label] = texture
+        return texture
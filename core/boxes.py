@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+import numpy as np
+from panda3d.core import (
+    Geom,
+    GeomNode,
+    GeomTriangles,
+    GeomVertexData,
+    GeomVertexFormat,
+    NodePath,
+)
+
+# Outward normal and the in-face right and up axes of each side, with
+# right x up == normal so the corners below wind counter-clockwise.
+FACES = np.array(
+    [
+        ((1, 0, 0), (0, 1, 0), (0, 0, 1)),
+        ((-1, 0, 0), (0, -1, 0), (0, 0, 1)),
+        ((0, 1, 0), (-1, 0, 0), (0, 0, 1)),
+        ((0, -1, 0), (1, 0, 0), (0, 0, 1)),
+        ((0, 0, 1), (1, 0, 0), (0, 1, 0)),
+        ((0, 0, -1), (1, 0, 0), (0, -1, 0)),
+    ],
+    dtype=np.float32,
+)
+CORNERS = np.array([(0, 0), (1, 0), (1, 1), (0, 1)], dtype=np.float32)
+
+
+def boxGeom(width, depth, height):
+    """A box centered on the origin as one indexed Geom of 24 vertices."""
+    normals, rights, ups = FACES[:, 0], FACES[:, 1], FACES[:, 2]
+    signs = CORNERS * 2 - 1
+    points = (
+        normals[:, None] + rights[:, None] * signs[:, :1] + ups[:, None] * signs[:, 1:]
+    ) * (np.array((width, depth, height), dtype=np.float32) / 2)
+
+    rows = np.empty((6, 4, 8), dtype=np.float32)
+    rows[:, :, 0:3] = points
+    rows[:, :, 3:6] = normals[:, None]
+    rows[:, :, 6:8] = CORNERS
+    vdata = GeomVertexData("box", GeomVertexFormat.getV3n3t2(), Geom.UH_static)
+    vdata.uncleanSetNumRows(24)
+    memoryview(vdata.modifyArray(0)).cast("B")[:] = rows.tobytes()
+
+    triangles = GeomTriangles(Geom.UH_static)
+    indices = np.arange(0, 24, 4, dtype=np.uint16)[:, None] + np.array(
+        (0, 1, 2, 0, 2, 3), dtype=np.uint16
+    )
+    handle = triangles.modifyVertices()
+    handle.uncleanSetNumRows(36)
+    memoryview(handle).cast("B")[:] = indices.tobytes()
+
+    geom = Geom(vdata)
+    geom.addPrimitive(triangles)
+    return geom
+
+
+class BoxFactory:
+    """
+    Boxes for MonkeyDartGame.createBox. The Geom for each size is built
+    once and kept in a least-recently-used cache of capacity sizes; every
+    box is a single GeomNode sharing that Geom, tinted with a color scale.
+    Evicting a size only drops the cache's reference, boxes already made
+    keep theirs.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.geoms = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def geom(self, width, depth, height):
+        key = (width, depth, height)
+        geom = self.geoms.get(key)
+        if geom is not None:
+            self.hits += 1
+            self.geoms.move_to_end(key)
+            return geom
+        self.misses += 1
+        geom = self.geoms[key] = boxGeom(width, depth, height)
+        if len(self.geoms) > self.capacity:
+            self.geoms.popitem(last=False)
+            self.evictions += 1
+        return geom
+
+    def create(self, width, depth, height, color=(1, 1, 1, 1)):
+        node = GeomNode("box")
+        node.addGeom(self.geom(width, depth, height))
+        box = NodePath(node)
+        if tuple(color) != (1, 1, 1, 1):
+            box.setColorScale(*color)
+        return box
+
+    def stats(self):
+        return {
+            "sizes": len(self.geoms),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
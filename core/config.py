@@ -0,0 +1,56 @@
+from panda3d.core import (
+    ConfigVariableFilename,
+    ConfigVariableInt,
+    ConfigVariableString,
+)
+
+# Set in a .prc file or with loadPrcFileData, e.g. "scenery-mode flat".
+
+# "flat", "chunked" or "instanced"; see core.world.StaticWorld.
+scenery_mode = ConfigVariableString("scenery-mode", "chunked")
+scenery_prop_count = ConfigVariableInt("scenery-prop-count", 50)
+scenery_chunk_size = ConfigVariableInt("scenery-chunk-size", 20)
+
+# Compiled .bam/.txo copies of the assets, see core.assets.AssetCache.
+asset_cache_dir = ConfigVariableFilename("asset-cache-dir", "$MAIN_DIR/cache")
+
+# Side of the damage vignette texture, cached per size by Effects.
+border_gradient_size = ConfigVariableInt("border-gradient-size", 512)
+
+# Nodes created up front for the balloon and per-weapon projectile pools;
+# see core.pool.NodePool.
+balloon_pool_size = ConfigVariableInt("balloon-pool-size", 64)
+projectile_pool_size = ConfigVariableInt("projectile-pool-size", 16)
+
+# "nodes" or "instanced"; instanced falls back to nodes without shader
+# support. See entities.balloon.
+balloon_render_mode = ConfigVariableString("balloon-render-mode", "instanced")
+
+# Box sizes whose Geom MonkeyDartGame.createBox keeps; see core.boxes.
+box_cache_size = ConfigVariableInt("box-cache-size", 64)
+
+# Segments around the coin's rim; fewer is cheaper to draw. See
+# entities.coin.CoinManager.createCoinModel.
+coin_segments = ConfigVariableInt("coin-segments", 32)
+
+# "shader" or "task"; task moves the pickups on the CPU, the fallback
+# without shader support. See entities.pickup.PickupAnimator.
+pickup_animation = ConfigVariableString("pickup-animation", "shader")
+
+# Simulation ticks per second, and the most ticks run in one frame before
+# the game slows down instead; see core.simulation.FixedStepLoop.
+sim_tick_rate = ConfigVariableInt("sim-tick-rate", 60)
+sim_max_steps = ConfigVariableInt("sim-max-steps", 5)
+
+# Most effect particles alive at once; see core.effects.ParticleSystem.
+particle_budget = ConfigVariableInt("particle-budget", 2048)
+
+# Seed for the scenery, the game rules and the particles; -1 picks one at
+# random. See sim.streams.RandomStreams.
+sim_seed = ConfigVariableInt("sim-seed", -1)
+
+# Record every input of the session to record-file, or play the game from
+# the recording in replay-file instead of the player's input; see
+# sim.replay and core.playback.
+record_file = ConfigVariableFilename("record-file", "")
+replay_file = ConfigVariableFilename("replay-file", "")
@@ -1,45 +1,282 @@
 import math
 
+import numpy as np
+from direct.showbase.DirectObject import DirectObject
+from direct.task import Task
 from panda3d.core import (
     CardMaker,
+    Geom,
+    GeomEnums,
+    GeomNode,
+    GeomTriangles,
+    GeomVertexArrayFormat,
+    GeomVertexData,
+    GeomVertexFormat,
     NodePath,
-    PNMImage,
+    OmniBoundingVolume,
     Texture,
     TransparencyAttrib,
 )
 
+from core import config
+from sim.projectiles import IMPACT_EVENT
 
-class Effects:
+# Each particle flies from the emitter to a random point on a ring of radius
+# spread, raised by a random height in rise, easing out over move seconds.
+# It then shrinks away over shrink seconds. With a fade color it blends into
+# that color during the move instead.
+EMITTERS = {
+    "pop": {
+        "count": 12,
+        "size": 0.2,
+        "spread": 2.0,
+        "rise": (0.5, 2.0),
+        "move": 0.6,
+        "shrink": 0.3,
+        "fade": None,
+    },
+    "hit": {
+        "count": 8,
+        "size": 0.1,
+        "spread": 1.5,
+        "rise": (0.5, 1.5),
+        "move": 0.5,
+        "shrink": 0.0,
+        "fade": (1, 0.5, 0, 0),
+    },
+    "coin": {
+        "count": 8,
+        "size": 0.1,
+        "spread": 1.5,
+        "rise": (0.5, 1.5),
+        "move": 0.5,
+        "shrink": 0.3,
+        "fade": None,
+    },
+    "sparkle": {
+        "count": 20,
+        "size": 0.1,
+        "spread": 1.0,
+        "rise": (0.2, 1.0),
+        "move": 0.5,
+        "shrink": 0.0,
+        "fade": (1, 0.5, 0, 0),
+    },
+    "splinter": {
+        "count": 6,
+        "size": 0.08,
+        "spread": 0.6,
+        "rise": (0.2, 0.6),
+        "move": 0.3,
+        "shrink": 0.2,
+        "fade": None,
+    },
+    "flash": {
+        "count": 1,
+        "size": 0.2,
+        "spread": 0.0,
+        "rise": (0.0, 0.0),
+        "move": 0.2,
+        "shrink": 0.0,
+        "fade": (1, 0.8, 0, 0),
+    },
+}
+
+# Corners of a particle's camera-facing quad, and its two triangles.
+QUAD_CORNERS = np.array([(-1, -1), (1, -1), (1, 1), (-1, 1)], dtype=np.float32)
+QUAD_TRIANGLES = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+
+
+class ParticleSystem:
+    """
+    Every effect particle in the game, kept in arrays and drawn as one
+    dynamic Geom of camera-facing quads that is rewritten each frame. At
+    most budget particles are alive; emitting past it drops the extra
+    particles and counts them in stats().
+    """
+
+    FIELDS = {
+        "origins": 3,
+        "offsets": 3,
+        "start_colors": 4,
+        "end_colors": 4,
+        "births": None,
+        "move": None,
+        "shrink": None,
+        "sizes": None,
+    }
+
+    def __init__(self, parent, clock, budget, rng=None):
+        self.clock = clock
+        self.budget = budget
+        self.count = 0
+        self.peak = 0
+        self.dropped = 0
+        self.rng = rng if rng is not None else np.random.default_rng()
+        for name, width in self.FIELDS.items():
+            shape = (budget, width) if width else budget
+            setattr(self, name, np.zeros(shape, dtype=np.float32))
+        self.indices = (
+            np.arange(budget, dtype=np.uint32)[:, None] * 4 + QUAD_TRIANGLES
+        ).ravel()
+
+        array = GeomVertexArrayFormat()
+        array.addColumn("vertex", 3, GeomEnums.NT_float32, GeomEnums.C_point)
+        array.addColumn("color", 4, GeomEnums.NT_float32, GeomEnums.C_color)
+        vformat = GeomVertexFormat.registerFormat(GeomVertexFormat(array))
+        self.vdata = GeomVertexData("particles", vformat, Geom.UH_dynamic)
+        self.triangles = GeomTriangles(Geom.UH_dynamic)
+        self.triangles.setIndexType(GeomEnums.NT_uint32)
+        geom = Geom(self.vdata)
+        geom.addPrimitive(self.triangles)
+        node = GeomNode("particles")
+        node.addGeom(geom)
+        node.setBounds(OmniBoundingVolume())
+        node.setFinal(True)
+        self.root = parent.attachNewNode(node)
+        self.root.setLightOff()
+        self.root.setTransparency(TransparencyAttrib.M_alpha)
+        self.root.setDepthWrite(False)
+        self.root.setTwoSided(True)
+
+    @property
+    def live(self):
+        return self.count
+
+    def emit(self, kind, position, color=(1, 1, 1, 1)):
+        emitter = EMITTERS[kind]
+        count = min(emitter["count"], self.budget - self.count)
+        self.dropped += emitter["count"] - count
+        if count <= 0:
+            return
+        rows = slice(self.count, self.count + count)
+        angles = self.rng.uniform(0, 2 * math.pi, count)
+        self.origins[rows] = tuple(position)
+        self.offsets[rows, 0] = np.cos(angles) * emitter["spread"]
+        self.offsets[rows, 1] = np.sin(angles) * emitter["spread"]
+        self.offsets[rows, 2] = self.rng.uniform(*emitter["rise"], count)
+        self.start_colors[rows] = tuple(color)
+        self.end_colors[rows] = emitter["fade"] or tuple(color)
+        self.births[rows] = self.clock.getFrameTime()
+        self.move[rows] = emitter["move"]
+        self.shrink[rows] = emitter["shrink"]
+        self.sizes[rows] = emitter["size"] / 2
+        self.count += count
+        self.peak = max(self.peak, self.count)
+
+    def update(self, right, up):
+        """
+        Advance every particle to the current frame time and rebuild the
+        quads, facing them along the camera's right and up vectors.
+        """
+        n = self.count
+        now = self.clock.getFrameTime()
+        age = now - self.births[:n]
+        alive = age < self.move[:n] + self.shrink[:n]
+        if not alive.all():
+            # Drop the finished particles, keeping the rest in order.
+            n = int(alive.sum())
+            for name in self.FIELDS:
+                values = getattr(self, name)
+                values[:n] = values[: self.count][alive]
+            age = age[alive]
+            self.count = n
+
+        t = np.clip(age / self.move[:n], 0, 1)
+        eased = t * (3 - t * t) / 2
+        centers = self.origins[:n] + self.offsets[:n] * eased[:, None]
+        colors = self.start_colors[:n] + (
+            self.end_colors[:n] - self.start_colors[:n]
+        ) * t[:, None]
+        shrinking = np.clip(
+            (age - self.move[:n]) / np.maximum(self.shrink[:n], 1e-6), 0, 1
+        )
+        sizes = self.sizes[:n] * (1 - 0.99 * shrinking)
+
+        rows = np.empty((n, 4, 7), dtype=np.float32)
+        corners = QUAD_CORNERS[None, :, :] * sizes[:, None, None]
+        rows[:, :, :3] = (
+            centers[:, None, :]
+            + corners[:, :, :1] * np.asarray(right, dtype=np.float32)
+            + corners[:, :, 1:] * np.asarray(up, dtype=np.float32)
+        )
+        rows[:, :, 3:] = colors[:, None, :]
+        self.vdata.uncleanSetNumRows(n * 4)
+        handle = self.triangles.modifyVertices()
+        handle.uncleanSetNumRows(n * 6)
+        if n:
+            memoryview(self.vdata.modifyArray(0)).cast("B")[:] = rows.tobytes()
+            memoryview(handle).cast("B")[:] = self.indices[: n * 6].tobytes()
+
+    def clear(self):
+        self.count = 0
+
+    def stats(self):
+        return {
+            "live": self.count,
+            "peak": self.peak,
+            "budget": self.budget,
+            "dropped": self.dropped,
+        }
+
+
+class Effects(DirectObject):
     def __init__(self, game):
         self.game = game
         self.max_border_dist = 0.3
         self.pulse_speed = 2.0
-        self.overlay = self._create_gradient_overlay()
+        self.overlay = None
+        self.particles = ParticleSystem(
+            game.render,
+            game.taskMgr.globalClock,
+            config.particle_budget.getValue(),
+            game.streams.numpy("particles"),
+        )
+        self.accept(IMPACT_EVENT, self.impactEffect)
+        # After the intervals, before the frame is drawn; runs in every game
+        # state so effects finish behind the menus too.
+        game.taskMgr.add(self.updateParticles, "ParticleTask", sort=30)
+
+    def updateParticles(self, task):
+        quat = self.game.camera.getQuat(self.game.render)
+        self.particles.update(quat.getRight(), quat.getUp())
+        return Task.cont
+
+    def setupOverlay(self, tex=None):
+        self.overlay = self._create_gradient_overlay(tex)
         self.overlay.hide()
 
     def create_border_gradient_texture(self, size=512, max_distance=0.3):
-        img = PNMImage(size, size, 4)
-        for y in range(size):
-            for x in range(size):
-                nx = (x / (size - 1)) * 2 - 1
-                ny = (y / (size - 1)) * 2 - 1
-                dist_left = abs(nx + 1)
-                dist_right = abs(1 - nx)
-                dist_top = abs(1 - ny)
-                dist_bottom = abs(ny + 1)
-                min_dist = min(dist_left, dist_right, dist_top, dist_bottom)
-                intensity = max(0.0, min(1.0, 1.0 - (min_dist / max_distance)))
-                img.setXelA(x, y, 1.0, 0.0, 0.0, intensity)  # Red with alpha
+        # Distance to the nearest edge in [-1, 1] texture space, computed per
+        # axis and combined, then written straight into the RAM image.
+        coords = np.linspace(-1.0, 1.0, size, dtype=np.float32)
+        edge = 1.0 - np.abs(coords)
+        min_dist = np.minimum(edge[:, None], edge[None, :])
+        intensity = np.clip(1.0 - min_dist / max_distance, 0.0, 1.0)
+
+        image = np.zeros((size, size, 4), dtype=np.uint8)  # BGRA
+        image[..., 2] = 255  # Red with alpha
+        image[..., 3] = np.rint(intensity * 255)
+
         tex = Texture("border_gradient")
-        tex.load(img)
-        tex.setFormat(Texture.F_rgba)
+        tex.setup2dTexture(size, size, Texture.T_unsigned_byte, Texture.F_rgba)
+        tex.setRamImage(image)
         return tex
 
-    def _create_gradient_overlay(self):
-        tex = self.create_border_gradient_texture(
-            size=512, max_distance=self.max_border_dist
+    def loadBorderTexture(self):
+        return self.game.assets.loadGeneratedTexture(
+            "border_gradient",
+            (config.border_gradient_size.getValue(), self.max_border_dist),
+            self.create_border_gradient_texture,
         )
 
+    def _create_gradient_overlay(self, tex=None):
+        if tex is None:
+            tex = self.create_border_gradient_texture(
+                size=config.border_gradient_size.getValue(),
+                max_distance=self.max_border_dist,
+            )
+
         cm = CardMaker("overlay")
         cm.setFrameFullscreenQuad()
         quad = NodePath(cm.generate())
@@ -58,19 +295,17 @@ class Effects:
         quad.setTransparency(TransparencyAttrib.M_alpha)
         return quad
 
+    def impactEffect(self, position, obstacle):
+        # A puff of splinters where a projectile hit the scenery
+        self.particles.emit("splinter", position, (0.45, 0.35, 0.25, 1))
+
     def balloonAlert(self):
+        if self.overlay is None:
+            return
         clock = self.game.taskMgr.globalClock
         pulse = 0.2 + 0.8 * (math.sin(clock.getFrameTime() * self.pulse_speed) ** 2)
-        has_alert = False
-
-        for balloon in self.game.balloonManager.balloons:
-            dist = (
-                balloon["model"].getPos(self.game.render)
-                - self.game.player.root.getPos(self.game.render)
-            ).length()
-            if dist < 6:
-                has_alert = True
-                break
+        world = self.game.world
+        has_alert = world.balloons.anyWithin(world.player.position, 6)
 
         if has_alert:
             self.overlay.setColor(1, 1, 1, pulse)
@@ -1,4 +1,4 @@
-from panda3d.core import CardMaker, NodePath, WindowProperties
+from panda3d.core import CardMaker, GraphicsWindow, NodePath, WindowProperties
 
 
 class InputController:
@@ -15,6 +15,7 @@ class InputController:
             "switchCamera": False,
             "weaponMenu": False,
             "zoom": False,
+            "jump": False,
         }
 
         self.setupKeyBindings()
@@ -29,8 +30,6 @@ class InputController:
 
         self.game.taskMgr.add(self.mouseTask, "MouseTask")
 
-        self.game.taskMgr.add(self.updatePlayerTask, "UpdatePlayerTask")
-
     def setupKeyBindings(self):
         self.game.accept("w", self.updateKeyMap, ["forward", True])
         self.game.accept("w-up", self.updateKeyMap, ["forward", False])
@@ -51,6 +50,7 @@ class InputController:
         self.game.accept("mouse3", self.updateKeyMap, ["zoom", True])
         self.game.accept("mouse3-up", self.updateKeyMap, ["zoom", False])
         self.game.accept("escape", self.game.pauseGame, [])
+        self.game.accept("f3", self.game.reportSceneStats, [])
 
     def setupCrosshair(self):
         self.crosshair_node = NodePath("crosshair")
@@ -75,24 +75,29 @@ class InputController:
 
     def updateKeyMap(self, key, value):
         self.keyMap[key] = value
-        if key == "shoot" and value and self.game.gameState == "playing":
-            if self.player.currentWeapon == "dart":
+        # A recording being played back is the only input to the world
+        acting = self.game.gameState == "playing" and self.game.playback is None
+        if key == "shoot" and value and acting:
+            if self.game.world.weapon == "dart":
                 self.game.projectileManager.shootProjectile()
-            elif self.player.currentWeapon == "katana":
+            elif self.game.world.weapon == "katana":
                 self.player.swingKatana()
+        if key == "zoom" and (not value or self.game.gameState == "playing"):
+            self.player.setZoom(value)
         if key == "switchCamera" and value and self.game.gameState == "playing":
             self.player.switchCamera()
 
-        if key == "weaponMenu" and value and self.game.gameState == "playing":
+        if key == "weaponMenu" and value and acting:
             self.game.menuManager.showWeaponMenu()
 
     def mouseTask(self, task):
-        if self.game.gameState != "playing":
+        if self.game.gameState != "playing" or self.game.playback is not None:
             return task.cont
 
-        if self.game.mouseWatcherNode.hasMouse():
-            x = self.game.mouseWatcherNode.getMouseX()
-            y = self.game.mouseWatcherNode.getMouseY()
+        mouse = self.game.mouseWatcherNode
+        if mouse is not None and mouse.hasMouse():
+            x = mouse.getMouseX()
+            y = mouse.getMouseY()
 
             dx = x - self.last_mouse_x
             dy = y - self.last_mouse_y
@@ -151,16 +156,17 @@ class InputController:
 
         return task.cont
 
-    def updatePlayerTask(self, task):
-        if self.game.gameState != "playing":
-            return task.cont
-
-        dt = task.time - task.lastTime if hasattr(task, "lastTime") else 0
-        task.lastTime = task.time
-
-        self.player.update(dt, self.keyMap)
-
-        return task.cont
+    def controls(self):
+        """What the player is doing this tick, for World.step()."""
+        keys = self.keyMap
+        return {
+            "forward": keys["forward"],
+            "backward": keys["backward"],
+            "left": keys["left"],
+            "right": keys["right"],
+            "jump": keys["jump"],
+            "heading": self.heading,
+        }
 
     def setCrosshairVisible(self, visible):
         if visible:
@@ -169,6 +175,9 @@ class InputController:
             self.crosshair_node.hide()
 
     def hideMouseCursor(self, hidden):
+        # An offscreen buffer (see benchmarks.scenarios) has no cursor
+        if not isinstance(self.game.win, GraphicsWindow):
+            return
         props = WindowProperties()
         props.setCursorHidden(hidden)
         self.game.win.requestProperties(props)
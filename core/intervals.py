@@ -0,0 +1,56 @@
+from direct.interval.IntervalGlobal import ivalMgr
+
+
+class IntervalRegistry:
+    """
+    Intervals started on behalf of an entity, usually its NodePath. finish()
+    ends everything an owner still has playing, and finishKind() everything
+    of a kind ("coin", ...), so effects cannot outlive a round. The kinds
+    also group the diagnostics in counts().
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self):
+        self.owners = {}
+        self.started = 0
+
+    def play(self, owner, interval, kind, loop=False):
+        entry = self.owners.setdefault(owner.getKey(), (kind, []))
+        entry[1].append(interval)
+        if loop:
+            interval.loop()
+        else:
+            interval.start()
+        self.started += 1
+        if self.started % self.PRUNE_EVERY == 0:
+            self.prune()
+        return interval
+
+    def finish(self, owner):
+        _, intervals = self.owners.pop(owner.getKey(), (None, ()))
+        for interval in intervals:
+            interval.finish()
+
+    def finishKind(self, kind):
+        for key, (owner_kind, intervals) in list(self.owners.items()):
+            if owner_kind == kind:
+                del self.owners[key]
+                for interval in intervals:
+                    interval.finish()
+
+    def prune(self):
+        # One-shot effects end on their own; forget owners with nothing left.
+        for key, (_, intervals) in list(self.owners.items()):
+            intervals[:] = [interval for interval in intervals if interval.isPlaying()]
+            if not intervals:
+                del self.owners[key]
+
+    def counts(self):
+        """Playing intervals per owner kind, plus the interval manager's total."""
+        self.prune()
+        counts = {}
+        for kind, intervals in self.owners.values():
+            counts[kind] = counts.get(kind, 0) + len(intervals)
+        counts["total"] = ivalMgr.getNumIntervals()
+        return counts
@@ -0,0 +1,165 @@
+import math
+
+import numpy as np
+
+# Neighbor offsets (dx, dy) of the 8-connected grid.
+NEIGHBORS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def _shift(grid, dx, dy, fill):
+    """grid moved so that out[j, i] == grid[j + dy, i + dx], padded with fill."""
+    out = np.full_like(grid, fill)
+    h, w = grid.shape
+    out[max(0, -dy) : h - max(0, dy), max(0, -dx) : w - max(0, dx)] = grid[
+        max(0, dy) : h - max(0, -dy), max(0, dx) : w - max(0, -dx)
+    ]
+    return out
+
+
+class FlowField:
+    """
+    Shared steering toward a single target (the player) around the static
+    obstacles. The map is a grid of cells; obstacle footprints are marked
+    blocked once, and a breadth-first distance field from the target's cell
+    is rebuilt only when the target moves to another cell. Each cell then
+    stores the direction to its closest neighbor, so steering any number of
+    agents is one array lookup per agent.
+
+    A cell is blocked when its center is inside an obstacle, the same area
+    the player is kept out of. Obstacles whose top is at or below clearance
+    are left out, since the agents pass over them.
+    """
+
+    def __init__(self, obstacles, extent=80, cell_size=2.0, clearance=0.0):
+        self.extent = extent
+        self.cell_size = float(cell_size)
+        self.cells = int(math.ceil(2 * extent / self.cell_size))
+        self.target_cell = None
+        self.job = None
+        self.rebuilds = 0
+
+        centers = (np.arange(self.cells) + 0.5) * self.cell_size - extent
+        cx, cy = np.meshgrid(centers, centers)
+        self.blocked = np.zeros((self.cells, self.cells), dtype=bool)
+        for pos, radius, height in obstacles:
+            if height > clearance:
+                self.blocked |= (cx - pos[0]) ** 2 + (cy - pos[1]) ** 2 < radius**2
+        self.free = ~self.blocked
+
+        # Diagonal steps may not cut the corner of a blocked cell.
+        self.passable = []
+        for dx, dy in NEIGHBORS:
+            ok = self.free & _shift(self.free, dx, dy, False)
+            if dx and dy:
+                ok &= _shift(self.free, dx, 0, False)
+                ok &= _shift(self.free, 0, dy, False)
+            self.passable.append(ok)
+
+        self.distance = np.full((self.cells, self.cells), -1, dtype=np.int32)
+        # Flat per-cell lookups for sample(), indexed by j * cells + i.
+        self.directions = np.zeros((self.cells * self.cells, 2))
+        self.guided = np.zeros(self.cells * self.cells, dtype=bool)
+
+    def cellOf(self, x, y):
+        last = self.cells - 1
+        i = np.clip((x + self.extent) / self.cell_size, 0, last).astype(np.intp)
+        j = np.clip((y + self.extent) / self.cell_size, 0, last).astype(np.intp)
+        return i, j
+
+    def update(self, target, rings=8):
+        """
+        Follow target to its current cell. A rebuild runs incrementally,
+        expanding at most rings steps of the distance field per call, and the
+        previous field keeps steering agents until the new one is complete.
+        Returns True when a new field was swapped in.
+        """
+        i, j = self.cellOf(np.array([target[0]]), np.array([target[1]]))
+        cell = (int(i[0]), int(j[0]))
+        if self.job is None and cell != self.target_cell:
+            self.target_cell = cell
+            self.job = self._rebuild(cell)
+        if self.job is None:
+            return False
+        # The very first field has nothing to fall back on; build it whole.
+        budget = rings if self.rebuilds else None
+        steps = 0
+        while budget is None or steps < budget:
+            if next(self.job, None) is None:
+                self.job = None
+                return True
+            steps += 1
+        return False
+
+    def nearestFree(self, cell):
+        """cell, or the free cell closest to it when it is blocked."""
+        i, j = cell
+        if self.free[j, i] or not self.free.any():
+            return cell
+        free_j, free_i = np.nonzero(self.free)
+        closest = np.argmin((free_i - i) ** 2 + (free_j - j) ** 2)
+        return int(free_i[closest]), int(free_j[closest])
+
+    def rebuild(self, cell):
+        """Build the whole field toward cell at once."""
+        self.target_cell = cell
+        for _ in self._rebuild(cell):
+            pass
+
+    def _rebuild(self, cell):
+        # The target can stand closer to an obstacle than a free cell's
+        # center; then the search starts from the free cell nearest to it.
+        i, j = self.nearestFree(cell)
+        n = self.cells
+        distance = np.full((n, n), -1, dtype=np.int32)
+        distance[j, i] = 0
+        # The frontier lives in a zero-padded array so every neighbor offset
+        # is a view into it rather than a shifted copy.
+        padded = np.zeros((n + 2, n + 2), dtype=bool)
+        padded[j + 1, i + 1] = True
+        frontier = padded[1:-1, 1:-1]
+        reached = np.empty((n, n), dtype=bool)
+        views = [
+            padded[1 + dy : 1 + dy + n, 1 + dx : 1 + dx + n] for dx, dy in NEIGHBORS
+        ]
+        # Expand one ring of cells per step, all of it at once.
+        step = 0
+        while True:
+            step += 1
+            reached[:] = False
+            for view, ok in zip(views, self.passable):
+                # A cell is reached when its neighbor at (dx, dy) is on the
+                # frontier and the step between them is allowed.
+                reached |= view & ok
+            reached &= distance < 0
+            if not reached.any():
+                break
+            distance[reached] = step
+            frontier[:] = reached
+            yield True
+
+        # Each reachable cell points at its closest neighbor. Cells next to
+        # the target, and unreachable ones, get no direction: agents there
+        # head straight for the target.
+        best = np.where(distance >= 0, distance, np.iinfo(np.int32).max)
+        directions = np.zeros((n, n, 2))
+        for (dx, dy), ok in zip(NEIGHBORS, self.passable):
+            neighbor = _shift(distance, dx, dy, -1)
+            closer = ok & (neighbor >= 0) & (neighbor < best)
+            best[closer] = neighbor[closer]
+            directions[closer] = (dx, dy)
+        length = np.linalg.norm(directions, axis=2, keepdims=True)
+        directions /= np.maximum(length, 1e-9)
+        directions[distance <= 1] = 0
+        self.distance = distance
+        self.directions = directions.reshape(-1, 2)
+        self.guided = self.directions.any(axis=1)
+        self.rebuilds += 1
+
+    def sample(self, xs, ys):
+        """
+        Unit (dx, dy) per position and whether the field steers it at all;
+        unguided agents should head straight for the target.
+        """
+        i, j = self.cellOf(xs, ys)
+        cell = j * self.cells + i
+        return self.directions[cell], self.guided[cell]
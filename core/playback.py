@@ -0,0 +1,77 @@
+from core.profiling import notify
+
+
+class Playback:
+    """
+    Plays the game from a recording (see sim.replay) instead of the
+    player's input: each simulation tick applies the recorded inputs up to
+    the next recorded tick, through the same game calls the input would
+    have made, so the session looks and costs the same as when it was
+    recorded. Rounds start on their own, a moment after each game over.
+    """
+
+    def __init__(self, game, replay, restart_delay=2.0):
+        self.game = game
+        self.replay = replay
+        self.restart_delay = restart_delay
+        self.reported = False
+
+    def start(self):
+        self.replay.applyPending(self)
+
+    def tick(self):
+        if not self.replay.advance(self, self.game.world):
+            self.report()
+
+    def roundOver(self):
+        if not self.replay.finished:
+            self.game.taskMgr.doMethodLater(
+                self.restart_delay, lambda task: self.start(), "PlaybackRestart"
+            )
+        else:
+            self.report()
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        replay = self.replay
+        if replay.divergence is not None:
+            notify.warning(f"replay diverged at tick {replay.divergence}")
+        else:
+            notify.info(
+                f"replay finished: {replay.ticks} ticks, "
+                f"matched all {replay.checked} checksums"
+            )
+
+    # The recorded inputs, as the game's input would have made them.
+
+    def reset(self):
+        game = self.game
+        if game.gameState == "gameover":
+            game.menuManager.hideGameOver()
+        game.startGame()
+
+    def step(self, dt, controls):
+        game = self.game
+        heading = controls["heading"]
+        game.inputController.heading = heading
+        game.player.root.setH(heading)
+        game.world.step(dt, controls)
+        game.minimap.updatePlayerMarker(game.player.root.getPos(), heading)
+
+    def shoot(self, start, direction):
+        self.game.world.shoot(start, direction)
+
+    def swingKatana(self, forward):
+        self.game.player.swingKatanaAnimation()
+        self.game.world.swingKatana(forward)
+
+    def switchWeapon(self):
+        self.game.switchWeapon()
+
+    def selectWeapon(self, weapon):
+        self.game.selectWeapon(weapon)
+
+    def buyWeapon(self, weapon):
+        self.game.buyWeapon(weapon)
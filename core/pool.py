@@ -0,0 +1,50 @@
+class NodePool:
+    """
+    Reusable copies of a prototype node. Released nodes are stashed under
+    parent instead of removed, and acquire() unstashes one of them, so a
+    steady spawn/despawn rate stops allocating scene graph nodes once the
+    pool is warm. Misses (acquires that had to make a new copy) show how
+    far the pre-warmed size falls short.
+    """
+
+    def __init__(self, prototype, parent, size=0):
+        self.prototype = prototype
+        self.parent = parent
+        self.free = []
+        self.live = 0
+        self.hits = 0
+        self.misses = 0
+        self.warm(size)
+
+    def _create(self):
+        node = self.prototype.copyTo(self.parent)
+        node.stash()
+        return node
+
+    def warm(self, size):
+        while len(self.free) + self.live < size:
+            self.free.append(self._create())
+
+    def acquire(self):
+        if self.free:
+            self.hits += 1
+            node = self.free.pop()
+        else:
+            self.misses += 1
+            node = self._create()
+        node.unstash()
+        self.live += 1
+        return node
+
+    def release(self, node):
+        node.stash()
+        self.live -= 1
+        self.free.append(node)
+
+    def stats(self):
+        return {
+            "live": self.live,
+            "free": len(self.free),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
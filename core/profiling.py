@@ -0,0 +1,109 @@
+import time
+from contextlib import contextmanager
+
+from direct.directnotify.DirectNotifyGlobal import directNotify
+from panda3d.core import (
+    BoundingVolume,
+    GeomNode,
+    SceneGraphAnalyzer,
+    loadPrcFileData,
+)
+
+# ShowBase re-reads notify levels from config, so the default goes there.
+loadPrcFileData("core.profiling", "notify-level-profiling info")
+notify = directNotify.newCategory("profiling")
+
+
+def sceneCounts(root):
+    """Count nodes, GeomNodes and Geoms below root (Geoms ~ draw calls)."""
+    analyzer = SceneGraphAnalyzer()
+    analyzer.addNode(root.node())
+    return {
+        "nodes": analyzer.getNumNodes(),
+        "geom_nodes": analyzer.getNumGeomNodes(),
+        "geoms": analyzer.getNumGeoms(),
+        "vertices": analyzer.getNumVertices(),
+    }
+
+
+def _countGeoms(node):
+    count = node.getNumGeoms() if isinstance(node, GeomNode) else 0
+    for child in node.getChildren():
+        count += _countGeoms(child)
+    return count
+
+
+def cullStats(root, camera):
+    """
+    Walk root the way Panda's cull traversal does: test each node's bounds
+    against the camera frustum and only descend into partially visible ones.
+    Returns how many nodes were tested, how many Geoms survive (the draw calls
+    root contributes this frame) and the time spent.
+    """
+    frustum = camera.node().getLens().makeBounds()
+    stats = {"tested": 0, "visible_geoms": 0}
+
+    def visit(np):
+        stats["tested"] += 1
+        bounds = np.getBounds()
+        if bounds.isEmpty():
+            return
+        bounds = bounds.makeCopy()
+        bounds.xform(np.getMat(camera))
+        result = frustum.contains(bounds)
+        if result == BoundingVolume.IF_no_intersection:
+            return
+        if result & BoundingVolume.IF_all:
+            stats["visible_geoms"] += _countGeoms(np.node())
+            return
+        node = np.node()
+        if isinstance(node, GeomNode):
+            stats["visible_geoms"] += node.getNumGeoms()
+        for child in np.getChildren():
+            visit(child)
+
+    start = time.perf_counter()
+    for child in root.getChildren():
+        visit(child)
+    stats["cull_ms"] = (time.perf_counter() - start) * 1000
+    return stats
+
+
+def measureFrames(game, frames=30):
+    """Average wall time of a full cull+draw pass over the current scene."""
+    engine = game.graphicsEngine
+    engine.renderFrame()
+    start = time.perf_counter()
+    for _ in range(frames):
+        engine.renderFrame()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+class StartupTimer:
+    """Collects named timings during startup and logs them as one report."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.entries = []
+
+    def record(self, label, seconds):
+        self.entries.append((label, seconds * 1000))
+
+    def mark(self, label):
+        """Record a milestone as the time elapsed since startup began."""
+        self.entries.append((f"{label} at", self.elapsed()))
+
+    @contextmanager
+    def section(self, label):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, time.perf_counter() - start)
+
+    def elapsed(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def report(self, title="startup"):
+        lines = [f"{label}: {ms:.1f} ms" for label, ms in self.entries]
+        notify.info(f"{title} {self.elapsed():.1f} ms\n  " + "\n  ".join(lines))
@@ -0,0 +1,74 @@
+class FixedStepLoop:
+    """
+    Runs the game simulation in fixed ticks of 1 / rate seconds, whatever
+    the frame rate. Each frame's elapsed time goes into an accumulator and
+    as many whole ticks run as it holds, at most max_steps per frame; time
+    beyond that is dropped, so a stall slows the game down for a moment
+    instead of making the next frames catch up even longer.
+
+    Systems run once per tick in the order they were added. Renderers
+    added with addRenderer() get the fraction of a tick still in the
+    accumulator every frame, to draw between the last two ticks.
+    """
+
+    def __init__(self, rate=60, max_steps=5):
+        self.dt = 1.0 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.time = 0.0
+        self.ticks = 0
+        self.dropped = 0.0
+        self.halted = False
+        self.systems = []
+        self.renderers = []
+
+    def add(self, name, update):
+        """Call update(dt) every tick, after the systems added before it."""
+        self.systems.append((name, update))
+
+    def addRenderer(self, draw):
+        """Call draw(alpha) every frame once the ticks have run."""
+        self.renderers.append(draw)
+
+    def halt(self):
+        """Run no more ticks this frame (the game just ended, say)."""
+        self.halted = True
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.dt
+
+    def advance(self, elapsed):
+        """Run the ticks elapsed seconds of frame time add up to."""
+        self.accumulator += elapsed
+        self.halted = False
+        steps = 0
+        while self.accumulator >= self.dt and steps < self.max_steps:
+            if self.halted:
+                self.accumulator %= self.dt
+                break
+            for _, update in self.systems:
+                update(self.dt)
+            self.accumulator -= self.dt
+            self.time += self.dt
+            self.ticks += 1
+            steps += 1
+        if self.accumulator >= self.dt:
+            self.dropped += self.accumulator - self.accumulator % self.dt
+            self.accumulator %= self.dt
+
+        alpha = self.alpha
+        for draw in self.renderers:
+            draw(alpha)
+        return steps
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def stats(self):
+        return {
+            "rate": round(1 / self.dt),
+            "ticks": self.ticks,
+            "time": self.time,
+            "dropped": self.dropped,
+        }
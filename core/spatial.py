@@ -0,0 +1,312 @@
+import numpy as np
+
+
+def _expandPairs(starts, items, boxes, cells):
+    """One (box, item) pair per item filed in each (box, cell) given."""
+    first = starts[cells]
+    counts = starts[cells + 1] - first
+    skip = np.repeat(np.cumsum(counts) - counts, counts)
+    offsets = np.arange(int(counts.sum())) - skip
+    return np.repeat(boxes, counts), items[np.repeat(first, counts) + offsets]
+
+
+def _boxCells(cx0, cy0, cx1, cy1, width):
+    """Every (box, cell) pair for boxes spanning cells cx0..cx1 by cy0..cy1."""
+    boxes = [np.zeros(0, dtype=np.int64)]
+    cells = [np.zeros(0, dtype=np.int64)]
+    for dx in range(int((cx1 - cx0).max(initial=0)) + 1):
+        for dy in range(int((cy1 - cy0).max(initial=0)) + 1):
+            inside = np.flatnonzero((cx0 + dx <= cx1) & (cy0 + dy <= cy1))
+            boxes.append(inside)
+            cells.append(cx0[inside] + dx + (cy0[inside] + dy) * width)
+    return np.concatenate(boxes), np.concatenate(cells)
+
+
+class StaticGrid:
+    """
+    Uniform grid over a fixed set of circles (obstacle footprints), which
+    may also be given a vertical extent to make them cylinders. Each circle
+    is filed under every cell its bounding square touches, so a point query
+    only has to read the one cell the point falls in. Built once; queries
+    cost O(circles in the cell) regardless of how many there are.
+    """
+
+    # firstHits() batches with more segments than this walk the cells in bulk.
+    small_batch = 16
+
+    def __init__(self, xs, ys, radii, cell_size=4.0, bottoms=None, tops=None):
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.ys = np.asarray(ys, dtype=np.float64)
+        self.radii = np.asarray(radii, dtype=np.float64)
+        self.cell_size = float(cell_size)
+        if bottoms is None:
+            self.bottoms = np.full(len(self.xs), -np.inf)
+            self.tops = np.full(len(self.xs), np.inf)
+        else:
+            self.bottoms = np.asarray(bottoms, dtype=np.float64)
+            self.tops = np.asarray(tops, dtype=np.float64)
+
+        if len(self.xs):
+            self.min_x = float((self.xs - self.radii).min())
+            self.min_y = float((self.ys - self.radii).min())
+            max_x = float((self.xs + self.radii).max())
+            max_y = float((self.ys + self.radii).max())
+        else:
+            self.min_x = self.min_y = max_x = max_y = 0.0
+        self.width = int((max_x - self.min_x) // self.cell_size) + 1
+        self.height = int((max_y - self.min_y) // self.cell_size) + 1
+
+        # Every (cell, circle) pair covered by a circle's bounding square,
+        # then grouped by cell into CSR form: cell c owns
+        # items[starts[c]:starts[c + 1]], in ascending circle order.
+        x0 = self._cellX(self.xs - self.radii)
+        x1 = self._cellX(self.xs + self.radii)
+        y0 = self._cellY(self.ys - self.radii)
+        y1 = self._cellY(self.ys + self.radii)
+        cells = []
+        owners = []
+        for dx in range(int((x1 - x0).max(initial=0)) + 1):
+            for dy in range(int((y1 - y0).max(initial=0)) + 1):
+                inside = (x0 + dx <= x1) & (y0 + dy <= y1)
+                index = np.nonzero(inside)[0]
+                cells.append((x0[index] + dx) + (y0[index] + dy) * self.width)
+                owners.append(index)
+        cells = np.concatenate(cells) if cells else np.zeros(0, dtype=np.int64)
+        owners = np.concatenate(owners) if owners else np.zeros(0, dtype=np.int64)
+        order = np.lexsort((owners, cells))
+        counts = np.bincount(cells, minlength=self.width * self.height)
+        # Scalar queries read Python lists, the batched ones the arrays.
+        self.start_array = np.concatenate(([0], np.cumsum(counts)))
+        self.item_array = owners[order]
+        self.starts = self.start_array.tolist()
+        self.items = self.item_array.tolist()
+
+    @classmethod
+    def fromObstacles(cls, obstacles, cell_size=4.0):
+        """
+        Index game.obstacles entries of (pos, radius, height). As for the
+        player's collision, height is the z of the obstacle's top, not its
+        height above pos.
+        """
+        return cls(
+            [pos[0] for pos, _, _ in obstacles],
+            [pos[1] for pos, _, _ in obstacles],
+            [radius for _, radius, _ in obstacles],
+            cell_size,
+            bottoms=[pos[2] for pos, _, _ in obstacles],
+            tops=[height for _, _, height in obstacles],
+        )
+
+    def _cellX(self, x):
+        return ((x - self.min_x) // self.cell_size).astype(np.int64)
+
+    def _cellY(self, y):
+        return ((y - self.min_y) // self.cell_size).astype(np.int64)
+
+    def query(self, x, y):
+        """Indices, ascending, of the circles that may contain (x, y)."""
+        cx = int((x - self.min_x) // self.cell_size)
+        cy = int((y - self.min_y) // self.cell_size)
+        if not (0 <= cx < self.width and 0 <= cy < self.height):
+            return ()
+        cell = cx + cy * self.width
+        return self.items[self.starts[cell] : self.starts[cell + 1]]
+
+    def near(self, x, y, radius):
+        """Indices, ascending, of the circles that may come within radius of (x, y)."""
+        cx0 = max(0, int((x - radius - self.min_x) // self.cell_size))
+        cx1 = min(self.width - 1, int((x + radius - self.min_x) // self.cell_size))
+        cy0 = max(0, int((y - radius - self.min_y) // self.cell_size))
+        cy1 = min(self.height - 1, int((y + radius - self.min_y) // self.cell_size))
+        found = set()
+        for cy in range(cy0, cy1 + 1):
+            row = cy * self.width
+            for cx in range(cx0, cx1 + 1):
+                cell = row + cx
+                found.update(self.items[self.starts[cell] : self.starts[cell + 1]])
+        return sorted(found)
+
+    def _clampedCells(self, values, origin, size):
+        cells = (np.asarray(values) - origin) // self.cell_size
+        return np.clip(cells, 0, size - 1).astype(np.int64)
+
+    def firstHits(self, starts, ends):
+        """
+        For each segment starts[i] -> ends[i], the first cylinder it enters
+        (or -1) and how far along the segment (0..1, inf for none). Up to
+        small_batch segments are looked up one at a time with near(), which
+        is cheaper than walking their cells in bulk when there are so few.
+        """
+        result = np.full(len(starts), -1, dtype=np.int64)
+        entries = np.full(len(starts), np.inf)
+        if not len(starts) or not len(self.xs):
+            return result, entries
+        if len(starts) <= self.small_batch:
+            middles = ((starts[:, :2] + ends[:, :2]) / 2).tolist()
+            reaches = (np.hypot(*(ends[:, :2] - starts[:, :2]).T) / 2).tolist()
+            segments, cylinders = [], []
+            for segment, ((x, y), reach) in enumerate(zip(middles, reaches)):
+                near = self.near(x, y, reach)
+                segments.extend([segment] * len(near))
+                cylinders.extend(near)
+            segments = np.array(segments, dtype=np.int64)
+            cylinders = np.array(cylinders, dtype=np.int64)
+        else:
+            pad = float(self.radii.max())
+            low = np.minimum(starts, ends)
+            high = np.maximum(starts, ends)
+            segments, cells = _boxCells(
+                self._clampedCells(low[:, 0] - pad, self.min_x, self.width),
+                self._clampedCells(low[:, 1] - pad, self.min_y, self.height),
+                self._clampedCells(high[:, 0] + pad, self.min_x, self.width),
+                self._clampedCells(high[:, 1] + pad, self.min_y, self.height),
+                self.width,
+            )
+            segments, cylinders = _expandPairs(
+                self.start_array, self.item_array, segments, cells
+            )
+        segments, cylinders, entry = segmentCylinderHits(
+            starts, ends, self, segments, cylinders
+        )
+        order = np.lexsort((cylinders, entry, segments))
+        segments, first = np.unique(segments[order], return_index=True)
+        result[segments] = cylinders[order][first]
+        entries[segments] = entry[order][first]
+        return result, entries
+
+
+class PointGrid:
+    """
+    Uniform grid over moving points, cheap enough to rebuild every frame:
+    one sort of the points by cell, stored in the same CSR layout as
+    StaticGrid. Box queries are answered for many boxes at once.
+    """
+
+    def __init__(self, xs, ys, cell_size=3.0, extent=100.0):
+        self.cell_size = float(cell_size)
+        self.extent = float(extent)
+        self.width = int(np.ceil(2 * self.extent / self.cell_size))
+        cells = self._cell(xs) + self._cell(ys) * self.width
+        counts = np.bincount(cells, minlength=self.width * self.width)
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+        self.items = np.argsort(cells, kind="stable")
+
+    def _cell(self, values):
+        cells = (np.asarray(values) + self.extent) // self.cell_size
+        return np.clip(cells, 0, self.width - 1).astype(np.int64)
+
+    def pairs(self, x0, y0, x1, y1):
+        """
+        Every (box, point) pair where the point's cell overlaps box i, given
+        as two index arrays; the caller does the exact test.
+        """
+        boxes, cells = _boxCells(
+            self._cell(x0), self._cell(y0), self._cell(x1), self._cell(y1), self.width
+        )
+        return _expandPairs(self.starts, self.items, boxes, cells)
+
+
+class SpatialHash:
+    """
+    Points that come and go one at a time, bucketed by the cell they fall
+    in. Inserting and removing is O(1) and the map is unbounded, which
+    suits items that spawn and get collected anywhere; StaticGrid and
+    PointGrid are built in one go instead.
+    """
+
+    def __init__(self, cell_size=8.0):
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.where = {}
+
+    def cellOf(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, key, x, y):
+        cell = self.cellOf(x, y)
+        self.cells.setdefault(cell, set()).add(key)
+        self.where[key] = cell
+
+    def remove(self, key):
+        cell = self.where.pop(key, None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self.cells[cell]
+
+    def near(self, x, y, radius):
+        """Keys in every cell overlapping the square of radius around (x, y)."""
+        i0, j0 = self.cellOf(x - radius, y - radius)
+        i1, j1 = self.cellOf(x + radius, y + radius)
+        keys = []
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                bucket = self.cells.get((i, j))
+                if bucket:
+                    keys.extend(bucket)
+        return keys
+
+    def __len__(self):
+        return len(self.where)
+
+
+def segmentSphereHits(starts, ends, centers, radius, segments, spheres):
+    """
+    Exact swept test for candidate (segment, sphere) pairs: whether segment
+    starts[s] -> ends[s] passes within radius of centers[c], and how far
+    along it (0..1) it first touches the sphere. Returns the hitting pairs
+    and their entry fractions.
+    """
+    a = starts[segments]
+    d = ends[segments] - a
+    to_center = centers[spheres] - a
+    length_sq = np.maximum(np.einsum("ij,ij->i", d, d), 1e-12)
+    t = np.clip(np.einsum("ij,ij->i", to_center, d) / length_sq, 0.0, 1.0)
+    offset = to_center - d * t[:, None]
+    miss_sq = np.einsum("ij,ij->i", offset, offset)
+    hit = miss_sq < radius * radius
+    # Back up from the closest point to where the segment enters the sphere.
+    entry = t - np.sqrt(np.maximum(radius * radius - miss_sq, 0.0) / length_sq)
+    entry = np.maximum(entry, 0.0)
+    return segments[hit], spheres[hit], entry[hit]
+
+
+def segmentCylinderHits(starts, ends, grid, segments, cylinders):
+    """
+    Exact swept test for candidate (segment, cylinder) pairs against the
+    vertical cylinders of a StaticGrid. Returns the hitting pairs and how
+    far along each segment (0..1) it enters the cylinder.
+    """
+    a = starts[segments]
+    d = ends[segments] - a
+    fx = a[:, 0] - grid.xs[cylinders]
+    fy = a[:, 1] - grid.ys[cylinders]
+    radius = grid.radii[cylinders]
+
+    # Fractions of the segment inside the circle, from |f + t d|^2 = r^2.
+    qa = d[:, 0] ** 2 + d[:, 1] ** 2
+    qb = fx * d[:, 0] + fy * d[:, 1]
+    qc = fx * fx + fy * fy - radius * radius
+    flat = qa < 1e-12
+    root = np.sqrt(np.maximum(qb * qb - qa * qc, 0.0))
+    safe = np.where(flat, 1.0, qa)
+    enter = np.where(flat, np.where(qc < 0, 0.0, np.inf), (-qb - root) / safe)
+    leave = np.where(flat, np.where(qc < 0, 1.0, -np.inf), (-qb + root) / safe)
+    enter[~flat & (qb * qb - qa * qc < 0)] = np.inf
+
+    # ... and between the cylinder's bottom and top.
+    dz = d[:, 2]
+    level = np.abs(dz) < 1e-12
+    safe = np.where(level, 1.0, dz)
+    low = (grid.bottoms[cylinders] - a[:, 2]) / safe
+    high = (grid.tops[cylinders] - a[:, 2]) / safe
+    between = (a[:, 2] >= grid.bottoms[cylinders]) & (a[:, 2] <= grid.tops[cylinders])
+    z_enter = np.where(level, np.where(between, -np.inf, np.inf), np.minimum(low, high))
+    z_leave = np.where(level, np.where(between, np.inf, -np.inf), np.maximum(low, high))
+
+    entry = np.maximum(np.maximum(enter, z_enter), 0.0)
+    exit_ = np.minimum(np.minimum(leave, z_leave), 1.0)
+    hit = entry <= exit_
+    return segments[hit], cylinders[hit], entry[hit]
@@ -0,0 +1,173 @@
+import math
+from array import array
+
+from panda3d.core import (
+    BoundingBox,
+    GeomEnums,
+    NodePath,
+    Point3,
+    Shader,
+    Texture,
+)
+
+from core.profiling import notify, sceneCounts
+
+SCENERY_MODES = ("flat", "chunked", "instanced")
+
+
+def instancingSupported(gsg):
+    return (
+        gsg is not None
+        and gsg.getSupportsBasicShaders()
+        and gsg.getSupportsGeometryInstancing()
+        and gsg.getSupportsBufferTexture()
+    )
+
+
+class StaticWorld:
+    """
+    Static scenery scattered over the map, laid out in one of three modes:
+
+    - "flat": every prop is its own node copy directly under the world root.
+    - "chunked": props are grouped into square chunks, each flattened into
+      as few Geoms as its render states allow. Chunks hang off a quadtree of
+      region nodes so the cull traversal can reject whole areas of the map
+      with a single bounds test.
+    - "instanced": each model is drawn once with hardware instancing; the
+      placements live in a buffer texture read by the vertex shader.
+    """
+
+    def __init__(self, parent, extent=80, chunk_size=20, mode="chunked"):
+        if mode not in SCENERY_MODES:
+            raise ValueError(f"unknown scenery mode {mode!r}")
+        self.extent = extent
+        self.chunk_size = chunk_size
+        self.mode = mode
+        self.cells = max(1, int(math.ceil(2 * extent / chunk_size)))
+        self.levels = max(0, int(math.ceil(math.log2(self.cells))))
+        self.root = parent.attachNewNode("static_world")
+        self.regions = {}
+        self.chunks = {}
+        self.prototypes = {}
+        self.instances = {}
+        self.prop_count = 0
+        self.counts_before = None
+        self.counts_after = None
+
+    def chunkIndex(self, x, y):
+        i = int((x + self.extent) // self.chunk_size)
+        j = int((y + self.extent) // self.chunk_size)
+        return (
+            max(0, min(self.cells - 1, i)),
+            max(0, min(self.cells - 1, j)),
+        )
+
+    def _getRegion(self, level, i, j):
+        key = (level, i, j)
+        region = self.regions.get(key)
+        if region is None:
+            if level >= self.levels:
+                parent = self.root
+            else:
+                parent = self._getRegion(level + 1, i // 2, j // 2)
+            name = f"chunk_{i}_{j}" if level == 0 else f"region_{level}_{i}_{j}"
+            region = parent.attachNewNode(name)
+            self.regions[key] = region
+            if level == 0:
+                self.chunks[(i, j)] = region
+        return region
+
+    def _prototype(self, model):
+        # The .bam props ship with their exporter's camera; strip it once so
+        # it is not copied into every chunk.
+        key = id(model)
+        prototype = self.prototypes.get(key)
+        if prototype is None:
+            prototype = NodePath("prop")
+            model.copyTo(prototype)
+            for camera in prototype.findAllMatches("**/+Camera"):
+                camera.removeNode()
+            prototype.clearModelNodes()
+            self.prototypes[key] = prototype
+        return prototype
+
+    def addProp(self, model, pos, heading, scale):
+        self.prop_count += 1
+        prototype = self._prototype(model)
+        if self.mode == "instanced":
+            self.instances.setdefault(id(model), []).append((pos, heading, scale))
+            return None
+        if self.mode == "chunked":
+            parent = self._getRegion(0, *self.chunkIndex(pos[0], pos[1]))
+        else:
+            parent = self.root
+        prop = prototype.copyTo(parent)
+        prop.setPos(pos)
+        prop.setH(heading)
+        prop.setScale(scale)
+        return prop
+
+    def _buildInstanced(self):
+        shader = Shader.load(
+            Shader.SL_GLSL,
+            vertex="assets/shaders/instanced_prop.vert",
+            fragment="assets/shaders/instanced_prop.frag",
+        )
+        for key, placements in self.instances.items():
+            data = array("f")
+            for pos, heading, scale in placements:
+                angle = math.radians(heading)
+                data.extend((pos[0], pos[1], pos[2], scale))
+                data.extend((math.cos(angle), math.sin(angle), 0.0, 0.0))
+            buffer = Texture("prop_instances")
+            buffer.setupBufferTexture(
+                len(placements) * 2,
+                Texture.T_float,
+                Texture.F_rgba32,
+                GeomEnums.UH_static,
+            )
+            buffer.setRamImage(data.tobytes())
+
+            # Billboards cannot follow per-instance transforms, and every
+            # remaining node costs one instanced draw per Geom, so collapse
+            # the prototype as far as it goes.
+            batch = self.prototypes[key].copyTo(self.root)
+            for node in batch.findAllMatches("**"):
+                node.clearBillboard()
+            batch.flattenStrong()
+            batch.setShader(shader)
+            batch.setShaderInput("instances", buffer)
+            batch.setInstanceCount(len(placements))
+
+            # The Geoms only know the prototype's bounds, so give the batch
+            # and its Geoms one box around every placement instead.
+            bounds = batch.getBounds()
+            reach = (bounds.getCenter().length() + bounds.getRadius()) * max(
+                p[2] for p in placements
+            )
+            low = Point3(*(min(p[0][axis] for p in placements) for axis in range(3)))
+            high = Point3(*(max(p[0][axis] for p in placements) for axis in range(3)))
+            box = BoundingBox(low - Point3(reach), high + Point3(reach))
+            for node_path in [batch, *batch.findAllMatches("**/+GeomNode")]:
+                node = node_path.node()
+                node.setBounds(box)
+                node.setFinal(True)
+                for i in range(node.getNumGeoms() if node.isGeomNode() else 0):
+                    node.modifyGeom(i).setBounds(box)
+
+    def build(self):
+        if self.mode == "instanced":
+            self._buildInstanced()
+        self.counts_before = sceneCounts(self.root)
+        if self.mode == "chunked":
+            for chunk in self.chunks.values():
+                chunk.flattenStrong()
+        self.counts_after = sceneCounts(self.root)
+        # Compute the bounding volumes now rather than on the first cull.
+        self.root.getBounds()
+        notify.info(
+            f"static world ({self.mode}): {self.prop_count} props "
+            f"in {len(self.chunks)} chunks, "
+            f"geoms {self.counts_before['geoms']} -> {self.counts_after['geoms']}, "
+            f"nodes {self.counts_before['nodes']} -> {self.counts_after['nodes']}"
+        )
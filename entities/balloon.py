@@ -1,284 +1,207 @@
 import math
-import random
 
-from direct.gui.DirectGui import DirectFrame
-from direct.interval.IntervalGlobal import Func, Parallel, Sequence
-from direct.interval.LerpInterval import LerpColorInterval
-from panda3d.core import CardMaker, Point3
-
-
-class BalloonManager:
-    def __init__(self, game):
-        self.game = game
-        self.created = False
-        self.balloons = []
-        self.balloon_spawn_timer = 0
-        self.bob_amplitude = 0.02
-        self.balloon_growth_timer = 0
-        self.balloon_model = self.game.loader.loadModel("assets/models/balloon.bam")
-
-        self.balloon_colors = [
-            {
-                "color": (1, 0, 0, 1),
-                "health": 2,
-                "chance": 0.20,
-                "speed_multiplier": 1.0,
-            },  # Red - Common, 2 hits
-            {
-                "color": (0, 1, 0, 1),
-                "health": 2,
-                "chance": 0.20,
-                "speed_multiplier": 1.2,
-            },  # Green - Common, 2 hits, faster
-            {
-                "color": (0, 0, 1, 1),
-                "health": 3,
-                "chance": 0.20,
-                "speed_multiplier": 0.9,
-            },  # Blue - Uncommon, 3 hits, slower
-            {
-                "color": (1, 1, 0, 1),
-                "health": 3,
-                "chance": 0.20,
-                "speed_multiplier": 1.1,
-            },  # Yellow - Uncommon, 3 hits, faster
-            {
-                "color": (1, 0, 1, 1),
-                "health": 4,
-                "chance": 0.15,
-                "speed_multiplier": 0.8,
-            },  # Purple - Rare, 4 hits, slower
-            {
-                "color": (0, 1, 1, 1),
-                "health": 6,
-                "chance": 0.05,
-                "speed_multiplier": 0.7,
-            },  # Cyan - Very Rare, 6 hits, slowest
-        ]
-
-        self.balloon_types = {
-            "small": {"scale": 0.2, "points": 1, "speed_multiplier": 1.2},
-            "medium": {"scale": 0.3, "points": 2, "speed_multiplier": 1.0},
-            "large": {"scale": 0.4, "points": 3, "speed_multiplier": 0.8},
-        }
-
-    def spawnBalloon(self):
-        balloon_model = self.balloon_model.copyTo(self.game.render)
-        balloon_type = random.choice(list(self.balloon_types.keys()))
-        balloon_props = self.balloon_types[balloon_type]
-        balloon_model.setScale(balloon_props["scale"])
-
-        total_chance = sum(color["chance"] for color in self.balloon_colors)
-        roll = random.uniform(0, total_chance)
-        current_sum = 0
-        chosen_color = None
-
-        for color_data in self.balloon_colors:
-            current_sum += color_data["chance"]
-            if roll <= current_sum:
-                chosen_color = color_data
-                break
-
-        color = chosen_color["color"]
-        balloon_model.setColor(color[0], color[1], color[2], 1)
-
-        for child in balloon_model.findAllMatches("**"):
-            child.setColor(color[0], color[1], color[2], 1)
-
-        angle = random.uniform(0, 2 * math.pi)
-
-        min_distance = 40
-        max_distance = 60
-        distance = random.uniform(min_distance, max_distance)
-        player_pos = self.game.player.root.getPos()
-        x = player_pos.x + distance * math.cos(angle)
-        y = player_pos.y + distance * math.sin(angle)
-        z = 2 + random.uniform(0, 4)
-
-        x = max(-75, min(75, x))
-        y = max(-75, min(75, y))
-
-        balloon_model.setPos(x, y, z)
-
-        marker = DirectFrame(
-            frameColor=(color[0], color[1], color[2], 1),
-            frameSize=(-0.005, 0.005, -0.005, 0.005),
-            parent=self.game.minimap.frame,
+import numpy as np
+from direct.showbase.DirectObject import DirectObject
+from panda3d.core import GeomEnums, NodePath, OmniBoundingVolume, Shader, Texture
+
+from core import config
+from core.pool import NodePool
+from core.profiling import notify
+from core.world import instancingSupported
+from sim.balloons import (
+    HIT_EVENT,
+    POPPED_EVENT,
+    REMOVED_EVENT,
+    SCALED_EVENT,
+    SPAWNED_EVENT,
+)
+
+
+class BalloonNodes:
+    """Draws each balloon as its own pooled node."""
+
+    def __init__(self, prototype, parent):
+        self.pool = NodePool(prototype, parent, config.balloon_pool_size.getValue())
+        self.models = []
+
+    def spawn(self, position, color, scale):
+        model = self.pool.acquire()
+        model.setPos(position)
+        model.setColorScale(color[0], color[1], color[2], 1)
+        model.setScale(scale)
+        self.models.append(model)
+
+    def setScale(self, index, scale):
+        self.models[index].setScale(scale)
+
+    def remove(self, index):
+        self.pool.release(self.models.pop(index))
+
+    def clear(self):
+        for model in self.models:
+            self.pool.release(model)
+        self.models = []
+
+    def draw(self, manager, positions, time):
+        heights = manager.renderHeights(positions, time)
+        for model, x, y, z in zip(
+            self.models,
+            positions[:, 0].tolist(),
+            positions[:, 1].tolist(),
+            heights.tolist(),
+        ):
+            model.setPos(x, y, z)
+
+
+class BalloonBatch:
+    """
+    Draws every balloon with one instanced draw per Geom of the model. The
+    placements, colors and bob parameters are copied into a buffer texture
+    each frame and the vertex shader applies the bob, so unlike
+    BalloonNodes it keeps no per-balloon state to follow the swarm's events.
+    """
+
+    def __init__(self, prototype, parent, bob_amplitude):
+        self.pool = None
+        self.capacity = 0
+        self.buffer = Texture("balloon_instances")
+        self.root = prototype.copyTo(parent)
+        self.root.flattenStrong()
+        self.root.setShader(
+            Shader.load(
+                Shader.SL_GLSL,
+                vertex="assets/shaders/instanced_balloon.vert",
+                fragment="assets/shaders/instanced_prop.frag",
+            )
         )
-
-        map_scale = 0.14 / 75
-        marker.setPos(0.15 + x * map_scale, 0, -0.15 - y * map_scale)
-
-        cm = CardMaker("balloon_square")
-        cm.setFrame(-0.004, 0.004, -0.004, 0.004)
-        balloon_square = marker.attachNewNode(cm.generate())
-        balloon_square.setColor(color[0], color[1], color[2], 1)
-
-        self.balloons.append(
-            {
-                "model": balloon_model,
-                "minimap_marker": marker,
-                "color": color,
-                "type": balloon_type,
-                "health": chosen_color["health"],
-                "max_health": chosen_color["health"],
-                "points": balloon_props["points"],
-                "speed_multiplier": balloon_props["speed_multiplier"]
-                * chosen_color["speed_multiplier"],
-            }
+        self.root.setShaderInput("bob_amplitude", bob_amplitude)
+        self.root.setShaderInput("time", 0.0)
+        self._reserve(64)
+
+        # Balloons can be anywhere on the map; never cull the batch.
+        for node_path in [self.root, *self.root.findAllMatches("**/+GeomNode")]:
+            node = node_path.node()
+            node.setBounds(OmniBoundingVolume())
+            node.setFinal(True)
+            for i in range(node.getNumGeoms() if node.isGeomNode() else 0):
+                node.modifyGeom(i).setBounds(OmniBoundingVolume())
+        self.root.hide()
+
+    def _reserve(self, count):
+        if count <= self.capacity:
+            return
+        while self.capacity < count:
+            self.capacity = max(64, self.capacity * 2)
+        self.buffer.setupBufferTexture(
+            self.capacity * 3, Texture.T_float, Texture.F_rgba32, GeomEnums.UH_dynamic
         )
-
-    def balloonHitEffect(self, balloon):
-        for i in range(8):
-            particle = self.game.createBox(0.1, 0.1, 0.1, balloon["color"])
-            particle.reparentTo(self.game.render)
-            particle.setPos(balloon["model"].getPos())
-            angle = random.uniform(0, 2 * math.pi)
-            height = random.uniform(0.5, 1.5)
-            end_pos = Point3(
-                balloon["model"].getPos().x + math.cos(angle) * 1.5,
-                balloon["model"].getPos().y + math.sin(angle) * 1.5,
-                balloon["model"].getPos().z + height,
-            )
-
-            particle_seq = Sequence(
-                Parallel(
-                    particle.posInterval(0.5, end_pos, blendType="easeOut"),
-                    LerpColorInterval(
-                        particle,
-                        0.5,
-                        (1, 0.5, 0, 0),
-                        (
-                            balloon["color"][0],
-                            balloon["color"][1],
-                            balloon["color"][2],
-                            1,
-                        ),
-                    ),
-                ),
-                Func(particle.removeNode),
-            )
-            particle_seq.start()
-
-        bobbing_effect = Sequence(
-            balloon["model"].posInterval(
-                0.5,
-                Point3(
-                    balloon["model"].getX(),
-                    balloon["model"].getY(),
-                    balloon["model"].getZ() + 0.2,
-                ),
-                blendType="easeInOut",
-            ),
-            balloon["model"].posInterval(
-                0.5,
-                Point3(
-                    balloon["model"].getX(),
-                    balloon["model"].getY(),
-                    balloon["model"].getZ(),
-                ),
-                blendType="easeInOut",
-            ),
+        self.root.setShaderInput("instances", self.buffer)
+
+    def clear(self):
+        self.root.hide()
+
+    def draw(self, manager, positions, time):
+        swarm = manager.swarm
+        count = swarm.count
+        self._reserve(count)
+        rows = np.zeros((count, 12), dtype=np.float32)
+        rows[:, 0:3] = positions
+        rows[:, 3] = swarm.scales[:count]
+        rows[:, 4:8] = swarm.color_table[swarm.color_index[:count]]
+        rows[:, 8] = swarm.phases[:count]
+        rows[:, 9] = swarm.hit_times[:count]
+        memoryview(self.buffer.modifyRamImage()).cast("B")[: rows.nbytes] = (
+            rows.tobytes()
         )
-        bobbing_effect.loop()
-
-    def takeDamage(self, balloon, damage):
-        balloon["health"] -= damage
-
-        health_ratio = balloon["health"] / balloon["max_health"]
-        base_scale = self.balloon_types[balloon["type"]]["scale"]
-        current_scale = base_scale * (0.5 + 0.5 * health_ratio)
-        balloon["model"].setScale(current_scale)
-
-        color = balloon["color"]
-        balloon["model"].setColor(color[0], color[1], color[2], 1)
-        for child in balloon["model"].findAllMatches("**"):
-            child.setColor(color[0], color[1], color[2], 1)
-        self.balloonHitEffect(balloon)
-
-        if balloon["health"] <= 0:
-            self.game.projectileManager.createBalloonPopEffect(
-                balloon["model"].getPos(), balloon["color"]
-            )
-            if random.random() < 0.3:
-                self.game.coinManager.spawnFlyingCoin(balloon["model"].getPos())
-
-            self.game.score += balloon["points"]
-            self.game.coins += balloon["points"]
-            self.game.hud.updateScore(self.game.score)
-            self.game.hud.updateCoins(self.game.coins)
+        self.root.setShaderInput("time", time)
+        self.root.setInstanceCount(count)
+        self.root.show()
 
-            self.removeBalloon(balloon)
 
-    def growBalloons(self):
-        for balloon in self.balloons:
-            # Increase health and max_health
-            balloon["max_health"] += 1
-            balloon["health"] += 1
-            # Scale up slightly (e.g., 5% per growth)
-            current_scale = balloon["model"].getScale()
-            new_scale = None
-            if current_scale.length() > 10.0:  # Prevent too large
-                new_scale = current_scale
-            else:
-                new_scale = current_scale * 1.1  # 5% larger
-            balloon["model"].setScale(new_scale)
+class BalloonManager(DirectObject):
+    """
+    Draws the world's balloons (game.world.balloons). In node mode the
+    renderer keeps one drawn balloon per row of the swarm by following its
+    spawn, removal and scale events; either renderer's draw() places them
+    all between their last two tick positions each frame.
+    """
 
-    def update(self, dt):
-        self.balloon_spawn_timer += dt
-        self.balloon_growth_timer += dt
-
-        # Spawn new balloons
-        # if not self.created:
-        # self.spawnBalloon()
-        # self.created = True
-        if self.balloon_spawn_timer > 1.0:  # Every 1 second
-            self.balloon_spawn_timer = 0
-            if len(self.balloons) < 10 + self.game.score // 10:
-                self.spawnBalloon()
-        if self.balloon_growth_timer > 10.0:
-            self.balloon_growth_timer = 0
-            self.growBalloons()
-        for balloon in self.balloons[:]:
-            player_pos = self.game.player.root.getPos()
-            balloon_pos = balloon["model"].getPos()
-            direction = player_pos - balloon_pos
-            direction.normalize()
-
-            base_speed = 2 + (self.game.score / 100)
-            balloon_speed = base_speed * balloon["speed_multiplier"]
-            balloon["model"].setPos(balloon_pos + direction * dt * balloon_speed)
-
-            current_z = balloon["model"].getZ()
-            balloon["model"].setZ(
-                max(current_z, self.bob_amplitude + 1)
-                + math.sin(self.game.taskMgr.globalClock.getFrameTime() * 2)
-                * self.bob_amplitude
+    def __init__(self, game):
+        self.game = game
+        self.swarm = game.world.balloons
+        self.bob_amplitude = self.swarm.bob_amplitude
+        self.balloon_model = self.game.assets.loadModel("assets/models/balloon.bam")
+
+        self.render_mode = config.balloon_render_mode.getValue()
+        if self.render_mode == "instanced" and not instancingSupported(
+            self.game.win.getGsg()
+        ):
+            notify.warning("hardware instancing unavailable, drawing balloon nodes")
+            self.render_mode = "nodes"
+        if self.render_mode == "instanced":
+            self.renderer = BalloonBatch(
+                self._prototype(), self.game.render, self.bob_amplitude
             )
+        else:
+            self.renderer = BalloonNodes(self._prototype(), self.game.render)
+            self.accept(SPAWNED_EVENT, self.renderer.spawn)
+            self.accept(REMOVED_EVENT, self.renderer.remove)
+            self.accept(SCALED_EVENT, self.renderer.setScale)
+        self.pool = self.renderer.pool
+
+        self.accept(HIT_EVENT, self.balloonHitEffect)
+        self.accept(POPPED_EVENT, self.balloonPopEffect)
+
+    def _prototype(self):
+        # A white copy of the model, so tinting is a single color scale
+        # (or the per-instance color in the shader).
+        prototype = NodePath("balloon")
+        body = self.balloon_model.copyTo(prototype)
+        for camera in body.findAllMatches("**/+Camera"):
+            camera.removeNode()
+        for child in body.findAllMatches("**"):
+            child.setColor(1, 1, 1, 1)
+        return prototype
+
+    def renderHeights(self, positions, time):
+        """
+        Drawn heights of the live balloons at positions: their own bob, plus
+        a 0.2 high bob repeating every second once they have been hit.
+        """
+        swarm = self.swarm
+        n = swarm.count
+        heights = positions[:, 2] + (
+            np.sin(time * 2 + swarm.phases[:n]) * self.bob_amplitude
+        )
+        hit = swarm.hit_times[:n]
+        heights += np.where(
+            hit >= 0, 0.1 * (1 - np.cos(2 * math.pi * (time - hit))), 0
+        )
+        return heights
 
-            balloon_pos = balloon["model"].getPos()
-            map_scale = 0.14 / 75
-            x_pos = 0.15 + balloon_pos.x * map_scale
-            y_pos = -0.15 - balloon_pos.y * map_scale
-
-            x_pos = max(0.01, min(0.29, x_pos))
-            y_pos = max(-0.29, min(-0.01, y_pos))
+    def balloonHitEffect(self, position, color):
+        self.game.screenEffects.particles.emit("hit", position, color)
 
-            balloon["minimap_marker"].setPos(x_pos, 0, y_pos)
+    def balloonPopEffect(self, position, color):
+        # Fragments of the balloon flying apart
+        self.game.screenEffects.particles.emit("pop", position, color)
 
-            if (balloon_pos - player_pos).length() < 1.5:
-                self.game.player.takesDamage(1)
-                return
+    def draw(self, alpha):
+        """Draw the balloons alpha of the way from the previous tick to the last."""
+        swarm = self.swarm
+        previous = swarm.previous_positions[: swarm.count]
+        positions = previous + (swarm.livePositions() - previous) * alpha
+        # The bobs run on world time, drawn at the same point between ticks.
+        time = self.game.world.time + (alpha - 1) * self.game.simulation.dt
+        self.renderer.draw(self, positions, time)
 
-    def removeBalloon(self, balloon):
-        balloon["model"].removeNode()
-        balloon["minimap_marker"].destroy()
-        if balloon in self.balloons:
-            self.balloons.remove(balloon)
+        map_scale = 0.14 / 75
+        map_x = np.clip(0.15 + positions[:, 0] * map_scale, 0.01, 0.29)
+        map_y = np.clip(-0.15 - positions[:, 1] * map_scale, -0.29, -0.01)
+        self.game.minimap.updateBalloonMarkers(
+            map_x, map_y, swarm.color_table[swarm.color_index[: swarm.count]]
+        )
 
     def reset(self):
-        for balloon in self.balloons:
-            balloon["model"].removeNode()
-            balloon["minimap_marker"].destroy()
-        self.balloons = []
-        self.balloon_spawn_timer = 0
+        self.renderer.clear()
+        self.game.minimap.updateBalloonMarkers([], [], [])
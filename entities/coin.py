@@ -1,125 +1,79 @@
-import math
-import random
-
+import numpy as np
 from direct.interval.IntervalGlobal import Func, Sequence
+from direct.showbase.DirectObject import DirectObject
 from panda3d.core import (
     Geom,
     GeomNode,
     GeomTriangles,
     GeomVertexData,
     GeomVertexFormat,
-    GeomVertexWriter,
     NodePath,
-    Point3,
 )
 
+from core import config
+from sim.world import COIN_DROPPED_EVENT, COIN_FLIGHT
+
 
-class CoinManager:
+class CoinManager(DirectObject):
     def __init__(self, game):
         self.game = game
-        self.terrainCoins = []
-        self.coin_radius = 2.5
-
-        for _ in range(20):
-            self.spawnCoinOnTerrain()
-
-    def createCoinModel(self):
-        format = GeomVertexFormat.getV3n3c4()
-        vdata = GeomVertexData("coin", format, Geom.UHStatic)
-
-        vertex = GeomVertexWriter(vdata, "vertex")
-        normal = GeomVertexWriter(vdata, "normal")
-        color = GeomVertexWriter(vdata, "color")
-
-        radius = 0.3
-        thickness = 0.1
-        segments = 32
-
-        for i in range(segments):
-            angle = (i / segments) * 2 * math.pi
-            next_angle = ((i + 1) / segments) * 2 * math.pi
-
-            vertex.addData3f(0, 0, thickness / 2)
-            normal.addData3f(0, 0, 1)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(angle), radius * math.sin(angle), thickness / 2
-            )
-            normal.addData3f(0, 0, 1)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(next_angle),
-                radius * math.sin(next_angle),
-                thickness / 2,
-            )
-            normal.addData3f(0, 0, 1)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(0, 0, -thickness / 2)
-            normal.addData3f(0, 0, -1)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(next_angle),
-                radius * math.sin(next_angle),
-                -thickness / 2,
-            )
-            normal.addData3f(0, 0, -1)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(angle), radius * math.sin(angle), -thickness / 2
-            )
-            normal.addData3f(0, 0, -1)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(angle), radius * math.sin(angle), thickness / 2
-            )
-            normal.addData3f(math.cos(angle), math.sin(angle), 0)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(next_angle),
-                radius * math.sin(next_angle),
-                thickness / 2,
-            )
-            normal.addData3f(math.cos(next_angle), math.sin(next_angle), 0)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(angle), radius * math.sin(angle), -thickness / 2
-            )
-            normal.addData3f(math.cos(angle), math.sin(angle), 0)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(next_angle),
-                radius * math.sin(next_angle),
-                thickness / 2,
-            )
-            normal.addData3f(math.cos(next_angle), math.sin(next_angle), 0)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(next_angle),
-                radius * math.sin(next_angle),
-                -thickness / 2,
-            )
-            normal.addData3f(math.cos(next_angle), math.sin(next_angle), 0)
-            color.addData4f(1.0, 0.84, 0, 1)
-
-            vertex.addData3f(
-                radius * math.cos(angle), radius * math.sin(angle), -thickness / 2
+        # Built once; each coin is a copy sharing its Geom.
+        self.prototype = self.createCoinModel(config.coin_segments.getValue())
+        game.pickups.register(
+            "coin", self.createTerrainCoin, self.createCoinCollectionEffect
+        )
+        self.accept(COIN_DROPPED_EVENT, self.spawnFlyingCoin)
+
+    def createCoinModel(self, segments, radius=0.3, thickness=0.1):
+        """
+        The coin mesh every coin shares: a top and bottom cap fanned around
+        a center vertex and a smooth-shaded rim, with the vertices shared
+        between triangles and one flat color for the whole coin.
+        """
+        angles = np.arange(segments) * (2 * np.pi / segments)
+        ring = np.column_stack((np.cos(angles), np.sin(angles)))
+        half = thickness / 2
+
+        # Rows of vertex and normal: top center and rim, bottom center and
+        # rim, then the rim again top and bottom with outward normals.
+        rows = np.zeros((4 * segments + 2, 6), dtype=np.float32)
+        top = rows[: segments + 1]
+        bottom = rows[segments + 1 : 2 * segments + 2]
+        side = rows[2 * segments + 2 :].reshape(segments, 2, 6)
+        top[1:, 0:2] = bottom[1:, 0:2] = ring * radius
+        top[:, 2], top[:, 5] = half, 1
+        bottom[:, 2], bottom[:, 5] = -half, -1
+        side[:, :, 0:2] = ring[:, None] * radius
+        side[:, 0, 2], side[:, 1, 2] = half, -half
+        side[:, :, 3:5] = ring[:, None]
+
+        current = np.arange(segments)
+        following = (current + 1) % segments
+        bottom_center = segments + 1
+        rim_top = 2 * segments + 2 + 2 * current
+        next_top = 2 * segments + 2 + 2 * following
+        triangles = np.concatenate(
+            (
+                np.column_stack((np.zeros(segments), 1 + current, 1 + following)),
+                np.column_stack(
+                    (
+                        np.full(segments, bottom_center),
+                        bottom_center + 1 + following,
+                        bottom_center + 1 + current,
+                    )
+                ),
+                np.column_stack((rim_top, rim_top + 1, next_top)),
+                np.column_stack((next_top, rim_top + 1, next_top + 1)),
             )
-            normal.addData3f(math.cos(angle), math.sin(angle), 0)
-            color.addData4f(1.0, 0.84, 0, 1)
+        ).astype(np.uint16)
 
+        vdata = GeomVertexData("coin", GeomVertexFormat.getV3n3(), Geom.UHStatic)
+        vdata.uncleanSetNumRows(len(rows))
+        memoryview(vdata.modifyArray(0)).cast("B")[:] = rows.tobytes()
         prim = GeomTriangles(Geom.UHStatic)
-        for i in range(segments * 4):
-            prim.addVertices(i * 3, i * 3 + 1, i * 3 + 2)
+        handle = prim.modifyVertices()
+        handle.uncleanSetNumRows(triangles.size)
+        memoryview(handle).cast("B")[:] = triangles.tobytes()
 
         geom = Geom(vdata)
         geom.addPrimitive(prim)
@@ -127,96 +81,33 @@ class CoinManager:
         node = GeomNode("coin")
         node.addGeom(geom)
 
-        return NodePath(node)
+        coin = NodePath(node)
+        coin.setColor(1.0, 0.84, 0, 1)
+        return coin
 
-    def spawnCoinOnTerrain(self):
-        coin = self.createCoinModel()
-        coin.reparentTo(self.game.render)
-
-        x = random.uniform(-35, 35)
-        y = random.uniform(-35, 35)
-        z = 0.5
-
-        coin.setPos(x, y, z)
-        coin.setHpr(0, 90, 0)
-
-        coin_spin = coin.hprInterval(2, Point3(360, 90, 0))
-        coin_spin.loop()
-
-        coin_bounce = Sequence(
-            coin.posInterval(1, Point3(x, y, z + 0.2), blendType="easeInOut"),
-            coin.posInterval(1, Point3(x, y, z), blendType="easeInOut"),
-        )
-        coin_bounce.loop()
-
-        self.terrainCoins.append(
-            {
-                "model": coin,
-                "spin": coin_spin,
-                "bounce": coin_bounce,
-                "pos": Point3(x, y, z),
-            }
-        )
+    def createTerrainCoin(self):
+        return self.prototype.copyTo(self.game.render)
 
     def spawnFlyingCoin(self, position):
-        coin = self.createCoinModel()
-        coin.reparentTo(self.game.render)
+        coin = self.prototype.copyTo(self.game.render)
         coin.setPos(position)
         coin.setHpr(0, 90, 0)
 
         coin_pos = coin.getPos()
         player_pos = self.game.player.root.getPos()
 
+        # The world counts the coin once it has flown the same time.
         coin_sequence = Sequence(
-            coin.posInterval(1.0, player_pos, startPos=coin_pos, blendType="easeIn"),
+            coin.posInterval(
+                COIN_FLIGHT, player_pos, startPos=coin_pos, blendType="easeIn"
+            ),
             Func(self.collectFlyingCoin, coin),
         )
-        coin_sequence.start()
+        self.game.intervals.play(coin, coin_sequence, "coin")
 
     def collectFlyingCoin(self, coin):
         self.createCoinCollectionEffect(self.game.player.root.getPos())
-
-        self.game.coins += 3
-        self.game.hud.updateCoins(self.game.coins)
-
         coin.removeNode()
 
-    def checkCollisions(self, player_pos):
-        for coin in self.terrainCoins[:]:
-            coin_pos = coin["model"].getPos()
-            if (coin_pos - player_pos).length() < self.coin_radius:
-                self.collectTerrainCoin(coin)
-
-    def collectTerrainCoin(self, coin):
-        self.createCoinCollectionEffect(coin["pos"])
-
-        coin["spin"].finish()
-        coin["bounce"].finish()
-        coin["model"].removeNode()
-        self.terrainCoins.remove(coin)
-
-        self.game.coins += 5
-        self.game.hud.updateCoins(self.game.coins)
-
-        self.spawnCoinOnTerrain()
-
     def createCoinCollectionEffect(self, position):
-        for i in range(8):
-            particle = self.game.createBox(0.1, 0.1, 0.1, (1.0, 0.84, 0, 1))
-            particle.reparentTo(self.game.render)
-            particle.setPos(position)
-
-            angle = random.uniform(0, 2 * math.pi)
-            height = random.uniform(0.5, 1.5)
-            end_pos = Point3(
-                position.x + math.cos(angle) * 1.5,
-                position.y + math.sin(angle) * 1.5,
-                position.z + height,
-            )
-
-            particle_seq = Sequence(
-                particle.posInterval(0.5, end_pos, blendType="easeOut"),
-                particle.scaleInterval(0.3, 0.01),
-                Func(particle.removeNode),
-            )
-            particle_seq.start()
+        self.game.screenEffects.particles.emit("coin", position, (1.0, 0.84, 0, 1))
@@ -0,0 +1,165 @@
+import numpy as np
+from direct.showbase.DirectObject import DirectObject
+from panda3d.core import Point3, Shader
+
+from core import config
+from core.profiling import notify
+from sim.pickups import (
+    ADDED_EVENT,
+    BOUNCE_PERIOD,
+    COLLECTED_EVENT,
+    REMOVED_EVENT,
+    bounceLift,
+)
+
+
+class PickupAnimator:
+    """
+    Spins and bobs every pickup lying on the ground. Each pickup turns once
+    every two seconds and eases up by its bounce height and back down in the
+    same time, timed on the world's clock from when the world put it down,
+    so it is drawn at the height the world collects it at. The motion is
+    kept in arrays and drawn by draw() in one of two modes:
+
+    - "shader": nodes stay at their resting transform and
+      assets/shaders/pickup.vert turns and lifts them from the time draw()
+      passes in, so animating costs nothing per pickup on the CPU.
+    - "task": draw() writes every node's transform from the arrays, for
+      cards without shader support.
+    """
+
+    SPIN_PERIOD = 2.0
+    BOUNCE_PERIOD = BOUNCE_PERIOD
+
+    def __init__(self, game):
+        self.game = game
+        self.root = game.render.attachNewNode("pickups")
+        self.nodes = []
+        self.rows = {}
+        self.bases = np.zeros((0, 3))
+        self.heights = np.zeros(0)
+        self.starts = np.zeros(0)
+
+        self.mode = config.pickup_animation.getValue()
+        gsg = game.win.getGsg() if game.win else None
+        if self.mode == "shader" and not (gsg and gsg.getSupportsBasicShaders()):
+            notify.warning("shaders unavailable, animating pickups on the CPU")
+            self.mode = "task"
+        if self.mode == "shader":
+            self.root.setShader(
+                Shader.load(
+                    Shader.SL_GLSL,
+                    vertex="assets/shaders/pickup.vert",
+                    fragment="assets/shaders/instanced_prop.frag",
+                )
+            )
+            self.root.setShaderInput("time", 0.0)
+
+    def add(self, node, base, bounce, start):
+        """
+        Animate node, a child of root, around base (its resting position)
+        from world time start.
+        """
+        row = len(self.nodes)
+        if row == len(self.starts):
+            capacity = max(16, 2 * row)
+            self.bases = np.resize(self.bases, (capacity, 3))
+            self.heights = np.resize(self.heights, capacity)
+            self.starts = np.resize(self.starts, capacity)
+        self.rows[node.getKey()] = row
+        self.nodes.append(node)
+        self.bases[row] = tuple(base)
+        self.heights[row] = bounce
+        self.starts[row] = start
+        node.setPosHpr(base, (0, 90, 0))
+        if self.mode == "shader":
+            node.setShaderInput(
+                "motion",
+                (self.starts[row], bounce, self.SPIN_PERIOD, self.BOUNCE_PERIOD),
+            )
+
+    def remove(self, node):
+        """Stop animating node; the last row moves into its place."""
+        row = self.rows.pop(node.getKey(), None)
+        if row is None:
+            return
+        last = len(self.nodes) - 1
+        if row != last:
+            moved = self.nodes[row] = self.nodes[last]
+            self.rows[moved.getKey()] = row
+            self.bases[row] = self.bases[last]
+            self.heights[row] = self.heights[last]
+            self.starts[row] = self.starts[last]
+        self.nodes.pop()
+
+    def discard(self, node):
+        """Stop animating node and remove it."""
+        self.remove(node)
+        node.removeNode()
+
+    def positions(self, time, rows=slice(None)):
+        """Where the pickups in rows are at world time time."""
+        n = len(self.nodes)
+        age = time - self.starts[:n][rows]
+        positions = self.bases[:n][rows].copy()
+        positions[..., 2] += bounceLift(age, self.heights[:n][rows], self.BOUNCE_PERIOD)
+        return positions
+
+    def headings(self, time):
+        age = time - self.starts[: len(self.nodes)]
+        return (age / self.SPIN_PERIOD % 1) * 360
+
+    def draw(self, alpha):
+        """Draw the pickups alpha of the way from the previous tick to the last."""
+        game = self.game
+        time = game.world.time + (alpha - 1) * game.simulation.dt
+        if self.mode == "shader":
+            self.root.setShaderInput("time", time)
+        elif self.nodes:
+            positions = self.positions(time)
+            for node, (x, y, z), h in zip(
+                self.nodes, positions.tolist(), self.headings(time).tolist()
+            ):
+                node.setPosHpr(x, y, z, h, 90, 0)
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+class PickupManager(DirectObject):
+    """
+    Draws the pickups lying on the ground in the world (game.world.pickups),
+    whatever their kind. Each kind registers how to make its model and,
+    optionally, what to show when the player collects one; the nodes come
+    and go with the world's pickup events and the animator moves them.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.animator = PickupAnimator(game)
+        self.kinds = {}
+        self.nodes = {}
+        self.accept(ADDED_EVENT, self.pickupAdded)
+        self.accept(REMOVED_EVENT, self.pickupRemoved)
+        self.accept(COLLECTED_EVENT, self.pickupCollected)
+
+    def register(self, kind, createModel, collected=None):
+        """Draw kind with createModel(); call collected(position) on pickup."""
+        self.kinds[kind] = (createModel, collected)
+
+    def pickupAdded(self, key, kind, base, bounce, start):
+        node = self.kinds[kind][0]()
+        node.reparentTo(self.animator.root)
+        self.nodes[key] = node
+        self.animator.add(node, base, bounce, start)
+
+    def pickupRemoved(self, key):
+        self.animator.discard(self.nodes.pop(key))
+
+    def pickupCollected(self, kind, position):
+        collected = self.kinds[kind][1]
+        if collected is not None:
+            collected(Point3(*position))
+
+    def __len__(self):
+        return len(self.nodes)
@@ -1,56 +1,44 @@
-import math
-import random
-
-from direct.interval.IntervalGlobal import (
-    Func,
-    LerpColorInterval,
-    Parallel,
-    Sequence,
-    Wait,
-)
+from direct.showbase.DirectObject import DirectObject
 from panda3d.core import Point3
 
+from core import config
+from core.pool import NodePool
+from sim.projectiles import FIRED_EVENT, REMOVED_EVENT, WEAPONS
+
+
+class ProjectileManager(DirectObject):
+    """
+    Draws the world's projectiles (game.world.projectiles) and aims new
+    ones. Each projectile in flight is a node from its weapon's pool, kept
+    with its weapon under the projectile's key.
+    """
 
-class ProjectileManager:
     def __init__(self, game):
         self.game = game
-        self.projectiles = []
-        self.canShoot = True
-        self.lastShootTime = 0
-
-        self.weaponProperties = {
-            "dart": {
-                "damage": 1,
-                "speed": 30,
-                "cooldown": 0.3,  # Faster shooting
-                "size": (0.1, 0.5, 0.1),
-                "color": (0.8, 0.8, 0, 1),  # Yellow
-                "description": "Fast but weak",
-            },
-            "katana": {
-                "damage": 2,
-                "speed": 45,
-                "cooldown": 0.6,  # Slower shooting
-                "size": (0.2, 1.0, 0.2),
-                "color": (0.7, 0.7, 0.7, 1),  # Silver
-                "description": "Powerful but slow",
-            },
+        self.weaponProperties = WEAPONS
+        self.models = {}
+
+        # Shots are recycled from pools of one flattened box per weapon, so
+        # firing creates no nodes once the pools are warm.
+        size = config.projectile_pool_size.getValue()
+        self.pools = {
+            weaponType: NodePool(
+                self.createPrototype(props["size"], props["color"]), game.render, size
+            )
+            for weaponType, props in self.weaponProperties.items()
         }
 
-    def shootProjectile(self):
-        if not self.canShoot or self.game.gameState != "playing":
-            return
+        self.accept(FIRED_EVENT, self.projectileFired)
+        self.accept(REMOVED_EVENT, self.recycle)
 
-        weaponType = self.game.weaponType
-        weaponProps = self.weaponProperties[weaponType]
+    def createPrototype(self, size, color):
+        box = self.game.createBox(size[0], size[1], size[2], color)
+        box.flattenStrong()
+        return box
 
-        projectile_model = self.game.createBox(
-            weaponProps["size"][0],
-            weaponProps["size"][1],
-            weaponProps["size"][2],
-            weaponProps["color"],
-        )
-        projectile_model.reparentTo(self.game.render)
+    def shootProjectile(self):
+        if self.game.gameState != "playing":
+            return
 
         # Set position based on camera mode
         if self.game.player.camera_mode == "first-person":
@@ -62,8 +50,9 @@ class ProjectileManager:
             start_pos = self.game.player.weapon_holder.getPos(self.game.render)
 
             # Get mouse position and calculate shooting direction
-            if self.game.mouseWatcherNode.hasMouse():
-                mpos = self.game.mouseWatcherNode.getMouse()
+            mouse = self.game.mouseWatcherNode
+            if mouse is not None and mouse.hasMouse():
+                mpos = mouse.getMouse()
                 near_point = Point3()
                 far_point = Point3()
 
@@ -94,143 +83,49 @@ class ProjectileManager:
                 # Default to forward if mouse not available
                 direction = self.game.camera.getQuat(self.game.render).getForward()
 
+        self.game.world.shoot(tuple(start_pos), tuple(direction))
+        self.game.dispatchEvents()
+
+    def projectileFired(self, key, weaponType, start, direction):
+        model = self.pools[weaponType].acquire()
+        self.models[key] = (weaponType, model)
+
         # Set the projectile position and orientation
-        projectile_model.setPos(start_pos)
+        start_pos = Point3(*start)
+        model.setPos(start_pos)
 
         # Make the projectile look in the direction it's traveling
-        look_at = start_pos + direction * 10
-        projectile_model.lookAt(look_at)
+        model.lookAt(start_pos + Point3(*direction) * 10)
 
         # Create a visual effect for shooting
-        self.createShootEffect(start_pos, direction)
-
-        # Add projectile to the list with its properties
-        self.projectiles.append(
-            {
-                "model": projectile_model,
-                "direction": direction,
-                "type": weaponType,
-                "damage": weaponProps["damage"],
-            }
-        )
-
-        # Set cooldown
-        self.canShoot = False
-        self.lastShootTime = self.game.taskMgr.globalClock.getFrameTime()
+        self.createShootEffect(start_pos, Point3(*direction))
 
     def createShootEffect(self, position, direction):
-        # Create a quick muzzle flash effect
-        flash = self.game.createBox(0.2, 0.2, 0.2, (1, 0.8, 0, 0.8))  # Yellow-orange
-        flash.reparentTo(self.game.render)
-        flash.setPos(position + direction * 0.5)  # Slightly in front of gun
-
-        # Create a fade-out effect
-        fade_out = LerpColorInterval(flash, 0.2, (1, 0.8, 0, 0), (1, 0.8, 0, 0.8))
-        fade_out.start()
-
-        # Remove the flash after the fade
-        Sequence(Wait(0.2), Func(flash.removeNode)).start()
+        # A quick muzzle flash slightly in front of the gun
+        self.game.screenEffects.particles.emit(
+            "flash", position + direction * 0.5, (1, 0.8, 0, 0.8)
+        )
 
     def createUpgradeEffect(self, position):
         """Create a sparkle effect around the weapon when upgrading"""
-        # Create a sparkle effect around the weapon
-        for i in range(20):
-            particle = self.game.createBox(
-                0.1, 0.1, 0.1, (1, 1, 1, 0.8)
-            )  # White sparkle
-            particle.reparentTo(self.game.render)
-            particle.setPos(position)
-
-            # Random direction for the sparkle
-            angle = random.uniform(0, 2 * math.pi)
-            height = random.uniform(0.2, 1.0)
-            end_pos = Point3(
-                position.x + math.cos(angle) * 1,
-                position.y + math.sin(angle) * 1,
-                position.z + height,
-            )
+        self.game.screenEffects.particles.emit("sparkle", position, (1, 1, 1, 0.8))
 
-            # Create animation sequence with color change
-            particle_seq = Sequence(
-                Parallel(
-                    particle.posInterval(0.5, end_pos, blendType="easeOut"),
-                    LerpColorInterval(particle, 0.5, (1, 0.5, 0, 0), (1, 1, 1, 0.8)),
-                ),
-                Func(particle.removeNode),
-            )
-            particle_seq.start()
-
-    def createBalloonPopEffect(self, position, color):
-        # Create a simple balloon pop effect using custom particles
-        for _ in range(12):
-            # Create small fragments of the balloon
-            fragment = self.game.createBox(0.2, 0.2, 0.2, color)
-            fragment.reparentTo(self.game.render)
-            fragment.setPos(position)
-
-            # Random direction for the fragment
-            angle = random.uniform(0, 2 * math.pi)
-            height = random.uniform(0.5, 2.0)
-            end_pos = Point3(
-                position.x + math.cos(angle) * 2,
-                position.y + math.sin(angle) * 2,
-                position.z + height,
-            )
+    def draw(self, alpha):
+        """Draw the projectiles alpha of the way from the previous tick to the last."""
+        swarm = self.game.world.projectiles
+        n = swarm.count
+        if not n:
+            return
+        previous = swarm.previous_positions[:n]
+        positions = previous + (swarm.positions[:n] - previous) * alpha
+        models = self.models
+        for key, (x, y, z) in zip(swarm.keys[:n].tolist(), positions.tolist()):
+            models[key][1].setPos(x, y, z)
 
-            # Create animation sequence
-            fragment_seq = Sequence(
-                fragment.posInterval(0.6, end_pos, blendType="easeOut"),
-                fragment.scaleInterval(0.3, 0.01),  # Shrink to nothing
-                Func(fragment.removeNode),
-            )
-            fragment_seq.start()
-
-    def update(self, dt):
-        """Update all projectiles and handle shooting cooldown"""
-        # Update shooting cooldown
-        current_time = self.game.taskMgr.globalClock.getFrameTime()
-        weaponType = self.game.weaponType
-
-        if not self.canShoot:
-            if (
-                current_time - self.lastShootTime
-                >= self.weaponProperties[weaponType]["cooldown"]
-            ):
-                self.canShoot = True
-
-        # Update projectiles
-        for projectile in self.projectiles[:]:
-            # Move the projectile forward
-            speed = self.weaponProperties[projectile["type"]]["speed"]
-            projectile["model"].setY(projectile["model"], dt * speed)
-
-            # Check for collision with balloons
-            for balloon in self.game.balloonManager.balloons[:]:
-                projectile_pos = projectile["model"].getPos()
-                balloon_pos = balloon["model"].getPos()
-
-                if (projectile_pos - balloon_pos).length() < 1.5:
-                    # Apply damage to the balloon
-                    self.game.balloonManager.takeDamage(balloon, projectile["damage"])
-
-                    # Remove the projectile
-                    projectile["model"].removeNode()
-                    if projectile in self.projectiles:
-                        self.projectiles.remove(projectile)
-                    break
-
-            # Remove if too far away or already hit something
-            if projectile in self.projectiles:
-                projectile_pos = projectile["model"].getPos()
-                player_pos = self.game.player.root.getPos()
-
-                if (projectile_pos - player_pos).length() > 50:
-                    projectile["model"].removeNode()
-                    self.projectiles.remove(projectile)
+    def recycle(self, key):
+        weaponType, model = self.models.pop(key)
+        self.pools[weaponType].release(model)
 
     def reset(self):
-        for projectile in self.projectiles:
-            projectile["model"].removeNode()
-        self.projectiles = []
-        self.canShoot = True
-        self.lastShootTime = 0
+        for key in list(self.models):
+            self.recycle(key)
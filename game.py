@@ -1,4 +1,4 @@
-import random
+import atexit
 
 from direct.showbase.ShowBase import ShowBase
 from direct.task import Task
@@ -6,19 +6,30 @@ from panda3d.core import (
     AmbientLight,
     CardMaker,
     DirectionalLight,
-    NodePath,
+    Point3,
     TextureStage,
-    WindowProperties,
 )
 
+from core import config
+from core.assets import ASSET_MANIFEST, AssetCache
+from core.boxes import BoxFactory
 from core.effects import Effects
 from core.input import InputController
+from core.intervals import IntervalRegistry
+from core.playback import Playback
+from core.profiling import StartupTimer, cullStats, measureFrames, notify
+from core.simulation import FixedStepLoop
+from core.world import StaticWorld, instancingSupported
 from entities.balloon import BalloonManager
 from entities.coin import CoinManager
 from entities.heart import HeartManager
 from entities.katana import KatanaManager
+from entities.pickup import PickupManager
 from entities.player import Player
 from entities.projectile import ProjectileManager
+from sim.replay import Recorder, Replay
+from sim.streams import RandomStreams
+from sim.world import GAME_OVER_EVENT, World, sceneryLayout
 from ui.hud import HUD
 from ui.menu import MenuManager
 from ui.minimap import Minimap
@@ -26,20 +37,48 @@ from ui.minimap import Minimap
 
 class MonkeyDartGame(ShowBase):
     def __init__(self):
-        ShowBase.__init__(self)
+        self.startupTimer = StartupTimer()
+        with self.startupTimer.section("window"):
+            ShowBase.__init__(self)
 
         self.disableMouse()
+        self.setBackgroundColor(0.5, 0.8, 0.9, 1)
 
         self.gameState = "menu"  # "menu", "playing", "gameover"
 
-        self.score = 0
-        self.coins = 0
-        self.weaponType = "dart"
-        self.owned_weapons = ["dart"]
-        self.current_weapon_index = 0
+        # The game rules run in self.world, built by loadWorld; the rest of
+        # the game draws it and feeds it input, or plays back a recording.
+        self.playback = None
+        self.inputRecorder = None
+        seed = config.sim_seed.getValue()
+        seed = None if seed < 0 else seed
+        replay_file = config.replay_file.getValue()
+        if replay_file:
+            replay = Replay.load(replay_file.toOsSpecific())
+            self.playback = Playback(self, replay)
+            seed = replay.seed
+        self.streams = RandomStreams(seed)
+        notify.info(f"seed {self.streams.seed}")
+        self.world = None
+        self.hudShown = None
+
+        self.assets = AssetCache(self.loader, self.startupTimer, task_mgr=self.taskMgr)
+        self.assets.preflight()
+        self.intervals = IntervalRegistry()
+        self.boxes = BoxFactory(config.box_cache_size.getValue())
+        self.pickups = PickupManager(self)
+        self.simulation = FixedStepLoop(
+            config.sim_tick_rate.getValue(), config.sim_max_steps.getValue()
+        )
 
+        # Created by loadWorld while the main menu is already up.
         self.obstacles = []
-        self.setupScene()
+        self.staticWorld = None
+        self.balloonManager = None
+        self.coinManager = None
+        self.heartManager = None
+        self.katanaManager = None
+
         self.player = Player(self)
         self.projectileManager = ProjectileManager(self)
         self.screenEffects = Effects(self)
@@ -47,22 +86,75 @@ class MonkeyDartGame(ShowBase):
         self.hud = HUD(self)
         self.minimap = Minimap(self)
         self.inputController = InputController(self, self.player)
-        self.playerInvulnerable = False
 
         self.player.initializeCamera()
 
         self.taskMgr.add(self.updateGame, "UpdateGameTask")
+        self.accept(GAME_OVER_EVENT, self.gameOver)
 
-        props = WindowProperties()
-        props.setCursorHidden(False)
-        self.win.requestProperties(props)
+        self.inputController.hideMouseCursor(False)
 
-        self.balloonManager = BalloonManager(self)
-        self.coinManager = CoinManager(self)
-        self.heartManager = HeartManager(self)
-        self.katanaManager = KatanaManager(self)
+        # Runs right after igLoop has rendered the first frame.
+        self.taskMgr.add(self.markFirstFrame, "FirstFrameTask", sort=55)
+        self.taskMgr.add(self.loadWorld, "LoadWorldTask")
+
+    def markFirstFrame(self, task):
+        self.startupTimer.mark("first frame")
+        return Task.done
+
+    async def loadWorld(self, task):
+        """
+        Stream every startup asset on the loader thread while the menu is
+        interactive, then build the world from the now-resident assets and
+        enable Start Game.
+        """
+        jobs = []
+        for path, _ in ASSET_MANIFEST:
+            if path.endswith(".png"):
+                jobs.append((path, self.assets.loadTextureAsync(path)))
+            else:
+                jobs.append((path, self.assets.loadModelAsync(path)))
+        border = self.assets.runInBackground(self.screenEffects.loadBorderTexture)
+        jobs.append(("border gradient", border))
+
+        total = len(jobs) + 2
+        for done, (label, future) in enumerate(jobs, 1):
+            await future
+            self.menuManager.setLoadingProgress(done / total, label)
+
+        # The rest runs on the main thread; yield a frame between the two
+        # halves so the menu stays responsive.
+        with self.startupTimer.section("scene"):
+            self.setupScene()
+        self.menuManager.setLoadingProgress((total - 1) / total, "scene")
+        await Task.pause(0)
+
+        with self.startupTimer.section("managers"):
+            self.screenEffects.setupOverlay(border.result())
+            if self.playback is not None:
+                self.obstacles = self.playback.replay.obstacles
+            self.world = World(self.obstacles, self.streams.seed)
+            if config.record_file.getValue() and self.playback is None:
+                self.inputRecorder = Recorder(self.world)
+                atexit.register(self.saveRecording)
+            self.balloonManager = BalloonManager(self)
+            self.coinManager = CoinManager(self)
+            self.heartManager = HeartManager(self)
+            self.katanaManager = KatanaManager(self)
+            self.setupSimulation()
+            self.dispatchEvents()
+        self.menuManager.setLoadingProgress(1, "managers")
+
+        self.menuManager.finishLoading()
+        self.startupTimer.mark("interactive")
+        cache_state = "cold" if self.assets.misses else "warm"
+        self.startupTimer.report(f"startup ({cache_state} asset cache)")
+        if self.playback is not None:
+            self.playback.start()
 
     def pauseGame(self):
+        if self.gameState not in ("playing", "paused"):
+            return
         self.gameState = "paused" if self.gameState == "playing" else "playing"
         if self.gameState == "paused":
             self.menuManager.showPauseMenu()
@@ -79,50 +171,50 @@ class MonkeyDartGame(ShowBase):
         ground.setP(-90)
         ground.setZ(-0.5)
 
-        ground_texture = self.loader.loadTexture("assets/models/ground.png")
+        ground_texture = self.assets.loadTexture("assets/models/ground.png")
         ground.setTexture(ground_texture)
         ground.setTexScale(TextureStage.getDefault(), 16, 16)
 
-        self.tree_model = self.loader.loadModel("assets/models/birch_tree.egg")
-        self.sunflower_model = self.loader.loadModel("assets/models/sunflower.bam")
-        self.cranberry_model = self.loader.loadModel(
+        self.tree_model = self.assets.loadModel("assets/models/birch_tree.egg")
+        self.sunflower_model = self.assets.loadModel("assets/models/sunflower.bam")
+        self.cranberry_model = self.assets.loadModel(
             "assets/models/european_cranberry_bush.egg"
         )
-        self.rock_model = self.loader.loadModel("assets/models/rock.bam")
-        rock_texture = self.loader.loadTexture("assets/models/rock.png")
-        self.rock_model.setTexture(rock_texture)
-
-        for _ in range(50):
-            tree = self.tree_model.copyTo(self.render)
-            tx = random.uniform(-75, 75)
-            ty = random.uniform(-75, 75)
-            tree.setPos(tx, ty, -0.2)
-            tree.setH(random.uniform(0, 360))
-            self.obstacles.append((tree, 1.5, 3))
-            tree.setScale(random.uniform(0.8, 1.2))
-
-            sunflower = self.sunflower_model.copyTo(self.render)
-            sx = random.uniform(-75, 75)
-            sy = random.uniform(-75, 75)
-            sunflower.setPos(sx, sy, -0.4)
-            sunflower.setH(random.uniform(0, 360))
-            sunflower.setScale(random.uniform(0.2, 0.3))
-
-            rock = self.rock_model.copyTo(self.render)
-            rx = random.uniform(-75, 75)
-            ry = random.uniform(-75, 75)
-            rock.setPos(rx, ry, -0.4)
-            rock.setH(random.uniform(0, 360))
-            rock.setScale(random.uniform(0.8, 1.2))
-            self.obstacles.append((rock, 2.0, 0.5))
-
-            cranberry = self.cranberry_model.copyTo(self.render)
-            cx = random.uniform(-75, 75)
-            cy = random.uniform(-75, 75)
-            cranberry.setPos(cx, cy, 0.0)
-            cranberry.setH(random.uniform(0, 360))
-            cranberry.setScale(random.uniform(2.0, 3.0))
-            self.obstacles.append((cranberry, 2.0, 1.7))
+        self.rock_model = self.assets.loadModel("assets/models/rock.bam")
+        rock_texture = self.assets.loadTexture("assets/models/rock.png")
+        if self.rock_model is not None and rock_texture is not None:
+            self.rock_model.setTexture(rock_texture)
+
+        scenery_mode = config.scenery_mode.getValue()
+        if scenery_mode == "instanced" and not instancingSupported(
+            self.win.getGsg()
+        ):
+            notify.warning("hardware instancing unavailable, using chunked scenery")
+            scenery_mode = "chunked"
+        self.staticWorld = StaticWorld(
+            self.render,
+            extent=80,
+            chunk_size=config.scenery_chunk_size.getValue(),
+            mode=scenery_mode,
+        )
+        # Scenery is optional: a prop whose model is missing is left out,
+        # together with its obstacle.
+        models = {
+            "tree": self.tree_model,
+            "sunflower": self.sunflower_model,
+            "rock": self.rock_model,
+            "cranberry": self.cranberry_model,
+        }
+        layout = sceneryLayout(
+            self.streams.get("scenery"), config.scenery_prop_count.getValue()
+        )
+        for name, pos, heading, scale, obstacle in layout:
+            if models[name] is None:
+                continue
+            self.staticWorld.addProp(models[name], Point3(*pos), heading, scale)
+            if obstacle is not None:
+                self.obstacles.append((pos, *obstacle))
+        self.staticWorld.build()
 
         ambientLight = AmbientLight("ambient light")
         ambientLight.setColor((0.3, 0.3, 0.3, 1))
@@ -135,70 +227,115 @@ class MonkeyDartGame(ShowBase):
         directionalLightNP.setHpr(45, -45, 0)
         self.render.setLight(directionalLightNP)
 
-        self.setBackgroundColor(0.5, 0.8, 0.9, 1)
+    def reportSceneStats(self):
+        if self.staticWorld is None:
+            return
+        counts = self.intervals.counts()
+        notify.info(
+            "intervals: "
+            + ", ".join(f"{kind} {count}" for kind, count in sorted(counts.items()))
+        )
+        pools = dict(self.projectileManager.pools)
+        if self.balloonManager.pool is not None:
+            pools["balloon"] = self.balloonManager.pool
+        for name, pool in sorted(pools.items()):
+            stats = pool.stats()
+            notify.info(
+                f"{name} pool: {stats['live']} live, {stats['free']} free, "
+                f"{stats['hits']} hits, {stats['misses']} misses"
+            )
+        notify.info(
+            f"pickups: {len(self.pickups)} on the ground, "
+            f"animated by {self.pickups.animator.mode}"
+        )
+        stats = self.simulation.stats()
+        notify.info(
+            f"simulation: {stats['ticks']} ticks at {stats['rate']} Hz, "
+            f"{stats['dropped']:.2f} s dropped"
+        )
+        stats = self.boxes.stats()
+        notify.info(
+            f"box geoms: {stats['sizes']} cached, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['evictions']} evictions"
+        )
+        stats = self.screenEffects.particles.stats()
+        notify.info(
+            f"particles: {stats['live']} live of {stats['budget']}, "
+            f"peak {stats['peak']}, {stats['dropped']} dropped"
+        )
+        counts = self.staticWorld.counts_after
+        cull = cullStats(self.staticWorld.root, self.cam)
+        notify.info(
+            f"scenery ({self.staticWorld.mode}): "
+            f"{counts['geoms']} geoms in {counts['nodes']} nodes, "
+            f"{cull['visible_geoms']} visible draw calls, "
+            f"{cull['tested']} nodes culled in {cull['cull_ms']:.2f} ms, "
+            f"frame {measureFrames(self):.2f} ms"
+        )
 
     def createBox(self, width, depth, height, color=(1, 1, 1, 1)):
-        box = NodePath("box")
-
-        half_width = width / 2
-        half_depth = depth / 2
-        half_height = height / 2
-
-        cm = CardMaker("bottom")
-        cm.setFrame(-half_width, half_width, -half_depth, half_depth)
-        bottom = box.attachNewNode(cm.generate())
-        bottom.setP(-90)
-        bottom.setZ(-half_height)
-        bottom.setColor(*color)
-
-        cm = CardMaker("top")
-        cm.setFrame(-half_width, half_width, -half_depth, half_depth)
-        top = box.attachNewNode(cm.generate())
-        top.setP(90)
-        top.setZ(half_height)
-        top.setColor(*color)
-
-        cm = CardMaker("front")
-        cm.setFrame(-half_width, half_width, -half_height, half_height)
-        front = box.attachNewNode(cm.generate())
-        front.setY(half_depth)
-        front.setColor(*color)
-
-        cm = CardMaker("back")
-        cm.setFrame(-half_width, half_width, -half_height, half_height)
-        back = box.attachNewNode(cm.generate())
-        back.setY(-half_depth)
-        back.setH(180)
-        back.setColor(*color)
-
-        cm = CardMaker("left")
-        cm.setFrame(-half_depth, half_depth, -half_height, half_height)
-        left = box.attachNewNode(cm.generate())
-        left.setX(-half_width)
-        left.setH(90)
-        left.setColor(*color)
-
-        cm = CardMaker("right")
-        cm.setFrame(-half_depth, half_depth, -half_height, half_height)
-        right = box.attachNewNode(cm.generate())
-        right.setX(half_width)
-        right.setH(-90)
-        right.setColor(*color)
-
-        return box
+        return self.boxes.create(width, depth, height, color)
+
+    @property
+    def score(self):
+        return self.world.score
+
+    @property
+    def coins(self):
+        return self.world.coins
+
+    @property
+    def weaponType(self):
+        return self.world.weapon
+
+    @property
+    def owned_weapons(self):
+        return self.world.owned_weapons
+
+    def setupSimulation(self):
+        simulation = self.simulation
+        simulation.add("world", self.stepWorld)
+        simulation.addRenderer(self.player.draw)
+        simulation.addRenderer(self.balloonManager.draw)
+        simulation.addRenderer(self.projectileManager.draw)
+        simulation.addRenderer(self.pickups.animator.draw)
+
+    def stepWorld(self, dt):
+        if self.playback is not None:
+            self.playback.tick()
+        else:
+            self.world.step(dt, self.inputController.controls())
+        self.dispatchEvents()
+
+    def dispatchEvents(self):
+        """Pass what happened in the world on to the entities drawing it."""
+        for name, args in self.world.takeEvents():
+            self.messenger.send(name, list(args))
+        self.refreshHud()
+
+    def refreshHud(self):
+        world = self.world
+        shown = (world.score, world.coins, world.weapon, world.player.health)
+        if shown == self.hudShown:
+            return
+        score, coins, weapon, health = shown
+        last = self.hudShown or (None, None, None, None)
+        if score != last[0]:
+            self.hud.updateScore(score)
+        if coins != last[1]:
+            self.hud.updateCoins(coins)
+        if weapon != last[2]:
+            self.hud.updateWeapon(weapon)
+            self.player.switchWeapon(weapon)
+        if health != last[3]:
+            self.hud.refreshHearts(health)
+        self.hudShown = shown
 
     def updateGame(self, task):
         if self.gameState != "playing":
             return Task.cont
+        self.simulation.advance(self.taskMgr.globalClock.getDt())
         self.screenEffects.balloonAlert()
-        dt = task.time - task.lastTime if hasattr(task, "lastTime") else 0
-        task.lastTime = task.time
-
-        self.balloonManager.update(dt)
-        self.projectileManager.update(dt)
-        self.coinManager.checkCollisions(self.player.root.getPos())
-        self.heartManager.checkCollisions(self.player.root.getPos())
-        self.katanaManager.checkCollisions(self.player.root.getPos())
         return Task.cont
 
     def startGame(self):
@@ -207,26 +344,36 @@ class MonkeyDartGame(ShowBase):
         self.hud.show()
         self.minimap.show()
 
-        self.score = 0
-        self.weaponType = "dart"
-        self.current_weapon_index = 0
-
+        self.world.reset()
+        self.dispatchEvents()
         self.player.reset()
         self.balloonManager.reset()
         self.projectileManager.reset()
+        # Flying coins land at once; their puffs go with the other particles.
+        self.intervals.finishKind("coin")
+        self.screenEffects.particles.clear()
+        self.simulation.reset()
 
-        self.hud.updateScore(self.score)
-        self.hud.updateCoins(self.coins)
-        self.hud.updateWeapon(self.weaponType)
-        self.hud.refreshHearts()
+        self.hudShown = None
+        self.refreshHud()
 
     def gameOver(self):
         self.gameState = "gameover"
+        self.simulation.halt()
         self.hud.hide()
         self.minimap.hide()
         self.inputController.hideMouseCursor(False)  # Show cursor
 
         self.menuManager.showGameOver(self.score)
+        self.saveRecording()
+        if self.playback is not None:
+            self.playback.roundOver()
+
+    def saveRecording(self):
+        if self.inputRecorder is not None:
+            path = config.record_file.getValue()
+            self.inputRecorder.save(path.toOsSpecific())
+            notify.info(f"recorded {self.inputRecorder.ticks} ticks to {path}")
 
     def restartGame(self):
         self.menuManager.hideGameOver()
@@ -239,27 +386,20 @@ class MonkeyDartGame(ShowBase):
         self.menuManager.hidePauseMenu()
         self.inputController.hideMouseCursor(False)
 
-    def upgradeWeapon(self):
-        if self.weaponType == "dart" and self.coins >= 50:
-            self.coins -= 50
-            self.weaponType = "katana"
-            self.owned_weapons.append("katana")
-            self.player.hasKatana = True
-            self.player.switchWeapon(self.weaponType)
-
-            self.hud.updateCoins(self.coins)
-            self.hud.updateWeapon(self.weaponType)
-            self.hud.disableUpgradeButton()
-
-            self.projectileManager.createUpgradeEffect(
-                self.player.weapon_holder.getPos(self.render)
-            )
-
     def switchWeapon(self):
-        if len(self.owned_weapons) > 1:
-            self.current_weapon_index = (self.current_weapon_index + 1) % len(
-                self.owned_weapons
-            )
-            self.weaponType = self.owned_weapons[self.current_weapon_index]
-            self.player.switchWeapon(self.weaponType)
-            self.hud.updateWeapon(self.weaponType)
+        self.world.switchWeapon()
+        self.refreshHud()
+
+    def selectWeapon(self, weapon):
+        self.world.selectWeapon(weapon)
+        self.refreshHud()
+
+    def buyWeapon(self, weapon):
+        """Buy and equip weapon in the store; returns whether it was bought."""
+        if not self.world.buyWeapon(weapon):
+            return False
+        self.refreshHud()
+        self.projectileManager.createUpgradeEffect(
+            self.player.weapon_holder.getPos(self.render)
+        )
+        return True
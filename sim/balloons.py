@@ -0,0 +1,331 @@
+import math
+
+import numpy as np
+
+from core.spatial import PointGrid, segmentSphereHits
+
+# Sent as each balloon is added to or leaves the swarm, and when one changes
+# size, so a view can keep one drawn balloon per row: spawns append a row,
+# and a removal shifts the later rows down by one.
+SPAWNED_EVENT = "balloon-spawned"
+REMOVED_EVENT = "balloon-removed"
+SCALED_EVENT = "balloon-scaled"
+# Sent with the balloon's position and color when it is hit and when it pops.
+HIT_EVENT = "balloon-hit"
+POPPED_EVENT = "balloon-popped"
+
+BALLOON_COLORS = [
+    {
+        "name": "red",
+        "color": (1, 0, 0, 1),
+        "health": 2,
+        "chance": 0.20,
+        "speed_multiplier": 1.0,
+    },  # Red - Common, 2 hits
+    {
+        "name": "green",
+        "color": (0, 1, 0, 1),
+        "health": 2,
+        "chance": 0.20,
+        "speed_multiplier": 1.2,
+    },  # Green - Common, 2 hits, faster
+    {
+        "name": "blue",
+        "color": (0, 0, 1, 1),
+        "health": 3,
+        "chance": 0.20,
+        "speed_multiplier": 0.9,
+    },  # Blue - Uncommon, 3 hits, slower
+    {
+        "name": "yellow",
+        "color": (1, 1, 0, 1),
+        "health": 3,
+        "chance": 0.20,
+        "speed_multiplier": 1.1,
+    },  # Yellow - Uncommon, 3 hits, faster
+    {
+        "name": "purple",
+        "color": (1, 0, 1, 1),
+        "health": 4,
+        "chance": 0.15,
+        "speed_multiplier": 0.8,
+    },  # Purple - Rare, 4 hits, slower
+    {
+        "name": "cyan",
+        "color": (0, 1, 1, 1),
+        "health": 6,
+        "chance": 0.05,
+        "speed_multiplier": 0.7,
+    },  # Cyan - Very Rare, 6 hits, slowest
+]
+
+BALLOON_TYPES = {
+    "small": {"scale": 0.2, "points": 1, "speed_multiplier": 1.2},
+    "medium": {"scale": 0.3, "points": 2, "speed_multiplier": 1.0},
+    "large": {"scale": 0.4, "points": 3, "speed_multiplier": 0.8},
+}
+
+FIELDS = {
+    "positions": (np.float64, 3),
+    # Where each balloon was at the previous tick, for drawing in between.
+    "previous_positions": (np.float64, 3),
+    "speed_multipliers": (np.float64, None),
+    "scales": (np.float64, None),
+    "health": (np.int32, None),
+    "max_health": (np.int32, None),
+    "points": (np.int32, None),
+    "color_index": (np.int32, None),
+    "type_index": (np.int32, None),
+    "phases": (np.float64, None),
+    "hit_times": (np.float64, None),
+}
+
+
+class BalloonSwarm:
+    """
+    Every live balloon, stored as parallel arrays (one row per balloon, in
+    spawn order) so update() moves them all in one pass. Balloons spawn
+    around the player, chase them along the world's flow field and hurt
+    them on contact.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.rng = world.streams.get("balloons")
+        # Rolls for dropped coins, kept apart so loot never shifts spawns
+        self.loot = world.streams.get("loot")
+        self.bob_amplitude = 0.02
+        self.spawn_timer = 0
+        self.growth_timer = 0
+        # At most base_cap balloons, plus one for every score_per_balloon
+        # points scored.
+        self.base_cap = 10
+        self.score_per_balloon = 10
+        # firstHits() tests up to this many (segment, balloon) pairs
+        # directly rather than building a grid.
+        self.brute_force_pairs = 2048
+
+        self.balloon_colors = BALLOON_COLORS
+        self.balloon_types = BALLOON_TYPES
+        self.type_names = list(self.balloon_types)
+        self.color_table = np.array(
+            [color["color"] for color in self.balloon_colors], dtype=np.float32
+        )
+
+        self.count = 0
+        self.capacity = 0
+        self._grow(64)
+
+    def _grow(self, capacity):
+        for name, (dtype, width) in FIELDS.items():
+            shape = (capacity, width) if width else (capacity,)
+            array = np.zeros(shape, dtype=dtype)
+            if self.capacity:
+                array[: self.count] = getattr(self, name)[: self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    @property
+    def floor(self):
+        """The lowest a balloon flies."""
+        return self.bob_amplitude + 1
+
+    def livePositions(self):
+        return self.positions[: self.count]
+
+    def headings(self, player):
+        """
+        Unit direction each balloon moves in: straight at the player, with
+        the horizontal part taken from the flow field when there is one so
+        balloons go around the obstacles.
+        """
+        direction = player - self.livePositions()
+        length = np.sqrt(np.einsum("ij,ij->i", direction, direction))
+        length[length == 0] = 1
+        direction /= length[:, None]
+
+        flow = self.world.flowField
+        if flow is not None:
+            flow.update(player)
+            positions = self.livePositions()
+            steer, guided = flow.sample(positions[:, 0], positions[:, 1])
+            horizontal = np.hypot(direction[:, 0], direction[:, 1])
+            steer *= horizontal[:, None]
+            np.copyto(direction[:, :2], steer, where=guided[:, None])
+        return direction
+
+    def colorOf(self, index):
+        return self.balloon_colors[self.color_index[index]]["color"]
+
+    def _distancesSq(self, point):
+        offset = self.livePositions() - (point[0], point[1], point[2])
+        return np.einsum("ij,ij->i", offset, offset)
+
+    def anyWithin(self, point, radius):
+        return bool((self._distancesSq(point) < radius * radius).any())
+
+    def firstWithin(self, point, radius):
+        """Index of the oldest balloon within radius of point, or -1."""
+        hits = np.flatnonzero(self._distancesSq(point) < radius * radius)
+        return int(hits[0]) if len(hits) else -1
+
+    def firstHits(self, starts, ends, radius):
+        """
+        For each segment starts[i] -> ends[i], the index of the first
+        balloon it passes within radius of (or -1) and how far along the
+        segment (0..1, inf for none). Balloons are binned in a grid rebuilt
+        for the call and only those near a segment are tested; with few
+        enough pairs, every pair is tested instead, which is cheaper than
+        building the grid.
+        """
+        result = np.full(len(starts), -1, dtype=np.int64)
+        entries = np.full(len(starts), np.inf)
+        if not self.count or not len(starts):
+            return result, entries
+        positions = self.livePositions()
+        if len(starts) * self.count <= self.brute_force_pairs:
+            segments = np.repeat(np.arange(len(starts)), self.count)
+            spheres = np.tile(np.arange(self.count), len(starts))
+        else:
+            grid = PointGrid(positions[:, 0], positions[:, 1], cell_size=2 * radius)
+            segments, spheres = grid.pairs(
+                np.minimum(starts[:, 0], ends[:, 0]) - radius,
+                np.minimum(starts[:, 1], ends[:, 1]) - radius,
+                np.maximum(starts[:, 0], ends[:, 0]) + radius,
+                np.maximum(starts[:, 1], ends[:, 1]) + radius,
+            )
+        segments, spheres, entry = segmentSphereHits(
+            starts, ends, positions, radius, segments, spheres
+        )
+        # Earliest contact along each segment, the older balloon on ties.
+        order = np.lexsort((spheres, entry, segments))
+        segments, first = np.unique(segments[order], return_index=True)
+        result[segments] = spheres[order][first]
+        entries[segments] = entry[order][first]
+        return result, entries
+
+    def spawn(self):
+        rng = self.rng
+        balloon_type = rng.choice(self.type_names)
+        balloon_props = self.balloon_types[balloon_type]
+
+        total_chance = sum(color["chance"] for color in self.balloon_colors)
+        roll = rng.uniform(0, total_chance)
+        current_sum = 0
+        chosen_index = len(self.balloon_colors) - 1
+
+        for index, color_data in enumerate(self.balloon_colors):
+            current_sum += color_data["chance"]
+            if roll <= current_sum:
+                chosen_index = index
+                break
+        chosen_color = self.balloon_colors[chosen_index]
+
+        angle = rng.uniform(0, 2 * math.pi)
+
+        min_distance = 40
+        max_distance = 60
+        distance = rng.uniform(min_distance, max_distance)
+        player = self.world.player
+        x = player.x + distance * math.cos(angle)
+        y = player.y + distance * math.sin(angle)
+        z = 2 + rng.uniform(0, 4)
+
+        x = max(-75, min(75, x))
+        y = max(-75, min(75, y))
+
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+        index = self.count
+        self.count += 1
+        self.positions[index] = (x, y, z)
+        self.previous_positions[index] = (x, y, z)
+        self.speed_multipliers[index] = (
+            balloon_props["speed_multiplier"] * chosen_color["speed_multiplier"]
+        )
+        self.scales[index] = balloon_props["scale"]
+        self.health[index] = chosen_color["health"]
+        self.max_health[index] = chosen_color["health"]
+        self.points[index] = balloon_props["points"]
+        self.color_index[index] = chosen_index
+        self.type_index[index] = self.type_names.index(balloon_type)
+        self.phases[index] = rng.uniform(0, 2 * math.pi)
+        self.hit_times[index] = -1
+        self.world.emit(
+            SPAWNED_EVENT, (x, y, z), chosen_color["color"], balloon_props["scale"]
+        )
+
+    def takeDamage(self, index, damage):
+        """Damage the balloon in row index; returns True if it popped."""
+        world = self.world
+        self.health[index] -= damage
+        health_ratio = self.health[index] / self.max_health[index]
+        base_scale = self.balloon_types[self.type_names[self.type_index[index]]][
+            "scale"
+        ]
+        self.scales[index] = base_scale * (0.5 + 0.5 * health_ratio)
+        position = tuple(self.positions[index].tolist())
+        world.emit(SCALED_EVENT, index, self.scales[index])
+        world.emit(HIT_EVENT, position, self.colorOf(index))
+        self.hit_times[index] = world.time
+
+        if self.health[index] <= 0:
+            world.emit(POPPED_EVENT, position, self.colorOf(index))
+            if self.loot.random() < 0.3:
+                world.dropCoin(position)
+            world.addScore(int(self.points[index]))
+            self.remove(index)
+            return True
+        return False
+
+    def grow(self):
+        n = self.count
+        self.max_health[:n] += 1
+        self.health[:n] += 1
+        # 10% larger per growth, until the scale vector reaches length 10
+        scales = self.scales[:n]
+        growing = scales * math.sqrt(3) <= 10.0
+        scales[growing] *= 1.1
+        for index in np.flatnonzero(growing).tolist():
+            self.world.emit(SCALED_EVENT, index, scales[index])
+
+    def update(self, dt):
+        self.spawn_timer += dt
+        self.growth_timer += dt
+
+        if self.spawn_timer > 1.0:  # Every 1 second
+            self.spawn_timer = 0
+            cap = self.base_cap + self.world.score // self.score_per_balloon
+            if self.count < cap:
+                self.spawn()
+        if self.growth_timer > 10.0:
+            self.growth_timer = 0
+            self.grow()
+        if not self.count:
+            return
+
+        player = np.array(self.world.player.position)
+        positions = self.livePositions()
+        self.previous_positions[: self.count] = positions
+
+        base_speed = 2 + (self.world.score / 100)
+        step = dt * base_speed * self.speed_multipliers[: self.count]
+        positions += self.headings(player) * step[:, None]
+
+        # Never sink below the floor height; the bob is only drawn
+        np.maximum(positions[:, 2], self.floor, out=positions[:, 2])
+
+        if self.anyWithin(player, 1.5):
+            self.world.player.takeDamage(1)
+
+    def remove(self, index):
+        last = self.count - 1
+        for name in FIELDS:
+            array = getattr(self, name)
+            array[index:last] = array[index + 1 : self.count]
+        self.count = last
+        self.world.emit(REMOVED_EVENT, index)
+
+    def reset(self):
+        self.count = 0
+        self.spawn_timer = 0
@@ -0,0 +1,243 @@
+"""
+Plays many seeded, window-less sessions with the scripted bot across a
+process pool, over a grid of balloon tuning values, and writes one CSV row
+per session plus a summary per grid point.
+
+    python -m sim.batch --set red.health=2,3 --set base_cap=10,20 --seeds 100
+
+A parameter is a swarm attribute (base_cap, score_per_balloon,
+bob_amplitude) or a field of a balloon color or type named by its key,
+e.g. cyan.chance, purple.health, small.speed_multiplier.
+"""
+
+import argparse
+import copy
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sim.bot import Bot
+from sim.world import World
+
+COLUMNS = [
+    "seed",
+    "survived",
+    "over",
+    "score",
+    "coins",
+    "ticks",
+    "peak_balloons",
+    "peak_projectiles",
+    "tick_ms",
+    "max_tick_ms",
+]
+
+
+def parseValue(text):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parseGrid(settings):
+    """{name: [values]} from "name=v1,v2" settings."""
+    grid = {}
+    for setting in settings:
+        name, _, values = setting.partition("=")
+        if not values:
+            raise ValueError(f"expected name=value[,value...], got {setting!r}")
+        grid[name.strip()] = [parseValue(value) for value in values.split(",")]
+    return grid
+
+
+def gridPoints(grid):
+    """Every combination of the grid's values, as {name: value} dicts."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def applyParameters(world, params):
+    """Tune world's balloons with params; the module tables are left alone."""
+    swarm = world.balloons
+    colors = copy.deepcopy(swarm.balloon_colors)
+    types = copy.deepcopy(swarm.balloon_types)
+    tables = {color["name"]: color for color in colors}
+    tables.update(types)
+    for name, value in params.items():
+        table, _, field = name.partition(".")
+        if field:
+            if table not in tables or field not in tables[table]:
+                raise KeyError(f"unknown balloon parameter {name!r}")
+            tables[table][field] = value
+        elif hasattr(swarm, name):
+            setattr(swarm, name, value)
+        else:
+            raise KeyError(f"unknown balloon parameter {name!r}")
+    swarm.balloon_colors = colors
+    swarm.balloon_types = types
+
+
+def playSession(task):
+    """
+    Play one session of (seed, params, seconds, dt) until the player dies
+    or seconds of game time pass; returns the session's row.
+    """
+    seed, params, seconds, dt = task
+    world = World.generate(seed)
+    applyParameters(world, params)
+    bot = Bot()
+    ticks = int(round(seconds / dt))
+    peak_balloons = peak_projectiles = 0
+    slowest = 0.0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick_start = time.perf_counter()
+        world.step(dt, bot.act(world))
+        slowest = max(slowest, time.perf_counter() - tick_start)
+        world.events.clear()
+        peak_balloons = max(peak_balloons, world.balloons.count)
+        peak_projectiles = max(peak_projectiles, world.projectiles.count)
+        if world.over:
+            break
+    elapsed = time.perf_counter() - start
+    return {
+        **params,
+        "seed": seed,
+        "survived": round(world.time, 3),
+        "over": int(world.over),
+        "score": world.score,
+        "coins": world.coins,
+        "ticks": world.ticks,
+        "peak_balloons": peak_balloons,
+        "peak_projectiles": peak_projectiles,
+        "tick_ms": round(elapsed * 1000 / max(world.ticks, 1), 4),
+        "max_tick_ms": round(slowest * 1000, 4),
+    }
+
+
+def runBatch(points, seeds, seconds=120.0, dt=1 / 60, workers=None):
+    """
+    Play every grid point with each seed on a pool of workers processes
+    (one per core by default). Yields rows in task order as they finish.
+    """
+    tasks = [(seed, params, seconds, dt) for params in points for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(playSession, tasks)
+        return
+    # Hand out tasks in chunks so the workers are not starved by the
+    # round trips, yet a slow chunk near the end does not hold up the rest.
+    chunksize = max(1, len(tasks) // (workers * 16))
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(playSession, tasks, chunksize=chunksize)
+
+
+def summarize(rows, names):
+    """One row per grid point: session count and the means and peaks."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row[name] for name in names), []).append(row)
+    summary = []
+    for key, group in groups.items():
+        n = len(group)
+        summary.append(
+            {
+                **dict(zip(names, key)),
+                "sessions": n,
+                "survived": round(sum(row["survived"] for row in group) / n, 2),
+                "died": round(sum(row["over"] for row in group) / n, 3),
+                "score": round(sum(row["score"] for row in group) / n, 2),
+                "peak_balloons": max(row["peak_balloons"] for row in group),
+                "peak_projectiles": max(row["peak_projectiles"] for row in group),
+                "tick_ms": round(sum(row["tick_ms"] for row in group) / n, 4),
+                "max_tick_ms": max(row["max_tick_ms"] for row in group),
+            }
+        )
+    return summary
+
+
+def writeCsv(path, rows, columns):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def printSummary(summary):
+    columns = list(summary[0])
+    widths = [
+        max(len(str(value)) for value in [name] + [row[name] for row in summary])
+        for name in columns
+    ]
+    for values in [columns] + [[row[name] for name in columns] for row in summary]:
+        cells = [str(value).rjust(width) for value, width in zip(values, widths)]
+        print("  ".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m sim.batch",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2",
+        help="values to sweep for one parameter; repeat for a grid",
+    )
+    parser.add_argument("--seeds", type=int, default=10, help="sessions per point")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument(
+        "--seconds", type=float, default=120.0, help="longest session, game time"
+    )
+    parser.add_argument("--tick-rate", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="batch.csv", help="per-session rows")
+    parser.add_argument("--summary", default=None, help="per-point summary CSV")
+    args = parser.parse_args(argv)
+
+    # Fail on a misspelt parameter here rather than in every worker.
+    try:
+        grid = parseGrid(args.set)
+        points = gridPoints(grid)
+        for params in points:
+            applyParameters(World(), params)
+    except (KeyError, ValueError) as error:
+        parser.error(error.args[0])
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    total = len(points) * len(seeds)
+
+    start = time.perf_counter()
+    rows = []
+    for done, row in enumerate(
+        runBatch(points, seeds, args.seconds, 1 / args.tick_rate, args.workers), 1
+    ):
+        rows.append(row)
+        if done % max(1, total // 20) == 0 or done == total:
+            print(f"\r{done}/{total} sessions", end="", file=sys.stderr, flush=True)
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+
+    names = list(grid)
+    writeCsv(args.out, rows, names + COLUMNS)
+    summary = summarize(rows, names)
+    if args.summary:
+        writeCsv(args.summary, summary, list(summary[0]))
+    printSummary(summary)
+    ticks = sum(row["ticks"] for row in rows)
+    print(
+        f"{total} sessions, {ticks} ticks in {elapsed:.1f} s "
+        f"({ticks / elapsed:,.0f} ticks/s); rows in {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
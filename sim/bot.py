@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+
+
+class Bot:
+    """
+    A scripted player for headless runs. Each tick it backs away from the
+    nearest balloon when one gets within flee_distance, otherwise walks to
+    the nearest coin, and fires at the nearest balloon whenever the weapon
+    is ready. It reads the world like a player reading the screen and acts
+    only through the same calls the game's input does.
+    """
+
+    def __init__(self, flee_distance=12.0, aim_height=1.0):
+        self.flee_distance = flee_distance
+        self.aim_height = aim_height
+
+    @staticmethod
+    def headingTowards(dx, dy):
+        """The player heading, in degrees, that walks along (dx, dy)."""
+        return -math.degrees(math.atan2(dx, dy))
+
+    def act(self, world):
+        """Fire if there is something to fire at; returns the controls."""
+        player = world.player
+        position = np.array(player.position)
+        controls = {"heading": player.heading}
+
+        balloons = world.balloons
+        if balloons.count:
+            offsets = balloons.livePositions() - position
+            distances = np.einsum("ij,ij->i", offsets, offsets)
+            nearest = int(distances.argmin())
+            dx, dy, _ = offsets[nearest].tolist()
+            start = (player.x, player.y, player.z + self.aim_height)
+            target = balloons.positions[nearest]
+            world.shoot(start, tuple((target - start).tolist()))
+            if distances[nearest] < self.flee_distance**2:
+                controls["heading"] = self.headingTowards(-dx, -dy)
+                controls["forward"] = True
+                return controls
+
+        pickups = world.pickups
+        coins = [row for row, kind in enumerate(pickups.kind_of) if kind == "coin"]
+        if coins:
+            offsets = pickups.bases[coins, :2] - position[:2]
+            dx, dy = offsets[np.einsum("ij,ij->i", offsets, offsets).argmin()]
+            controls["heading"] = self.headingTowards(dx, dy)
+            controls["forward"] = True
+        return controls
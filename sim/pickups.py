@@ -0,0 +1,131 @@
+import numpy as np
+
+from core.spatial import SpatialHash
+
+# Sent with the key, kind, resting position, bounce height and world time of
+# a pickup put on the ground, and with the key of one taken off it.
+ADDED_EVENT = "pickup-added"
+REMOVED_EVENT = "pickup-removed"
+# Sent with the kind and resting position of a pickup the player touched.
+COLLECTED_EVENT = "pickup-collected"
+
+# Touch radius, bounce height, and how far from the center they spawn.
+PICKUPS = {
+    "coin": {"radius": 2.5, "bounce": 0.2, "spread": 35},
+    "heart": {"radius": 1.5, "bounce": 0.3, "spread": 75},
+    "katana": {"radius": 1.5, "bounce": 0.3, "spread": 75},
+}
+BOUNCE_PERIOD = 2.0
+
+
+def bounceLift(age, heights, period=BOUNCE_PERIOD):
+    """
+    How far above its resting position a pickup is after age seconds: up
+    by its bounce height for the first half of the period and back down
+    for the second, eased in and out.
+    """
+    leg = age % period / (period / 2)
+    leg = np.where(leg < 1, leg, 2 - leg)
+    return heights * leg * leg * (3 - 2 * leg)
+
+
+class PickupField:
+    """
+    Every pickup lying on the ground, whatever its kind. Pickups are filed
+    in one spatial hash by their resting position, and touching() only
+    looks at the cells around the player, so the cost per tick depends on
+    how many pickups are nearby rather than how many exist.
+    """
+
+    def __init__(self, world, cell_size=8.0):
+        self.world = world
+        self.rng = world.streams.get("pickups")
+        self.grid = SpatialHash(cell_size)
+        self.kinds = {}
+        self.reach = 0.0
+        for kind, props in PICKUPS.items():
+            self.register(kind, props["radius"])
+        self.next_key = 0
+        # key -> row, and per row its key, kind, resting position, bounce
+        # height and when it was put down
+        self.rows = {}
+        self.keys = []
+        self.kind_of = []
+        self.bases = np.zeros((0, 3))
+        self.heights = np.zeros(0)
+        self.starts = np.zeros(0)
+
+    def register(self, kind, radius):
+        self.kinds[kind] = radius
+        self.reach = max(self.reach, radius)
+
+    def spawn(self, kind):
+        """Put a pickup of kind down somewhere at random."""
+        spread = PICKUPS[kind]["spread"]
+        x = self.rng.uniform(-spread, spread)
+        y = self.rng.uniform(-spread, spread)
+        return self.add(kind, (x, y, 0.5), PICKUPS[kind]["bounce"])
+
+    def add(self, kind, base, bounce):
+        key = self.next_key
+        self.next_key += 1
+        row = len(self.keys)
+        if row == len(self.starts):
+            capacity = max(16, 2 * row)
+            self.bases = np.resize(self.bases, (capacity, 3))
+            self.heights = np.resize(self.heights, capacity)
+            self.starts = np.resize(self.starts, capacity)
+        self.rows[key] = row
+        self.keys.append(key)
+        self.kind_of.append(kind)
+        self.bases[row] = base
+        self.heights[row] = bounce
+        self.starts[row] = self.world.time
+        self.grid.insert(key, base[0], base[1])
+        self.world.emit(ADDED_EVENT, key, kind, tuple(base), bounce, self.world.time)
+        return key
+
+    def remove(self, key):
+        """Take a pickup off the ground; the last row moves into its place."""
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        self.grid.remove(key)
+        last = len(self.keys) - 1
+        if row != last:
+            moved = self.keys[row] = self.keys[last]
+            self.rows[moved] = row
+            self.kind_of[row] = self.kind_of[last]
+            self.bases[row] = self.bases[last]
+            self.heights[row] = self.heights[last]
+            self.starts[row] = self.starts[last]
+        self.keys.pop()
+        self.kind_of.pop()
+        self.world.emit(REMOVED_EVENT, key)
+
+    def positions(self, rows=slice(None)):
+        """Where the pickups in rows are at the current time."""
+        n = len(self.keys)
+        positions = self.bases[:n][rows].copy()
+        positions[..., 2] += bounceLift(
+            self.world.time - self.starts[:n][rows], self.heights[:n][rows]
+        )
+        return positions
+
+    def baseOf(self, key):
+        return tuple(self.bases[self.rows[key]].tolist())
+
+    def touching(self, position):
+        """Keys and kinds of the pickups the player at position touches."""
+        keys = self.grid.near(position[0], position[1], self.reach)
+        if not keys:
+            return []
+        rows = np.array([self.rows[key] for key in keys])
+        offsets = self.positions(rows) - tuple(position)
+        kinds = [self.kind_of[row] for row in rows.tolist()]
+        radii = np.array([self.kinds[kind] for kind in kinds])
+        touching = np.einsum("ij,ij->i", offsets, offsets) < radii * radii
+        return [(key, kind) for key, kind, hit in zip(keys, kinds, touching) if hit]
+
+    def __len__(self):
+        return len(self.keys)
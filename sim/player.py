@@ -0,0 +1,144 @@
+import math
+
+# Sent when the player loses health, with the health left.
+HURT_EVENT = "player-hurt"
+
+
+class PlayerState:
+    """
+    Where the player is and how their jump is going, as plain numbers.
+    Movement follows the heading the caller passes in each tick; the
+    position is clamped to the map and kept out of the obstacles, except
+    the low ones it can stand on.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.gravity = 22
+        self.jump_speed = 7
+        self.max_jump_hold = 0.4
+        self.gravity_scale = 0.3
+        self.max_jump_buffer_time = 0.2
+        self.speed = 8
+        self.reset()
+
+    @property
+    def position(self):
+        return (self.x, self.y, self.z)
+
+    def reset(self):
+        self.x = self.y = self.z = 0.0
+        # Position at the previous tick, for drawing in between.
+        self.previous = self.position
+        self.heading = 0.0
+        self.health = 3
+        self.invulnerable_until = 0.0
+        self.z_velocity = 0.0
+        self.jump_timer = self.max_jump_hold
+        self.buffer_timer = 0.0
+        self.is_jumping = False
+
+    def takeDamage(self, damage):
+        world = self.world
+        if world.time < self.invulnerable_until:
+            return
+        self.health -= damage
+        world.emit(HURT_EVENT, self.health)
+        if self.health <= 0:
+            world.end()
+            return
+        self.invulnerable_until = world.time + 1
+
+    def heal(self, health):
+        self.health += health
+
+    def checkObstacleCollision(self, x, y, z, old_x, old_y):
+        """
+        Whether (x, y, z) is inside an obstacle coming from (old_x, old_y),
+        and the ground height there: the top of an obstacle the player was
+        already standing on, else 0.
+        """
+        groundHeight = 0
+        obstacles = self.world.obstacles
+        for index in self.world.obstacleGrid.query(x, y):
+            pos, radius, height = obstacles[index]
+            ox, oy, _ = pos
+
+            dx = x - ox
+            dy = y - oy
+            dx_old = old_x - ox
+            dy_old = old_y - oy
+            distance_sq = dx * dx + dy * dy
+            old_distance_sq = dx_old * dx_old + dy_old * dy_old
+
+            if distance_sq < radius * radius:
+                if z + 0.01 > height:
+                    if old_distance_sq < radius * radius:
+                        return False, groundHeight + height
+                    return False, groundHeight
+                return True, groundHeight
+        return False, groundHeight
+
+    def update(self, dt, controls):
+        self.previous = self.position
+        self.heading = controls.get("heading", self.heading)
+        heading_rad = math.radians(self.heading)
+        forward_x, forward_y = math.sin(-heading_rad), math.cos(-heading_rad)
+        right_x = math.sin(-heading_rad + math.pi / 2)
+        right_y = math.cos(-heading_rad + math.pi / 2)
+        step = dt * self.speed
+
+        old_x, old_y = self.x, self.y
+        x, y = old_x, old_y
+        if controls.get("forward"):
+            x, y = x + forward_x * step, y + forward_y * step
+        if controls.get("backward"):
+            x, y = x - forward_x * step, y - forward_y * step
+        if controls.get("left"):
+            x, y = x - right_x * step, y - right_y * step
+        if controls.get("right"):
+            x, y = x + right_x * step, y + right_y * step
+        blocked, groundHeight = self.checkObstacleCollision(x, y, self.z, old_x, old_y)
+        if blocked:
+            x, y = old_x, old_y
+
+        z = self.z
+        on_ground = z <= groundHeight + 0.01
+        if on_ground:
+            z += math.sin(self.world.time * 10) * 0.05
+        jumping = controls.get("jump", False) or (
+            0 < self.buffer_timer < self.max_jump_buffer_time
+        )
+        if self.is_jumping:
+            self.buffer_timer += dt
+        else:
+            self.buffer_timer = 0.0
+
+        if self.is_jumping and jumping and self.jump_timer < self.max_jump_hold:
+            self.jump_timer += dt
+            gravity_scale = self.gravity_scale
+        else:
+            gravity_scale = 1.0
+
+        if on_ground and not self.is_jumping and jumping:
+            self.is_jumping = True
+            self.z_velocity = self.jump_speed
+            self.jump_timer = 0.0
+            self.buffer_timer = 0.0
+
+        if self.is_jumping and not jumping:
+            self.jump_timer = 0.0
+            self.is_jumping = False
+            self.buffer_timer = 0.0
+
+        self.z_velocity -= self.gravity * gravity_scale * dt
+
+        z += self.z_velocity * dt
+        if z <= groundHeight + 0.01 and not jumping:
+            z = groundHeight
+            self.z_velocity = 0.0
+            self.is_jumping = False
+
+        self.x = max(-80, min(80, x))
+        self.y = max(-80, min(80, y))
+        self.z = z
@@ -0,0 +1,164 @@
+import bisect
+
+import numpy as np
+
+# Sent with the new projectile's key, weapon, start position and direction.
+FIRED_EVENT = "projectile-fired"
+# Sent with the key of a projectile that hit something or flew too far.
+REMOVED_EVENT = "projectile-removed"
+# Sent with the impact position and the obstacle's index in world.obstacles
+# when a projectile hits scenery.
+IMPACT_EVENT = "projectile-impact"
+
+WEAPONS = {
+    "dart": {
+        "damage": 1,
+        "speed": 30,
+        "cooldown": 0.3,  # Faster shooting
+        "size": (0.1, 0.5, 0.1),
+        "color": (0.8, 0.8, 0, 1),  # Yellow
+        "description": "Fast but weak",
+    },
+    "katana": {
+        "damage": 2,
+        "speed": 45,
+        "cooldown": 0.6,  # Slower shooting
+        "size": (0.2, 1.0, 0.2),
+        "color": (0.7, 0.7, 0.7, 1),  # Silver
+        "description": "Powerful but slow",
+    },
+}
+
+FIELDS = {
+    "keys": (np.int64, None),
+    "positions": (np.float64, 3),
+    # Where each projectile was at the previous tick, for drawing in between.
+    "previous_positions": (np.float64, 3),
+    "directions": (np.float64, 3),
+    "speeds": (np.float64, None),
+    "damage": (np.int32, None),
+}
+
+
+class ProjectileSwarm:
+    """
+    Projectiles in flight, one row per projectile in firing order. Each has
+    a key that stays the same while the rows shift, so a view can tell its
+    drawn projectiles apart.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.weaponProperties = WEAPONS
+        self.canShoot = True
+        self.lastShootTime = 0
+        self.next_key = 0
+        self.count = 0
+        self.capacity = 0
+        self._grow(16)
+
+    def _grow(self, capacity):
+        for name, (dtype, width) in FIELDS.items():
+            shape = (capacity, width) if width else (capacity,)
+            array = np.zeros(shape, dtype=dtype)
+            if self.capacity:
+                array[: self.count] = getattr(self, name)[: self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def shoot(self, start, direction):
+        """
+        Fire the current weapon from start along direction (normalized
+        here), unless it is still cooling down. Returns the new
+        projectile's key, or None.
+        """
+        world = self.world
+        if not self.canShoot or world.over:
+            return None
+        weaponType = world.weapon
+        weaponProps = self.weaponProperties[weaponType]
+
+        direction = np.asarray(direction, dtype=np.float64)
+        direction = direction / max(np.linalg.norm(direction), 1e-9)
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+        row = self.count
+        self.count += 1
+        key = self.next_key
+        self.next_key += 1
+        self.keys[row] = key
+        self.positions[row] = self.previous_positions[row] = start
+        self.directions[row] = direction
+        self.speeds[row] = weaponProps["speed"]
+        self.damage[row] = weaponProps["damage"]
+        world.emit(FIRED_EVENT, key, weaponType, tuple(start), tuple(direction))
+
+        # Set cooldown
+        self.canShoot = False
+        self.lastShootTime = world.time
+        return key
+
+    def update(self, dt):
+        """Move all projectiles and handle the shooting cooldown."""
+        world = self.world
+        if not self.canShoot:
+            if (
+                world.time - self.lastShootTime
+                >= self.weaponProperties[world.weapon]["cooldown"]
+            ):
+                self.canShoot = True
+
+        n = self.count
+        if not n:
+            return
+
+        # Move the projectiles forward, remembering where they came from
+        starts = self.previous_positions[:n]
+        ends = self.positions[:n]
+        starts[:] = ends
+        ends += self.directions[:n] * (self.speeds[:n] * dt)[:, None]
+
+        # Check the whole path of each projectile this tick against the
+        # balloons and the obstacles, so fast ones cannot pass through
+        # anything between ticks; whichever is met first takes the hit
+        balloons = world.balloons
+        hits, balloon_entries = balloons.firstHits(starts, ends, 1.5)
+        obstacles, obstacle_entries = world.obstacleGrid.firstHits(starts, ends)
+        hits[obstacle_entries < balloon_entries] = -1
+        offsets = ends - world.player.position
+        far = np.einsum("ij,ij->i", offsets, offsets) > 50 * 50
+
+        # Popped balloons shift the later rows down; map hit indices through
+        # the pops so far, and let projectiles aimed at a popped one fly on
+        popped = []
+        keep = np.ones(n, dtype=bool)
+        for i in range(n):
+            index = int(hits[i])
+            position = bisect.bisect_left(popped, index)
+            gone = position < len(popped) and popped[position] == index
+            if index >= 0 and not gone:
+                if balloons.takeDamage(index - position, int(self.damage[i])):
+                    popped.insert(position, index)
+            elif obstacles[i] >= 0:
+                t = obstacle_entries[i]
+                impact = tuple((starts[i] + (ends[i] - starts[i]) * t).tolist())
+                world.emit(IMPACT_EVENT, impact, int(obstacles[i]))
+            elif far[i]:
+                pass
+            else:
+                continue
+            keep[i] = False
+            world.emit(REMOVED_EVENT, int(self.keys[i]))
+        if not keep.all():
+            remaining = int(keep.sum())
+            for name in FIELDS:
+                array = getattr(self, name)
+                array[:remaining] = array[:n][keep]
+            self.count = remaining
+
+    def reset(self):
+        for key in self.keys[: self.count].tolist():
+            self.world.emit(REMOVED_EVENT, key)
+        self.count = 0
+        self.canShoot = True
+        self.lastShootTime = 0
@@ -0,0 +1,290 @@
+"""
+Recording a world's inputs to a compact binary file and playing them back,
+so a session (and any frame-time spike in it) can be reproduced exactly,
+headless or in the game.
+
+    python -m sim.replay session.mdr
+
+A recording holds the world's seed and obstacles, then a zlib-compressed
+stream of the inputs in the order they reached the world: each tick's
+movement keys (and the heading, when it changed), shots, katana swings,
+weapon changes, store purchases and round starts. Every checksum_interval
+ticks it also holds a checksum of the world's state, and playback reports
+the first tick where the replayed world no longer matches.
+"""
+
+import argparse
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from sim.projectiles import WEAPONS
+from sim.world import World
+
+MAGIC = b"MDR2"
+HEADER = struct.Struct("<4sqII")
+OBSTACLE = struct.Struct("<5d")
+KEYS = ("forward", "backward", "left", "right", "jump")
+# Weapons are stored by their index in here.
+WEAPON_NAMES = list(WEAPONS)
+
+# One byte of op code, then its arguments.
+STEP, STEP_TURN, DT, SHOOT, SWING, BUY, SELECT, SWITCH, RESET, CHECK = range(10)
+TICKS = (STEP, STEP_TURN)
+ARGS = {
+    STEP: struct.Struct("<B"),
+    STEP_TURN: struct.Struct("<Bf"),
+    DT: struct.Struct("<d"),
+    SHOOT: struct.Struct("<6f"),
+    SWING: struct.Struct("<3f"),
+    BUY: struct.Struct("<B"),
+    SELECT: struct.Struct("<B"),
+    SWITCH: struct.Struct("<"),
+    RESET: struct.Struct("<"),
+    CHECK: struct.Struct("<I"),
+}
+CALLS = {SWITCH: "switchWeapon", RESET: "reset"}
+WEAPON_CALLS = {BUY: "buyWeapon", SELECT: "selectWeapon"}
+
+
+def worldChecksum(world):
+    """CRC32 of everything a diverging replay would change."""
+    player = world.player
+    crc = zlib.crc32(
+        struct.pack(
+            "<qqqi?4d",
+            world.ticks,
+            world.score,
+            world.coins,
+            player.health,
+            world.over,
+            world.time,
+            player.x,
+            player.y,
+            player.z,
+        )
+    )
+    balloons = world.balloons
+    projectiles = world.projectiles
+    pickups = world.pickups
+    for array in (
+        balloons.positions[: balloons.count],
+        balloons.health[: balloons.count],
+        projectiles.positions[: projectiles.count],
+        projectiles.keys[: projectiles.count],
+        pickups.bases[: len(pickups)],
+    ):
+        crc = zlib.crc32(np.ascontiguousarray(array).tobytes(), crc)
+    return crc
+
+
+class Recorder:
+    """
+    Records every input world receives from now on. Attach it to a new
+    world, before its first input, so the recording starts from the state
+    World(obstacles, seed) rebuilds.
+    """
+
+    def __init__(self, world, checksum_interval=60):
+        self.seed = world.seed
+        self.obstacles = list(world.obstacles)
+        self.checksum_interval = checksum_interval
+        self.ops = bytearray()
+        self.dt = None
+        self.heading = None
+        self.ticks = 0
+        world.recorder = self
+
+    def write(self, op, *args):
+        self.ops.append(op)
+        self.ops += ARGS[op].pack(*args)
+
+    def record(self, world, name, args):
+        if name == "step":
+            dt, controls = args
+            if dt != self.dt:
+                self.dt = dt
+                self.write(DT, dt)
+            keys = sum(1 << bit for bit, key in enumerate(KEYS) if controls.get(key))
+            heading = float(controls.get("heading", world.player.heading))
+            if heading != self.heading:
+                self.heading = heading
+                self.write(STEP_TURN, keys, heading)
+            else:
+                self.write(STEP, keys)
+        elif name == "shoot":
+            self.write(SHOOT, *args[0], *args[1])
+        elif name == "swingKatana":
+            self.write(SWING, *args[0])
+        elif name == "switchWeapon":
+            self.write(SWITCH)
+        elif name == "selectWeapon":
+            self.write(SELECT, WEAPON_NAMES.index(args[0]))
+        elif name == "buyWeapon":
+            self.write(BUY, WEAPON_NAMES.index(args[0]))
+        elif name == "reset":
+            self.write(RESET)
+
+    def stepped(self, world):
+        self.ticks += 1
+        if self.ticks % self.checksum_interval == 0:
+            self.write(CHECK, worldChecksum(world))
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            header = (MAGIC, self.seed, self.checksum_interval, len(self.obstacles))
+            file.write(HEADER.pack(*header))
+            for (x, y, z), radius, height in self.obstacles:
+                file.write(OBSTACLE.pack(x, y, z, radius, height))
+            file.write(zlib.compress(bytes(self.ops), 9))
+
+
+class Replay:
+    """
+    A loaded recording, played back one tick at a time by advance(). The
+    inputs are called on a target with the world's method names, the world
+    itself for a headless replay.
+    """
+
+    def __init__(self, seed, obstacles, ops, checksum_interval=60):
+        self.seed = seed
+        self.obstacles = obstacles
+        self.checksum_interval = checksum_interval
+        self.ops = ops
+        self.position = 0
+        self.dt = None
+        self.heading = 0.0
+        self.ticks = 0
+        self.checked = 0
+        # First tick whose checksum did not match, or None
+        self.divergence = None
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, seed, interval, count = HEADER.unpack_from(data)
+        if magic[:3] == MAGIC[:3] and magic != MAGIC:
+            raise ValueError(f"{path} was recorded by another version of the game")
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a recording")
+        offset = HEADER.size
+        obstacles = []
+        for _ in range(count):
+            x, y, z, radius, height = OBSTACLE.unpack_from(data, offset)
+            obstacles.append(((x, y, z), radius, height))
+            offset += OBSTACLE.size
+        ops = cls.decode(zlib.decompress(data[offset:]))
+        return cls(seed, obstacles, ops, interval)
+
+    @staticmethod
+    def decode(stream):
+        """The (op, args) list in a recording's op stream."""
+        ops = []
+        offset = 0
+        while offset < len(stream):
+            op = stream[offset]
+            args = ARGS[op].unpack_from(stream, offset + 1)
+            offset += 1 + ARGS[op].size
+            ops.append((op, args))
+        return ops
+
+    def world(self):
+        """A new world in the state the recording starts from."""
+        return World(self.obstacles, self.seed)
+
+    @property
+    def finished(self):
+        return self.position >= len(self.ops)
+
+    def applyPending(self, target):
+        """Apply the inputs given before the next tick, and stop there."""
+        ops = self.ops
+        while self.position < len(ops) and ops[self.position][0] not in TICKS:
+            op, args = ops[self.position]
+            self.position += 1
+            if op == DT:
+                self.dt = args[0]
+            elif op == SHOOT:
+                target.shoot(args[:3], args[3:])
+            elif op == SWING:
+                target.swingKatana(args)
+            elif op in CALLS:
+                getattr(target, CALLS[op])()
+            elif op in WEAPON_CALLS:
+                getattr(target, WEAPON_CALLS[op])(WEAPON_NAMES[args[0]])
+
+    def advance(self, target, world=None):
+        """
+        Apply the inputs up to and including the next tick, then check the
+        world (target unless given) against the checksums recorded after
+        it. Returns False once the recording is used up.
+        """
+        world = world if world is not None else target
+        self.applyPending(target)
+        if self.finished:
+            return False
+        op, args = self.ops[self.position]
+        self.position += 1
+        keys = args[0]
+        if op == STEP_TURN:
+            self.heading = args[1]
+        controls = {key: bool(keys & (1 << bit)) for bit, key in enumerate(KEYS)}
+        controls["heading"] = self.heading
+        target.step(self.dt, controls)
+        self.ticks += 1
+
+        while not self.finished and self.ops[self.position][0] == CHECK:
+            expected = self.ops[self.position][1][0]
+            self.position += 1
+            self.checked += 1
+            if self.divergence is None and worldChecksum(world) != expected:
+                self.divergence = self.ticks
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m sim.replay",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("path", help="recording to play")
+    parser.add_argument(
+        "--slowest", type=int, default=5, help="how many of the slowest ticks to list"
+    )
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    world = replay.world()
+    times = []
+    start = time.perf_counter()
+    while True:
+        tick_start = time.perf_counter()
+        if not replay.advance(world):
+            break
+        world.events.clear()
+        times.append(time.perf_counter() - tick_start)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{replay.ticks} ticks ({world.time:.1f} s of play, seed {replay.seed}) "
+        f"replayed in {elapsed:.2f} s; score {world.score}, coins {world.coins}"
+    )
+    if times:
+        times = np.array(times) * 1000
+        print(f"tick ms: mean {times.mean():.3f}, max {times.max():.3f}")
+        for tick in np.argsort(times)[::-1][: args.slowest].tolist():
+            print(f"  tick {tick + 1}: {times[tick]:.3f} ms")
+    if replay.divergence is not None:
+        print(f"diverged at tick {replay.divergence}")
+        return 1
+    print(f"matched all {replay.checked} checksums")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
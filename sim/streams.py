@@ -0,0 +1,31 @@
+import random
+
+import numpy as np
+
+
+class RandomStreams:
+    """
+    Independent random number streams drawn from one seed, one per named
+    subsystem ("scenery", "balloons", "pickups", ...). Each stream depends
+    only on the seed and its name, so a subsystem drawing more or fewer
+    numbers never shifts what another one gets, and the same seed always
+    replays the same session.
+    """
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**32)
+        self.seed = seed
+        self.streams = {}
+
+    def get(self, name):
+        """The random.Random stream for name, made on first use."""
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = self.streams[name] = random.Random(f"{self.seed}/{name}")
+        return stream
+
+    def numpy(self, name):
+        """A fresh numpy Generator for name, for vectorized draws."""
+        entropy = random.Random(f"{self.seed}/{name}/numpy").getrandbits(128)
+        return np.random.default_rng(entropy)
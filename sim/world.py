@@ -0,0 +1,247 @@
+import numpy as np
+
+from core.navigation import FlowField
+from core.spatial import StaticGrid
+from sim.balloons import BalloonSwarm
+from sim.pickups import COLLECTED_EVENT, PickupField
+from sim.player import PlayerState
+from sim.projectiles import ProjectileSwarm
+from sim.streams import RandomStreams
+
+# Sent with where a popped balloon dropped a coin; the coin reaches the
+# player, and counts, COIN_FLIGHT seconds later.
+COIN_DROPPED_EVENT = "coin-dropped"
+COIN_FLIGHT = 1.0
+# Sent once when the player runs out of health.
+GAME_OVER_EVENT = "game-over"
+# Coins each weapon costs in the store.
+STORE_PRICES = {"katana": 50}
+
+# Scenery scattered over the map: resting height, scale range and, for the
+# ones in the way, the (radius, height) of the obstacle they make. An
+# obstacle's height is the z of its top, whatever height the prop rests at.
+PROPS = [
+    ("tree", -0.2, (0.8, 1.2), (1.5, 3)),
+    ("sunflower", -0.4, (0.2, 0.3), None),
+    ("rock", -0.4, (0.8, 1.2), (2.0, 0.5)),
+    ("cranberry", 0.0, (2.0, 3.0), (2.0, 1.7)),
+]
+
+
+def sceneryLayout(rng, count):
+    """
+    count of each prop in PROPS scattered at random, as (name, position,
+    heading, scale, obstacle) tuples.
+    """
+    layout = []
+    for _ in range(count):
+        for name, z, scale_range, obstacle in PROPS:
+            pos = (rng.uniform(-75, 75), rng.uniform(-75, 75), z)
+            heading = rng.uniform(0, 360)
+            scale = rng.uniform(*scale_range)
+            layout.append((name, pos, heading, scale, obstacle))
+    return layout
+
+
+def quantize(values):
+    """
+    The point values rounded to float32, as the game's scene graph gives
+    them. The world takes its inputs at this precision, so a recording can
+    store them in four bytes each and still replay exactly.
+    """
+    return tuple(np.asarray(values, dtype=np.float32).tolist())
+
+
+def obstaclesOf(layout):
+    """The (pos, radius, height) obstacles of the props in layout."""
+    return [
+        (pos, obstacle[0], obstacle[1])
+        for _, pos, _, _, obstacle in layout
+        if obstacle is not None
+    ]
+
+
+class World:
+    """
+    The whole game state as plain data: the player, balloons, projectiles,
+    pickups, score and coins. It needs no window, scene graph or clock;
+    step() advances it by dt seconds and the game's entities only draw
+    what it holds.
+
+    Everything worth showing is recorded with emit() as (name, args) and
+    collected with takeEvents(); the game forwards them to its messenger,
+    and a headless run can just count them.
+
+    Every random draw comes from streams seeded by seed (a random one if
+    None), so a seed and the same inputs always give the same session.
+    Its inputs, step() and the calls made for the player, go to recorder
+    when one is set; see sim.replay.
+    """
+
+    def __init__(self, obstacles=(), seed=None):
+        self.streams = RandomStreams(seed)
+        self.seed = self.streams.seed
+        self.recorder = None
+        self.obstacles = list(obstacles)
+        self.obstacleGrid = StaticGrid.fromObstacles(self.obstacles)
+        self.events = []
+
+        self.time = 0.0
+        self.ticks = 0
+        self.score = 0
+        self.coins = 0
+        self.weapon = "dart"
+        self.owned_weapons = ["dart"]
+        self.over = False
+        # (due time, coins) for dropped coins still flying to the player
+        self.flying_coins = []
+
+        self.player = PlayerState(self)
+        self.balloons = BalloonSwarm(self)
+        # Balloons fly over the obstacles lower than their floor.
+        self.flowField = FlowField(self.obstacles, clearance=self.balloons.floor)
+        self.projectiles = ProjectileSwarm(self)
+        self.pickups = PickupField(self)
+        for kind, count in (("coin", 20), ("heart", 3), ("katana", 2)):
+            for _ in range(count):
+                self.pickups.spawn(kind)
+
+    @classmethod
+    def generate(cls, seed=None, prop_count=50):
+        """A world on the scenery layout the game draws for seed."""
+        streams = RandomStreams(seed)
+        layout = sceneryLayout(streams.get("scenery"), prop_count)
+        return cls(obstaclesOf(layout), streams.seed)
+
+    def emit(self, name, *args):
+        self.events.append((name, args))
+
+    def takeEvents(self):
+        events = self.events
+        self.events = []
+        return events
+
+    def record(self, name, *args):
+        if self.recorder is not None:
+            self.recorder.record(self, name, args)
+
+    def reset(self):
+        """Start a new round; coins and owned weapons carry over."""
+        self.record("reset")
+        self.score = 0
+        self.weapon = "dart"
+        self.over = False
+        self.player.reset()
+        self.balloons.reset()
+        self.projectiles.reset()
+
+    def end(self):
+        if not self.over:
+            self.over = True
+            self.emit(GAME_OVER_EVENT)
+
+    def addScore(self, points):
+        # Popping a balloon is worth as many coins as points.
+        self.score += points
+        self.coins += points
+
+    def dropCoin(self, position):
+        self.flying_coins.append((self.time + COIN_FLIGHT, 3))
+        self.emit(COIN_DROPPED_EVENT, position)
+
+    def step(self, dt, controls):
+        """
+        Advance by one tick of dt seconds. controls holds the movement keys
+        ("forward", "backward", "left", "right", "jump") that are down and
+        the player's "heading" in degrees.
+        """
+        if self.over:
+            return
+        if "heading" in controls:
+            heading = float(np.float32(controls["heading"]))
+            controls = dict(controls, heading=heading)
+        self.record("step", dt, controls)
+        self.player.update(dt, controls)
+        self.balloons.update(dt)
+        self.projectiles.update(dt)
+        self.collectPickups()
+        self.time += dt
+        self.ticks += 1
+        while self.flying_coins and self.flying_coins[0][0] <= self.time:
+            self.coins += self.flying_coins.pop(0)[1]
+        if self.recorder is not None:
+            self.recorder.stepped(self)
+
+    def shoot(self, start, direction):
+        start, direction = quantize(start), quantize(direction)
+        self.record("shoot", start, direction)
+        return self.projectiles.shoot(start, direction)
+
+    def swingKatana(self, forward):
+        """
+        Damage every balloon within 10 units of the player and 30 degrees
+        of forward. Returns how many were hit.
+        """
+        forward = quantize(forward)
+        self.record("swingKatana", forward)
+        balloons = self.balloons
+        if self.over or not balloons.count:
+            return 0
+        to_balloons = balloons.livePositions() - self.player.position
+        distances = np.sqrt(np.einsum("ij,ij->i", to_balloons, to_balloons))
+        cosines = to_balloons @ np.asarray(forward, dtype=np.float64)
+        cosines /= np.where(distances > 0, distances, 1) * np.linalg.norm(forward)
+        angles = np.degrees(np.arccos(np.clip(cosines, -1, 1)))
+        hits = np.flatnonzero((distances < 10) & (angles < 30))
+        # Back to front, so popping a balloon does not shift the rest
+        for index in hits[::-1].tolist():
+            balloons.takeDamage(index, 2)
+        return len(hits)
+
+    def buyWeapon(self, weapon):
+        """Buy weapon in the store and equip it; returns whether it was bought."""
+        self.record("buyWeapon", weapon)
+        price = STORE_PRICES.get(weapon)
+        if price is None or weapon in self.owned_weapons or self.coins < price:
+            return False
+        self.coins -= price
+        self.giveWeapon(weapon)
+        return True
+
+    def selectWeapon(self, weapon):
+        """Equip an owned weapon; returns whether it is owned."""
+        self.record("selectWeapon", weapon)
+        if weapon not in self.owned_weapons:
+            return False
+        self.weapon = weapon
+        return True
+
+    def giveWeapon(self, weapon):
+        if weapon not in self.owned_weapons:
+            self.owned_weapons.append(weapon)
+        self.weapon = weapon
+
+    def switchWeapon(self):
+        """Cycle to the next owned weapon."""
+        self.record("switchWeapon")
+        owned = self.owned_weapons
+        self.weapon = owned[(owned.index(self.weapon) + 1) % len(owned)]
+
+    def collectPickups(self):
+        pickups = self.pickups
+        for key, kind in pickups.touching(self.player.position):
+            base = pickups.baseOf(key)
+            pickups.remove(key)
+            self.emit(COLLECTED_EVENT, kind, base)
+            if kind == "coin":
+                self.coins += 5
+                pickups.spawn("coin")
+            elif kind == "heart":
+                # A heart is used up even at full health, but only comes
+                # back once it has healed.
+                if self.player.health < 3:
+                    self.player.heal(1)
+                    pickups.spawn("heart")
+            elif kind == "katana":
+                if self.weapon != "katana":
+                    self.giveWeapon("katana")
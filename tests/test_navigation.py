@@ -0,0 +1,41 @@
+import numpy as np
+
+from core.navigation import FlowField
+from sim.world import World
+
+TREE = ((10.0, 10.0, 0.0), 2.0, 3)
+ROCK = ((-10.0, -10.0, -0.4), 2.0, 0.5)
+
+
+def settle(flow, target):
+    flow.update(target)
+    while flow.job is not None:
+        flow.update(target)
+
+
+def test_player_next_to_an_obstacle_still_guides_balloons():
+    flow = FlowField([TREE])
+    settle(flow, (11.5, 11.5))
+    assert flow.guided.sum() > 1000
+    # A balloon across the tree is steered around it rather than through it.
+    steer, guided = flow.sample(np.array([6.0]), np.array([6.0]))
+    assert guided[0]
+    assert not np.allclose(steer[0], np.array([1.0, 1.0]) / np.sqrt(2))
+
+
+def test_blocked_area_matches_the_players():
+    flow = FlowField([TREE])
+    player = World([TREE]).player
+    centers = (np.arange(flow.cells) + 0.5) * flow.cell_size - flow.extent
+    for j, y in enumerate(centers[40:50], 40):
+        for i, x in enumerate(centers[40:50], 40):
+            blocked, _ = player.checkObstacleCollision(x, y, 0.0, 0.0, 0.0)
+            assert flow.blocked[j, i] == blocked
+
+
+def test_balloons_fly_over_low_obstacles():
+    world = World([TREE, ROCK])
+    flow = world.flowField
+    i, j = flow.cellOf(np.array([-10.0, 10.0]), np.array([-10.0, 10.0]))
+    assert not flow.blocked[j[0], i[0]]
+    assert flow.blocked[j[1], i[1]]
@@ -0,0 +1,59 @@
+import pytest
+
+from sim.bot import Bot
+from sim.replay import BUY, SELECT, Recorder, Replay, worldChecksum
+from sim.world import World
+
+DT = 1 / 60
+
+
+def recordSession(path, seed=20, ticks=1200):
+    """A bot session that buys and switches weapons, checked every tick."""
+    world = World.generate(seed)
+    recorder = Recorder(world, checksum_interval=1)
+    bot = Bot()
+    bought = False
+    for tick in range(ticks):
+        if not bought and world.coins >= 50:
+            bought = world.buyWeapon("katana")
+            assert bought
+            world.selectWeapon("dart")
+        elif bought and tick % 100 == 0:
+            world.selectWeapon("katana" if world.weapon == "dart" else "dart")
+        world.step(DT, bot.act(world))
+        world.takeEvents()
+        if world.over:
+            world.reset()
+    recorder.save(path)
+    assert bought
+    return world
+
+
+@pytest.fixture(scope="module")
+def session(tmp_path_factory):
+    path = tmp_path_factory.mktemp("replay") / "session.mdr"
+    return path, recordSession(path)
+
+
+def test_replay_matches_every_tick(session):
+    path, recorded = session
+    replay = Replay.load(path)
+    ops = [op for op, _ in replay.ops]
+    assert BUY in ops and SELECT in ops
+    world = replay.world()
+    while replay.advance(world):
+        world.takeEvents()
+
+    assert replay.divergence is None
+    assert replay.checked == replay.ticks == recorded.ticks
+    assert worldChecksum(world) == worldChecksum(recorded)
+    assert world.owned_weapons == recorded.owned_weapons
+    assert world.coins == recorded.coins
+
+
+def test_replay_reports_divergence(session):
+    replay = Replay.load(session[0])
+    world = World(replay.obstacles, replay.seed + 1)
+    while replay.advance(world):
+        world.takeEvents()
+    assert replay.divergence is not None
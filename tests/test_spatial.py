@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from core.spatial import StaticGrid, segmentCylinderHits
+from sim.world import World
+
+
+def randomObstacles(seed, count=300):
+    rng = np.random.default_rng(seed)
+    obstacles = [
+        ((x, y, bottom), radius, bottom + height)
+        for x, y, bottom, radius, height in zip(
+            rng.uniform(-40, 40, count),
+            rng.uniform(-40, 40, count),
+            rng.uniform(-0.5, 0.5, count),
+            rng.uniform(0.3, 3.0, count),
+            rng.uniform(0.5, 4.0, count),
+        )
+    ]
+    # Copies of earlier obstacles, so the lowest index has to win ties.
+    return obstacles + obstacles[::10]
+
+
+def randomPoints(seed, count):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-45, 45, (count, 2)).tolist()
+
+
+def contains(obstacle, x, y):
+    (ox, oy, _), radius, _ = obstacle
+    return (x - ox) ** 2 + (y - oy) ** 2 < radius * radius
+
+
+def test_query_matches_brute_force():
+    obstacles = randomObstacles(1)
+    grid = StaticGrid.fromObstacles(obstacles)
+    for x, y in randomPoints(2, 2000):
+        found = list(grid.query(x, y))
+        assert found == sorted(found)
+        expected = [
+            i for i, obstacle in enumerate(obstacles) if contains(obstacle, x, y)
+        ]
+        assert [i for i in found if contains(obstacles[i], x, y)] == expected
+
+
+def test_collision_takes_the_first_obstacle():
+    obstacles = randomObstacles(3)
+    player = World(obstacles, seed=3).player
+    rng = np.random.default_rng(4)
+    for (x, y), z in zip(randomPoints(5, 2000), rng.uniform(0, 4, 2000).tolist()):
+        old_x, old_y = x - 0.1, y + 0.1
+        expected = (False, 0)
+        for obstacle in obstacles:
+            if contains(obstacle, x, y):
+                top = obstacle[2]
+                if z + 0.01 <= top:
+                    expected = (True, 0)
+                elif contains(obstacle, old_x, old_y):
+                    expected = (False, top)
+                break
+        assert player.checkObstacleCollision(x, y, z, old_x, old_y) == expected
+
+
+@pytest.mark.parametrize("count", [StaticGrid.small_batch, 500])
+def test_first_hits_match_brute_force(count):
+    grid = StaticGrid.fromObstacles(randomObstacles(6))
+    rng = np.random.default_rng(count)
+    starts = np.column_stack(
+        (rng.uniform(-45, 45, (count, 2)), rng.uniform(-1, 5, count))
+    )
+    ends = starts + rng.uniform(-6, 6, (count, 3))
+
+    # Every cylinder tried for every segment; the earliest entry wins, then
+    # the lowest index.
+    segments = np.repeat(np.arange(count), len(grid.xs))
+    cylinders = np.tile(np.arange(len(grid.xs)), count)
+    segments, cylinders, entry = segmentCylinderHits(
+        starts, ends, grid, segments, cylinders
+    )
+    expected = np.full(count, -1)
+    expected_entries = np.full(count, np.inf)
+    for segment, cylinder, fraction in zip(segments, cylinders, entry):
+        if fraction < expected_entries[segment]:
+            expected[segment] = cylinder
+            expected_entries[segment] = fraction
+
+    hits, entries = grid.firstHits(starts, ends)
+    assert (expected >= 0).any()
+    assert hits.tolist() == expected.tolist()
+    assert entries.tolist() == expected_entries.tolist()
@@ -10,7 +10,7 @@ class HUD:
         self.max_hearts = 3
         self.heart_image_path = "assets/health.png"
         self.heart_icons = []
-        self.refreshHearts()
+        self.refreshHearts(self.max_hearts)
 
         self.frame = DirectFrame(
             frameColor=(0, 0, 0, 0),
@@ -89,13 +89,7 @@ class HUD:
     def hide(self):
         self.frame.hide()
 
-    def disableUpgradeButton(self):
-        if hasattr(self.game, "menuManager") and hasattr(
-            self.game.menuManager, "store"
-        ):
-            self.game.menuManager.store.disableUpgradeButton()
-
-    def refreshHearts(self):
+    def refreshHearts(self, health):
         for heart in self.heart_icons:
             heart.removeNode()
         self.heart_icons.clear()
@@ -105,7 +99,7 @@ class HUD:
         base_x = 1 - scale * 1.2
         y_pos = 0.9
 
-        for i in range(self.game.player.health):
+        for i in range(health):
             x = base_x - i * spacing
             heart = OnscreenImage(
                 image=self.heart_image_path,
@@ -116,8 +110,3 @@ class HUD:
             heart.setTransparency(TransparencyAttrib.M_alpha)
             self.heart_icons.append(heart)
 
-    def addHeart(self):
-        self.refreshHearts()
-
-    def removeHeart(self):
-        self.refreshHearts()
@@ -5,6 +5,7 @@ from direct.gui.DirectGui import (
     DirectButton,
     DirectDialog,
     DirectLabel,
+    DirectWaitBar,
 )
 from panda3d.core import TextNode
 
@@ -12,6 +13,7 @@ MENU_BG_COLOR = (0.1, 0.1, 0.1, 0.9)
 BUTTON_COLOR = (0.2, 0.2, 0.2, 0.8)
 BUTTON_HOVER_COLOR = (0.3, 0.3, 0.3, 0.8)
 TEXT_COLOR = (1, 1, 1, 1)
+DISABLED_TEXT_COLOR = (0.5, 0.5, 0.5, 1)
 TITLE_COLOR = (1, 1, 1, 1)
 COIN_COLOR = (1, 0.8, 0, 1)
 
@@ -73,20 +75,24 @@ class MenuManager:
 
         button_spacing = 0.15
         start_y = 0.2
-        self.createButton(
+        self.startButton = self.createButton(
             "Start Game",
             (0, 0, start_y),
             command=self.game.startGame,
             parent=self.main_menu,
             scale=0.08,
         )
-        self.createButton(
+        self.storeButton = self.createButton(
             "Store",
             (0, 0, start_y - button_spacing),
             command=self.showStore,
             parent=self.main_menu,
             scale=0.08,
         )
+        # Disabled until MonkeyDartGame.loadWorld has built the world.
+        for button in (self.startButton, self.storeButton):
+            button["state"] = DGG.DISABLED
+            button["text_fg"] = DISABLED_TEXT_COLOR
         self.createButton(
             "Rules",
             (0, 0, start_y - button_spacing * 2),
@@ -117,6 +123,30 @@ class MenuManager:
             scale=0.05,
         )
 
+        self.loading_bar = DirectWaitBar(
+            text="Loading...",
+            text_scale=0.1,
+            text_fg=TEXT_COLOR,
+            text_pos=(0, -0.03),
+            range=1,
+            value=0,
+            barColor=COIN_COLOR,
+            frameColor=BUTTON_COLOR,
+            pos=(0, 0, -0.62),
+            scale=(0.5, 1, 0.4),
+            parent=self.main_menu,
+        )
+
+    def setLoadingProgress(self, fraction, label=""):
+        self.loading_bar["value"] = fraction
+        self.loading_bar["text"] = f"Loading {label}... {int(fraction * 100)}%"
+
+    def finishLoading(self):
+        self.loading_bar.hide()
+        for button in (self.startButton, self.storeButton):
+            button["state"] = DGG.NORMAL
+            button["text_fg"] = TEXT_COLOR
+
     def setupWeaponMenu(self):
         self.weapon_menu = DirectDialog(
             frameSize=(-0.5, 0.5, -0.5, 0.5),
@@ -132,8 +162,8 @@ class MenuManager:
             scale=0.1,
         )
 
+        # Filled in by updateWeaponButtons() when the menu is shown.
         self.weaponButtons = {}
-        self.updateWeaponButtons()
 
         self.createButton(
             "Close",
@@ -167,9 +197,7 @@ class MenuManager:
             y_pos -= 0.2
 
     def selectWeapon(self, weapon):
-        self.game.weaponType = weapon
-        self.game.player.switchWeapon(weapon)
-        self.game.hud.updateWeapon(weapon)
+        self.game.selectWeapon(weapon)
         self.hideWeaponMenu()
 
     def showWeaponMenu(self):
@@ -306,15 +334,10 @@ class MenuManager:
         self.store_coin_label.setText(f"Coins: {self.game.coins}")
 
     def buyKatana(self):
-        if self.game.coins >= 50 and "katana" not in self.game.owned_weapons:
-            self.game.coins -= 50
-            self.game.owned_weapons.append("katana")
+        if self.game.buyWeapon("katana"):
             self.updateStoreCoins()
-            self.katanaButton.setText("Katana (Owned)")
-            self.katanaButton["state"] = DGG.DISABLED
-            self.game.projectileManager.createUpgradeEffect(
-                self.game.player.weapon_holder.getPos(self.game.render)
-            )
+            self.buy_katana_button.setText("Katana (Owned)")
+            self.buy_katana_button["state"] = DGG.DISABLED
 
     def hideMainMenu(self):
         if self.main_menu:
@@ -345,8 +368,9 @@ class MenuManager:
             parent=self.store_menu,
             scale=0.12,
         )
+        # Filled in by updateStoreCoins() when the store is shown.
         self.store_coin_label = self.createLabel(
-            f"Coins: {self.game.coins}",
+            "Coins: 0",
             (0, 0, 0.35),
             parent=self.store_menu,
             scale=0.08,
@@ -386,7 +410,7 @@ class MenuManager:
         self.buy_katana_button = self.createButton(
             "Buy Katana (50 coins)",
             (0, 0, -0.2),
-            command=self.game.upgradeWeapon,
+            command=self.buyKatana,
             parent=self.store_menu,
             scale=0.07,
         )
@@ -1,5 +1,16 @@
+import numpy as np
 from direct.gui.DirectGui import DirectFrame
-from panda3d.core import CardMaker
+from panda3d.core import (
+    CardMaker,
+    Geom,
+    GeomEnums,
+    GeomNode,
+    GeomPoints,
+    GeomVertexArrayFormat,
+    GeomVertexData,
+    GeomVertexFormat,
+    OmniBoundingVolume,
+)
 
 
 class Minimap:
@@ -31,8 +42,43 @@ class Minimap:
         self.player_square = self.player_marker.attachNewNode(cm.generate())
         self.player_square.setColor(1, 1, 0, 1)
 
+        self.createBalloonLayer()
+
         self.hide()
 
+    def createBalloonLayer(self):
+        # All balloon markers are one point cloud, rewritten in place each
+        # frame from the balloon manager's arrays.
+        array = GeomVertexArrayFormat()
+        array.addColumn("vertex", 3, GeomEnums.NT_float32, GeomEnums.C_point)
+        array.addColumn("color", 4, GeomEnums.NT_float32, GeomEnums.C_color)
+        vformat = GeomVertexFormat.registerFormat(GeomVertexFormat(array))
+        self.marker_data = GeomVertexData("balloon_markers", vformat, Geom.UH_dynamic)
+        self.marker_points = GeomPoints(Geom.UH_dynamic)
+        geom = Geom(self.marker_data)
+        geom.addPrimitive(self.marker_points)
+        node = GeomNode("balloon_markers")
+        node.addGeom(geom)
+        node.setBounds(OmniBoundingVolume())
+        node.setFinal(True)
+        self.balloon_markers = self.frame.attachNewNode(node)
+        self.balloon_markers.setRenderModeThickness(4)
+        self.balloon_markers.setLightOff()
+
+    def updateBalloonMarkers(self, xs, ys, colors):
+        count = len(xs)
+        rows = np.zeros((count, 7), dtype=np.float32)
+        rows[:, 0] = xs
+        rows[:, 2] = ys
+        if count:
+            rows[:, 3:] = colors
+        self.marker_data.uncleanSetNumRows(count)
+        if count:
+            memoryview(self.marker_data.modifyArray(0)).cast("B")[:] = rows.tobytes()
+        self.marker_points.clearVertices()
+        if count:
+            self.marker_points.addConsecutiveVertices(0, count)
+
     def updatePlayerMarker(self, player_pos, heading):
         map_scale = 0.14 / 75
         self.player_marker.setPos(